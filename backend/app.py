@@ -1,251 +1,221 @@
 import os
 import sys
+from typing import Any, Mapping
 
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_cors import CORS
 from flask_mail import Mail
-from src.models import Service, ServiceCategory, db
+from src.bootstrap import init_database
+from src.commands import (
+    appointments_cli,
+    db_cli,
+    init_db_command,
+    outbox_cli,
+    seed_command,
+    static_cli,
+    stats_cli,
+)
+from src.models import db
+from src.models.settings import SettingsCache
 from src.routes.user import user_bp
 from src.routes.appointment import appointment_bp
 from src.routes.service import service_bp
 from src.routes.admin import admin_bp
 from src.routes.settings import settings_bp
+from src.utils.availability import AvailabilityCache
+from src.utils.catalog import CatalogCache
+from src.utils.email_outbox import OutboxWorkerPool, start_outbox_workers
+from src.utils.email_templates import TEMPLATE_SOURCES, TemplateRegistry
+from src.utils.email_utils import SMTPConnectionPool
+from src.utils.request_metrics import RequestMetrics, install_request_metrics
+from src.utils.sqlite_tuning import install_sqlite_pragmas, sqlite_pragmas
+from src.utils.static_assets import StaticManifest, serve_spa
+
+STATIC_FOLDER = os.path.join(os.path.dirname(__file__), "static")
+
+
+def load_config() -> dict[str, Any]:
+    """Konfiguracja aplikacji ze zmiennych środowiskowych."""
+    config: dict[str, Any] = {}
+    config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "a-very-secret-dev-key")
+
+    # Konfiguracja Flask-Mail dla Gmail
+    config["MAIL_SERVER"] = os.environ.get("MAIL_SERVER", "smtp.gmail.com")
+    config["MAIL_PORT"] = int(os.environ.get("MAIL_PORT", "587"))
+    config["MAIL_USE_TLS"] = os.environ.get("MAIL_USE_TLS", "true").lower() == "true"
+    config["MAIL_USE_SSL"] = os.environ.get("MAIL_USE_SSL", "false").lower() == "true"
+    config["MAIL_USERNAME"] = os.environ.get("MAIL_USERNAME", "")
+    config["MAIL_PASSWORD"] = os.environ.get("MAIL_PASSWORD", "")
+    config["MAIL_DEFAULT_SENDER"] = os.environ.get(
+        "MAIL_DEFAULT_SENDER", config["MAIL_USERNAME"]
+    )
+    config["MAIL_TIMEOUT"] = float(os.environ.get("MAIL_TIMEOUT", "30"))
+    config["MAIL_POOL_SIZE"] = int(os.environ.get("MAIL_POOL_SIZE", "4"))
+    config["MAIL_POOL_IDLE_TIMEOUT"] = float(
+        os.environ.get("MAIL_POOL_IDLE_TIMEOUT", "60")
+    )
+    config["MAIL_POOL_NOOP_INTERVAL"] = float(
+        os.environ.get("MAIL_POOL_NOOP_INTERVAL", "10")
+    )
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), "static"))
-app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "a-very-secret-dev-key")
-
-# Konfiguracja Flask-Mail dla Gmail
-app.config["MAIL_SERVER"] = os.environ.get("MAIL_SERVER", "smtp.gmail.com")
-app.config["MAIL_PORT"] = int(os.environ.get("MAIL_PORT", "587"))
-app.config["MAIL_USE_TLS"] = os.environ.get("MAIL_USE_TLS", "true").lower() == "true"
-app.config["MAIL_USE_SSL"] = os.environ.get("MAIL_USE_SSL", "false").lower() == "true"
-app.config["MAIL_USERNAME"] = os.environ.get("MAIL_USERNAME", "")
-app.config["MAIL_PASSWORD"] = os.environ.get("MAIL_PASSWORD", "")
-app.config["MAIL_DEFAULT_SENDER"] = os.environ.get(
-    "MAIL_DEFAULT_SENDER", app.config["MAIL_USERNAME"]
-)
+    # Kalendarz rezerwacji
+    config["AVAILABILITY_GRANULARITY_MINUTES"] = int(
+        os.environ.get("AVAILABILITY_GRANULARITY_MINUTES", "15")
+    )
+    config["AVAILABILITY_MAX_DAYS"] = int(os.environ.get("AVAILABILITY_MAX_DAYS", "90"))
+    config["AVAILABILITY_CACHE_SIZE"] = int(
+        os.environ.get("AVAILABILITY_CACHE_SIZE", "4096")
+    )
+    config["AVAILABILITY_CACHE_TTL"] = float(
+        os.environ.get("AVAILABILITY_CACHE_TTL", "60")
+    )
 
-mail = Mail(app)
+    # Kolejka wysyłki emaili
+    config["EMAIL_OUTBOX_IN_PROCESS"] = (
+        os.environ.get("EMAIL_OUTBOX_IN_PROCESS", "true").lower() == "true"
+    )
+    config["EMAIL_OUTBOX_WORKERS"] = int(os.environ.get("EMAIL_OUTBOX_WORKERS", "1"))
+    config["EMAIL_OUTBOX_MAX_ATTEMPTS"] = int(
+        os.environ.get("EMAIL_OUTBOX_MAX_ATTEMPTS", "8")
+    )
+    config["EMAIL_OUTBOX_BACKOFF_SECONDS"] = float(
+        os.environ.get("EMAIL_OUTBOX_BACKOFF_SECONDS", "30")
+    )
+    config["EMAIL_OUTBOX_POLL_SECONDS"] = float(
+        os.environ.get("EMAIL_OUTBOX_POLL_SECONDS", "5")
+    )
 
-# Włączenie CORS dla wszystkich tras
-CORS(app)
+    # Zbudowany frontend: manifest plików tworzony przy starcie
+    config["STATIC_MAX_AGE"] = int(os.environ.get("STATIC_MAX_AGE", "3600"))
+    config["STATIC_IMMUTABLE_MAX_AGE"] = int(
+        os.environ.get("STATIC_IMMUTABLE_MAX_AGE", "31536000")
+    )
 
-app.register_blueprint(user_bp, url_prefix="/api")
-app.register_blueprint(appointment_bp, url_prefix="/api")
-app.register_blueprint(service_bp, url_prefix="/api")
-app.register_blueprint(admin_bp, url_prefix="/api")
-app.register_blueprint(settings_bp, url_prefix="/api")
+    config["SQLALCHEMY_DATABASE_URI"] = os.environ.get(
+        "DATABASE_URL",
+        f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}",
+    )
+    config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
-# uncomment if you need to use database
-app.config["SQLALCHEMY_DATABASE_URI"] = (
-    f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
-)
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-db.init_app(app)
-with app.app_context():
-    db.create_all()
-    _categories_count = ServiceCategory.query.count()
-    _services_count = Service.query.count()
-    if _categories_count == 0 and _services_count == 0:
-        starter_categories = [
-            ("Podstawowe zabiegi", "Konsultacje i podstawowa pielęgnacja"),
-            ("Zabiegi specjalistyczne", "Zaawansowane zabiegi korekcyjne"),
-            ("Korekcja i ortopedia", "Wsparcie strukturalne stóp"),
-            ("Usługi dodatkowe", "Uzupełniające terapie i wizyty"),
-        ]
-        category_map: dict[str, ServiceCategory] = {}
-        for name, description in starter_categories:
-            category = ServiceCategory()
-            category.name = name
-            category.description = description
-            db.session.add(category)
-            category_map[name] = category
-
-        db.session.flush()
-
-        # Dane zgodne z uslugi-podologiczne.md
-        starter_services = [
-            # PODSTAWOWE ZABIEGI
-            (
-                "Konsultacja podologiczna",
-                "Profesjonalna ocena stanu zdrowia stóp i doradztwo",
-                100.00,
-                45,
-                "Podstawowe zabiegi",
-            ),
-            (
-                "Podstawowy zabieg podologiczny",
-                "Kompleksowa pielęgnacja stóp z profesjonalnym podejściem",
-                170.00,
-                75,
-                "Podstawowe zabiegi",
-            ),
-            (
-                "Obcięcie paznokci - zdrowe",
-                "Prawidłowe obcięcie zdrowych paznokci u stóp",
-                100.00,
-                30,
-                "Podstawowe zabiegi",
-            ),
-            (
-                "Obcięcie paznokci - zmienione chorobowo",
-                "Obcięcie paznokci zmienionych chorobowo",
-                150.00,
-                45,
-                "Podstawowe zabiegi",
-            ),
-            (
-                "Pękające pięty",
-                "Leczenie i pielęgnacja pękających pięt",
-                150.00,
-                50,
-                "Podstawowe zabiegi",
-            ),
-            # ZABIEGI SPECJALISTYCZNE
-            (
-                "Usunięcie odcisku",
-                "Bezbolesne usuwanie odcisków z zastosowaniem profesjonalnych narzędzi",
-                100.00,
-                30,
-                "Zabiegi specjalistyczne",
-            ),
-            (
-                "Opracowanie modzeli",
-                "Precyzyjne opracowanie modzeli",
-                130.00,
-                40,
-                "Zabiegi specjalistyczne",
-            ),
-            (
-                "Leczenie brodawek",
-                "Skuteczne leczenie brodawek wirusowych metodami podologicznymi",
-                120.00,
-                40,
-                "Zabiegi specjalistyczne",
-            ),
-            (
-                "Rekonstrukcja paznokci",
-                "Odbudowa uszkodzonych lub brakujących paznokci",
-                150.00,
-                60,
-                "Zabiegi specjalistyczne",
-            ),
-            (
-                "Badanie mykologiczne",
-                "Diagnostyka grzybicy paznokci i stóp",
-                150.00,
-                30,
-                "Zabiegi specjalistyczne",
-            ),
-            # KOREKCJA I ORTOPEDIA
-            (
-                "Podcięcie elementu wrastającego + opatrunek",
-                "Leczenie wrastających paznokci z opatrunkiem",
-                150.00,
-                45,
-                "Korekcja i ortopedia",
-            ),
-            (
-                "Założenie klamry korygującej",
-                "Bezbolesne leczenie wrastających paznokci metodą klamrową",
-                200.00,
-                60,
-                "Korekcja i ortopedia",
-            ),
-            (
-                "Przełożenie klamry",
-                "Przełożenie klamry korygującej",
-                150.00,
-                45,
-                "Korekcja i ortopedia",
-            ),
-            (
-                "Tamponada",
-                "Metoda leczenia wrastających paznokci z użyciem tamponady",
-                0.00,
-                30,
-                "Korekcja i ortopedia",
-            ),
-            (
-                "Orteza",
-                "Korekcja kształtu paznokci za pomocą specjalnych ortez",
-                0.00,
-                60,
-                "Korekcja i ortopedia",
-            ),
-            (
-                "Separator palców",
-                "Korekcja ustawienia palców stóp",
-                0.00,
-                30,
-                "Korekcja i ortopedia",
-            ),
-            (
-                "Klin silikonowy",
-                "Zastosowanie klinów silikonowych do korekcji",
-                0.00,
-                30,
-                "Korekcja i ortopedia",
-            ),
-            # USŁUGI DODATKOWE
-            (
-                "Taping (kinesiotaping)",
-                "Terapeutyczne oklejanie stóp taśmami kinesio",
-                40.00,
-                30,
-                "Usługi dodatkowe",
-            ),
-            (
-                "Wizyty domowe",
-                "Profesjonalna opieka podologiczna w zaciszu własnego domu (cena dojazdu indywidualna)",
-                0.00,
-                60,
-                "Usługi dodatkowe",
-            ),
-            (
-                "Leczenie onycholizy",
-                "Leczenie odwarstwienia płytki paznokciowej",
-                120.00,
-                45,
-                "Usługi dodatkowe",
-            ),
-        ]
-
-        for name, description, price, duration, category_name in starter_services:
-            service = Service()
-            service.name = name
-            service.description = description
-            service.price = price
-            service.duration_minutes = duration
-            service.category_id = category_map[category_name].id
-            db.session.add(service)
-
-        db.session.commit()
-
-
-@app.route("/", defaults={"path": ""})
-@app.route("/<path:path>")
-def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
-        return "Static folder not configured", 404
-
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, "index.html")
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, "index.html")
-        else:
-            return "index.html not found", 404
+    # Profil wydajności SQLite, stosowany przy każdym nowym połączeniu
+    config["SQLITE_JOURNAL_MODE"] = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+    config["SQLITE_SYNCHRONOUS"] = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+    config["SQLITE_BUSY_TIMEOUT_MS"] = int(
+        os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000")
+    )
+    config["SQLITE_MMAP_SIZE"] = int(os.environ.get("SQLITE_MMAP_SIZE", "268435456"))
+    config["SQLITE_CACHE_SIZE"] = int(os.environ.get("SQLITE_CACHE_SIZE", "-16000"))
+    config["SQLITE_TEMP_STORE"] = os.environ.get("SQLITE_TEMP_STORE", "MEMORY")
+    config["SQLITE_FOREIGN_KEYS"] = (
+        os.environ.get("SQLITE_FOREIGN_KEYS", "true").lower() == "true"
+    )
+
+    # Pomiary żądań: nagłówek Server-Timing i log wolnych zapytań SQL
+    # (SLOW_QUERY_MS=0 wyłącza log)
+    config["SERVER_TIMING"] = (
+        os.environ.get("SERVER_TIMING", "true").lower() == "true"
+    )
+    config["SLOW_QUERY_MS"] = float(os.environ.get("SLOW_QUERY_MS", "100"))
+
+    # Schemat, migracje i dane startowe przy `python app.py`
+    # (false = tylko ręcznie: flask init-db)
+    config["DB_AUTO_MIGRATE"] = (
+        os.environ.get("DB_AUTO_MIGRATE", "true").lower() == "true"
+    )
+    return config
+
+
+def create_app(config: Mapping[str, Any] | None = None) -> Flask:
+    """
+    Tworzy i konfiguruje aplikację.
+
+    Nie wykonuje żadnych zapytań SQL: schemat, migracje i dane startowe
+    przygotowuje `init_database()` (polecenie `flask init-db`), a połączenia
+    z bazą otwierane są dopiero przy pierwszym żądaniu.
+
+    Args:
+        config: wartości nadpisujące konfigurację ze zmiennych środowiskowych
+    """
+    app = Flask(__name__, static_folder=STATIC_FOLDER)
+    app.config.update(load_config())
+    if config:
+        app.config.update(config)
+
+    # Stan należący do aplikacji (app.extensions), a nie do modułu:
+    # kilka aplikacji w jednym procesie (np. testy) go nie współdzieli
+    app.extensions["smtp_pool"] = SMTPConnectionPool(
+        max_idle=app.config["MAIL_POOL_SIZE"],
+        idle_timeout=app.config["MAIL_POOL_IDLE_TIMEOUT"],
+        noop_interval=app.config["MAIL_POOL_NOOP_INTERVAL"],
+    )
+    app.extensions["email_templates"] = TemplateRegistry(TEMPLATE_SOURCES)
+    app.extensions["outbox_workers"] = OutboxWorkerPool()
+    app.extensions["settings_cache"] = SettingsCache()
+    app.extensions["catalog_cache"] = CatalogCache()
+    app.extensions["availability_cache"] = AvailabilityCache(
+        max_entries=app.config["AVAILABILITY_CACHE_SIZE"],
+        ttl=app.config["AVAILABILITY_CACHE_TTL"],
+    )
+    static_manifest = StaticManifest(
+        max_age=app.config["STATIC_MAX_AGE"],
+        immutable_max_age=app.config["STATIC_IMMUTABLE_MAX_AGE"],
+    )
+    static_manifest.load(app.static_folder)
+    app.extensions["static_manifest"] = static_manifest
+
+    Mail(app)
+    # Włączenie CORS dla wszystkich tras
+    CORS(app)
+
+    slow_query_ms = app.config["SLOW_QUERY_MS"]
+    install_request_metrics(
+        app,
+        RequestMetrics(
+            slow_query_seconds=slow_query_ms / 1000 if slow_query_ms > 0 else None,
+            server_timing=app.config["SERVER_TIMING"],
+        ),
+    )
+    db.init_app(app)
+    with app.app_context():
+        # Rejestruje pragmy dla nowych połączeń; samo nie łączy się z bazą
+        install_sqlite_pragmas(db.engine, sqlite_pragmas(app.config))
+
+    app.register_blueprint(user_bp, url_prefix="/api")
+    app.register_blueprint(appointment_bp, url_prefix="/api")
+    app.register_blueprint(service_bp, url_prefix="/api")
+    app.register_blueprint(admin_bp, url_prefix="/api")
+    app.register_blueprint(settings_bp, url_prefix="/api")
+
+    app.add_url_rule("/", "serve", serve_spa, defaults={"path": ""})
+    app.add_url_rule("/<path:path>", "serve", serve_spa)
+
+    app.cli.add_command(outbox_cli)
+    app.cli.add_command(stats_cli)
+    app.cli.add_command(db_cli)
+    app.cli.add_command(appointments_cli)
+    app.cli.add_command(static_cli)
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(seed_command)
+
+    return app
+
+
+app = create_app()
 
 
 if __name__ == "__main__":
+    if app.config["DB_AUTO_MIGRATE"]:
+        with app.app_context():
+            init_database()
+
     debug_env = os.environ.get("DEBUG", "True")
     debug_bool = str(debug_env).lower() in ("1", "true", "yes")
+    # W trybie debug żądania obsługuje proces potomny przeładowania
+    if not debug_bool or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_outbox_workers(app)
     app.run(
         host=os.environ.get("HOST", "0.0.0.0"),
         port=int(os.environ.get("PORT", 5000)),
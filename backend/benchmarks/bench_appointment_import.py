@@ -0,0 +1,161 @@
+"""Przepustowość importu i eksportu rezerwacji (CSV i NDJSON).
+
+Plik z rezerwacjami generowany jest w pamięci i importowany do świeżej bazy
+w katalogu tymczasowym (z profilem pragm aplikacji), a następnie
+eksportowany z powrotem. Dla porównania mierzony jest też zapis tych
+samych wierszy pojedynczo przez ORM (jedna transakcja na wiersz).
+
+Uruchomienie (z katalogu backend):
+    python benchmarks/bench_appointment_import.py [liczba_wierszy]
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from decimal import Decimal
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+
+from app import create_app  # noqa: E402
+from src.models import Appointment, Service, ServiceCategory, db  # noqa: E402
+from src.utils.appointment_transfer import (  # noqa: E402
+    EXPORT_COLUMNS,
+    ImportReport,
+    export_appointments,
+    import_appointments,
+)
+
+SERVICES = ["Konsultacja podologiczna", "Orteza", "Usunięcie odcisku"]
+STATUSES = ["pending", "confirmed", "cancelled"]
+
+
+def make_app(path: str) -> Flask:
+    # Aplikacja jak na produkcji (stan w app.extensions, pragmy SQLite),
+    # ale na bazie tymczasowej i bez logu wolnych zapytań
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "EMAIL_OUTBOX_IN_PROCESS": False,
+            "SLOW_QUERY_MS": 0,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        db.session.execute(db.insert(ServiceCategory), [{"id": 1, "name": "Zabiegi"}])
+        db.session.execute(
+            db.insert(Service),
+            [
+                {
+                    "name": name,
+                    "price": Decimal("150.00"),
+                    "is_active": True,
+                    "category_id": 1,
+                }
+                for name in SERVICES
+            ],
+        )
+        db.session.commit()
+    return app
+
+
+def make_records(count: int) -> list[dict[str, str]]:
+    start = datetime(2020, 1, 1, 8, 0)
+    records = []
+    for i in range(count):
+        moment = start + timedelta(minutes=30 * i)
+        records.append(
+            {
+                "name": f"Pacjent {i}",
+                "email": f"pacjent{i}@example.com",
+                "phone": "123 456 789",
+                "service": SERVICES[i % len(SERVICES)],
+                "date": moment.date().isoformat(),
+                "time": moment.strftime("%H:%M"),
+                "status": STATUSES[i % len(STATUSES)],
+                "message": "Wizyta kontrolna" if i % 3 else "",
+            }
+        )
+    return records
+
+
+def encode(records: list[dict[str, str]], fmt: str) -> bytes:
+    if fmt == "ndjson":
+        return b"".join(json.dumps(record).encode() + b"\n" for record in records)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(records[0]))
+    writer.writeheader()
+    writer.writerows(records)
+    return buffer.getvalue().encode()
+
+
+def bench_import(records: list[dict[str, str]], fmt: str) -> None:
+    payload = encode(records, fmt)
+    with tempfile.TemporaryDirectory() as directory:
+        app = make_app(os.path.join(directory, "bench.db"))
+        with app.app_context():
+            report = ImportReport()
+            started = perf_counter()
+            import_appointments(io.BytesIO(payload), fmt, report)
+            elapsed = perf_counter() - started
+            per_minute = report.imported / elapsed * 60
+            print(
+                f"  import {fmt:<6} {report.imported:>7} wierszy  {elapsed:6.2f} s  "
+                f"{per_minute:>10,.0f} wierszy/min"
+            )
+
+            started = perf_counter()
+            size = sum(len(chunk) for chunk in export_appointments(fmt))
+            elapsed = perf_counter() - started
+            megabytes = size / 1024 / 1024
+            per_minute = report.imported / elapsed * 60
+            print(
+                f"  eksport {fmt:<6} {megabytes:7.1f} MB     {elapsed:6.2f} s  "
+                f"{per_minute:>10,.0f} wierszy/min"
+            )
+
+
+def bench_single_rows(records: list[dict[str, str]]) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        app = make_app(os.path.join(directory, "bench.db"))
+        with app.app_context():
+            started = perf_counter()
+            for record in records:
+                moment = datetime.fromisoformat(f"{record['date']}T{record['time']}")
+                db.session.add(
+                    Appointment(
+                        name=record["name"],
+                        email=record["email"],
+                        phone=record["phone"],
+                        service=record["service"],
+                        appointment_date=moment,
+                        status=record["status"],
+                    )
+                )
+                db.session.commit()
+            elapsed = perf_counter() - started
+            print(
+                f"  pojedynczo (ORM)  {len(records):>7} wierszy  {elapsed:6.2f} s  "
+                f"{len(records) / elapsed * 60:>10,.0f} wierszy/min"
+            )
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    records = make_records(count)
+    print(f"Wiersze: {count}, kolumny eksportu: {len(EXPORT_COLUMNS)}")
+    for fmt in ("csv", "ndjson"):
+        bench_import(records, fmt)
+    bench_single_rows(records[: min(count, 2000)])
+
+
+if __name__ == "__main__":
+    main()
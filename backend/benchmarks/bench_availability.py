@@ -0,0 +1,190 @@
+"""Czas wyliczania wolnych terminów dla wybranej usługi (`service_id`).
+
+Baza w katalogu tymczasowym (z profilem pragm aplikacji) wypełniana jest
+rezerwacjami rozłożonymi równomiernie na `dni_historii` wstecz i 90 dni
+naprzód, z usługami o różnej długości. Domyślnie 100 tys. rezerwacji na
+10 lat daje ok. 27 wizyt dziennie; krótsza historia zagęszcza okno
+(np. 730 dni: ok. 120 wizyt dziennie, kalendarz w pełni zajęty).
+
+Mierzone jest pełne wyliczenie okna 90 dni z krokiem 15 minut (bez pamięci
+podręcznej): indeks zajętości z jednego zapytania (`load_busy_intervals`)
+i przegląd kandydatów (`compute_service_slots`). Osobno mierzony jest
+odczyt okna z pamięci podręcznej, który kosztuje zapytanie o wersje dni
+(`load_day_versions`).
+
+Uruchomienie (z katalogu backend):
+    python benchmarks/bench_availability.py [rezerwacje] [pomiary] [dni_historii]
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+
+from app import create_app  # noqa: E402
+from src.models import Appointment, Service, ServiceCategory, db  # noqa: E402
+from src.utils.availability import (  # noqa: E402
+    compute_service_slots,
+    get_availability_cache,
+    load_busy_intervals,
+    load_day_versions,
+)
+
+DAYS = 90
+GRANULARITY = 15
+DURATIONS = (30, 45, 60, 90)
+STATUSES = ("pending", "confirmed", "cancelled")
+
+
+def make_app(path: str) -> Flask:
+    # Aplikacja jak na produkcji (stan w app.extensions, pragmy SQLite),
+    # ale na bazie tymczasowej i bez logu wolnych zapytań
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "EMAIL_OUTBOX_IN_PROCESS": False,
+            "SLOW_QUERY_MS": 0,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def seed(count: int, start_date: date, history_days: int) -> None:
+    db.session.execute(db.insert(ServiceCategory), [{"id": 1, "name": "Zabiegi"}])
+    db.session.execute(
+        db.insert(Service),
+        [
+            {
+                "id": index + 1,
+                "name": f"Usługa {minutes} min",
+                "price": Decimal("150.00"),
+                "duration_minutes": minutes,
+                "is_active": True,
+                "category_id": 1,
+            }
+            for index, minutes in enumerate(DURATIONS)
+        ],
+    )
+
+    generator = random.Random(42)
+    first_day = start_date - timedelta(days=history_days)
+    span = (start_date + timedelta(days=DAYS) - first_day).days
+    rows = []
+    for i in range(count):
+        day = first_day + timedelta(days=generator.randrange(span))
+        # Godziny pracy 9:00-18:00 w siatce 15 minut
+        minute = 9 * 60 + 15 * generator.randrange(36)
+        service_id = generator.randrange(len(DURATIONS)) + 1
+        rows.append(
+            {
+                "name": f"Pacjent {i}",
+                "email": f"pacjent{i}@example.com",
+                "phone": "123 456 789",
+                "service": f"Usługa {DURATIONS[service_id - 1]} min",
+                "service_id": service_id,
+                "appointment_date": datetime.combine(day, time.min)
+                + timedelta(minutes=minute),
+                "status": STATUSES[i % len(STATUSES)],
+            }
+        )
+    db.session.execute(db.insert(Appointment.__table__), rows)
+    db.session.commit()
+
+
+def measure(runs: int, action) -> tuple[float, float]:
+    timings = []
+    for _ in range(runs):
+        started = perf_counter()
+        action()
+        timings.append((perf_counter() - started) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    history_days = int(sys.argv[3]) if len(sys.argv) > 3 else 3650
+    start_date = date.today() + timedelta(days=1)
+    window_start = datetime.combine(start_date, time.min)
+    window_end = window_start + timedelta(days=DAYS)
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = make_app(os.path.join(directory, "bench.db"))
+        with app.app_context():
+            seed(count, start_date, history_days)
+            # Statystyki indeksów, jak po migracjach w `flask init-db`
+            db.session.execute(db.text("ANALYZE"))
+            in_window = db.session.execute(
+                db.select(db.func.count(Appointment.id)).where(
+                    Appointment.appointment_date >= window_start,
+                    Appointment.appointment_date < window_end,
+                )
+            ).scalar()
+            print(
+                f"Rezerwacje: {count} (w oknie {DAYS} dni: {in_window}), "
+                f"krok {GRANULARITY} min, {runs} pomiarów"
+            )
+
+            for minutes in DURATIONS:
+                slots = compute_service_slots(start_date, DAYS, minutes, GRANULARITY)
+                median, worst = measure(
+                    runs,
+                    lambda: compute_service_slots(
+                        start_date, DAYS, minutes, GRANULARITY
+                    ),
+                )
+                print(
+                    f"  usługa {minutes:>2} min  {len(slots):>5} terminów  "
+                    f"mediana {median:6.1f} ms  maks. {worst:6.1f} ms"
+                )
+
+            median, worst = measure(
+                runs, lambda: load_busy_intervals(window_start, window_end)
+            )
+            print(
+                f"  w tym load_busy_intervals  mediana {median:6.1f} ms  "
+                f"maks. {worst:6.1f} ms"
+            )
+
+            cache = get_availability_cache()
+
+            def cached_window() -> list[dict[str, str]]:
+                return cache.get_window(
+                    (1, GRANULARITY),
+                    start_date,
+                    DAYS,
+                    lambda start, days: compute_service_slots(
+                        start, days, DURATIONS[0], GRANULARITY
+                    ),
+                    versions=load_day_versions,
+                )
+
+            cached_window()
+            median, worst = measure(runs, cached_window)
+            print(
+                f"  z pamięci podręcznej (wersje dni)  mediana {median:6.1f} ms  "
+                f"maks. {worst:6.1f} ms"
+            )
+            median, worst = measure(
+                runs, lambda: load_day_versions(start_date, DAYS)
+            )
+            print(
+                f"  w tym load_day_versions  mediana {median:6.1f} ms  "
+                f"maks. {worst:6.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Porównanie renderowania powiadomień: render_template_string vs rejestr szablonów.
+
+Uruchomienie (z katalogu backend):
+    python benchmarks/bench_email_templates.py [liczba_wiadomości]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, render_template_string  # noqa: E402
+
+from app import create_app  # noqa: E402
+from src.models import db  # noqa: E402
+from src.utils.email_templates import (  # noqa: E402
+    APPOINTMENT_NOTIFICATION_HTML,
+    TEMPLATE_SOURCES,
+    get_email_templates,
+)
+from src.utils.email_utils import appointment_notification_context  # noqa: E402
+
+
+def make_app() -> Flask:
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "EMAIL_OUTBOX_IN_PROCESS": False,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    contexts = [
+        appointment_notification_context(
+            {
+                "name": f"Pacjent {i}",
+                "email": f"pacjent{i}@example.com",
+                "phone": "123 456 789",
+                "service": "Konsultacja podologiczna",
+                "appointment_date": "2026-01-01T10:00:00",
+                "message": "Proszę o kontakt" if i % 2 else "",
+            }
+        )
+        for i in range(count)
+    ]
+    source = TEMPLATE_SOURCES[APPOINTMENT_NOTIFICATION_HTML]
+
+    app = make_app()
+    with app.app_context():
+        start = perf_counter()
+        for context in contexts:
+            # Dotychczasowa ścieżka: kompilacja źródła przy każdym wywołaniu
+            render_template_string(source, clinic_name="Gabinet", **context)
+        per_call = perf_counter() - start
+
+        email_templates = get_email_templates()
+        start = perf_counter()
+        for context in contexts:
+            email_templates.render(APPOINTMENT_NOTIFICATION_HTML, context)
+        registry = perf_counter() - start
+
+        start = perf_counter()
+        email_templates.render_many(APPOINTMENT_NOTIFICATION_HTML, contexts)
+        batch = perf_counter() - start
+
+    print(f"Wiadomości: {count}")
+    print(f"render_template_string:  {per_call * 1000:8.1f} ms")
+    print(f"rejestr, render():       {registry * 1000:8.1f} ms")
+    print(f"rejestr, render_many():  {batch * 1000:8.1f} ms")
+    print(f"Przyspieszenie (batch):  {per_call / batch:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
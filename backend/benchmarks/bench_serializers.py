@@ -0,0 +1,151 @@
+"""Porównanie serializacji list: ORM + to_dict() + jsonify vs projekcja kolumn.
+
+Uruchomienie (z katalogu backend):
+    python benchmarks/bench_serializers.py [liczba_wierszy ...]
+
+Domyślnie mierzy 10 000 i 100 000 wierszy.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify  # noqa: E402
+
+from app import create_app  # noqa: E402
+from src.models import Appointment, Service, ServiceCategory, db  # noqa: E402
+from src.utils.serializers import (  # noqa: E402
+    APPOINTMENT_PROJECTION,
+    SERVICE_PROJECTION,
+    fetch_rows,
+    json_response,
+    orjson,
+)
+
+
+def make_app(count: int) -> Flask:
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "EMAIL_OUTBOX_IN_PROCESS": False,
+            "SLOW_QUERY_MS": 0,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        start = datetime(2026, 1, 1, 9, 0)
+        db.session.execute(
+            db.insert(Appointment),
+            [
+                {
+                    "name": f"Pacjent {i}",
+                    "email": f"pacjent{i}@example.com",
+                    "phone": "123 456 789",
+                    "service": "Konsultacja podologiczna",
+                    "appointment_date": start + timedelta(minutes=30 * i),
+                    "message": "Proszę o kontakt" if i % 2 else None,
+                    "status": "pending",
+                    "created_at": start,
+                }
+                for i in range(count)
+            ],
+        )
+        db.session.execute(
+            db.insert(ServiceCategory),
+            [{"name": f"Kategoria {i}", "created_at": start} for i in range(10)],
+        )
+        db.session.execute(
+            db.insert(Service),
+            [
+                {
+                    "name": f"Usługa {i}",
+                    "price": Decimal("150.00"),
+                    "duration_minutes": 60,
+                    "is_active": True,
+                    "category_id": i % 10 + 1,
+                    "created_at": start,
+                    "updated_at": start,
+                }
+                for i in range(count // 10)
+            ],
+        )
+        db.session.commit()
+    return app
+
+
+def measure(label: str, run) -> float:
+    start = perf_counter()
+    size = len(run())
+    elapsed = perf_counter() - start
+    print(f"  {label:<32} {elapsed * 1000:9.1f} ms  ({size / 1e6:.1f} MB)")
+    return elapsed
+
+
+def main() -> None:
+    counts = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    print(f"Koder JSON: {'orjson' if orjson is not None else 'Flask (json)'}")
+
+    for count in counts:
+        app = make_app(count)
+        with app.test_request_context():
+            appointment_order = (
+                Appointment.appointment_date.desc(),
+                Appointment.id.desc(),
+            )
+            fields = APPOINTMENT_PROJECTION.resolve()
+            serialize = APPOINTMENT_PROJECTION.serializer(fields)
+            statement = APPOINTMENT_PROJECTION.select(fields).order_by(
+                *appointment_order
+            )
+
+            print(f"Rezerwacje: {count}")
+            orm = measure(
+                "ORM + to_dict() + jsonify",
+                lambda: jsonify(
+                    [
+                        a.to_dict()
+                        for a in Appointment.query.order_by(*appointment_order)
+                    ]
+                ).get_data(),
+            )
+            projected = measure(
+                "projekcja + json_response",
+                lambda: json_response(
+                    [serialize(row) for row in fetch_rows(statement)]
+                ).get_data(),
+            )
+            print(f"  {'Przyspieszenie':<32} {orm / projected:9.1f}x")
+
+            fields = SERVICE_PROJECTION.resolve()
+            serialize = SERVICE_PROJECTION.serializer(fields)
+            statement = SERVICE_PROJECTION.select(fields).order_by(Service.name)
+
+            print(f"Usługi z kategorią: {count // 10}")
+            orm = measure(
+                "ORM + to_dict() + jsonify",
+                lambda: jsonify(
+                    [
+                        s.to_dict()
+                        for s in Service.query.options(
+                            db.joinedload(Service.category)
+                        ).order_by(Service.name)
+                    ]
+                ).get_data(),
+            )
+            projected = measure(
+                "projekcja + json_response",
+                lambda: json_response(
+                    [serialize(row) for row in fetch_rows(statement)]
+                ).get_data(),
+            )
+            print(f"  {'Przyspieszenie':<32} {orm / projected:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
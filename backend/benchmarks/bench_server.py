@@ -0,0 +1,158 @@
+"""Przepustowość serwera deweloperskiego i produkcyjnego (gunicorn, waitress).
+
+Każdy serwer uruchamiany jest jako osobny proces na kopii bazy przygotowanej
+poleceniem `flask init-db`, a następnie obciążany przez klientów HTTP
+(wątki z połączeniami keep-alive) na `/api/services` i
+`/api/available-slots`. Serwery, których pakiet nie jest zainstalowany,
+są pomijane. Klienci działają na tej samej maszynie, więc wyniki służą do
+porównania serwerów między sobą, a nie jako pomiar bezwzględny.
+
+Uruchomienie (z katalogu backend):
+    python benchmarks/bench_server.py [sekundy_na_pomiar] [liczba_klientów]
+"""
+
+from __future__ import annotations
+
+import http.client
+import importlib.util
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from time import perf_counter
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOST = "127.0.0.1"
+PORT = 5099
+PATHS = ("/api/services", "/api/available-slots")
+
+SERVERS = {
+    "dev (app.run)": [sys.executable, "app.py"],
+    "waitress": [sys.executable, "wsgi.py"],
+    "gunicorn": [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+}
+
+
+def available(name: str) -> bool:
+    if name == "waitress":
+        return importlib.util.find_spec("waitress") is not None
+    if name == "gunicorn":
+        # gunicorn nie działa na Windows
+        return os.name == "posix" and importlib.util.find_spec("gunicorn") is not None
+    return True
+
+
+def wait_until_ready(process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Serwer zakończył działanie przed startem")
+        try:
+            connection = http.client.HTTPConnection(HOST, PORT, timeout=1)
+            connection.request("GET", "/api/admin/health")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Serwer nie wystartował")
+
+
+def load(path: str, seconds: float, clients: int) -> tuple[int, list[float]]:
+    """Wysyła żądania przez `seconds` sekund; zwraca (błędy, czasy w ms)."""
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def client() -> None:
+        nonlocal errors
+        local: list[float] = []
+        failed = 0
+        connection = http.client.HTTPConnection(HOST, PORT, timeout=10)
+        while time.monotonic() < deadline:
+            started = perf_counter()
+            try:
+                connection.request("GET", path)
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                connection = http.client.HTTPConnection(HOST, PORT, timeout=10)
+                continue
+            local.append((perf_counter() - started) * 1000)
+        connection.close()
+        with lock:
+            latencies.extend(local)
+            errors += failed
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors, latencies
+
+
+def bench_server(name: str, env: dict[str, str], seconds: float, clients: int) -> None:
+    process = subprocess.Popen(
+        SERVERS[name],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_ready(process)
+        for path in PATHS:
+            load(path, 1.0, clients)  # rozgrzanie cache i połączeń
+            errors, latencies = load(path, seconds, clients)
+            latencies.sort()
+            p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0.0
+            print(
+                f"  {name:<14} {path:<22} {len(latencies) / seconds:8.0f} req/s  "
+                f"p50 {statistics.median(latencies or [0]):6.1f} ms  "
+                f"p99 {p99:6.1f} ms  błędy {errors}"
+            )
+    finally:
+        process.terminate()
+        process.wait(30)
+
+
+def main() -> None:
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{os.path.join(directory, 'app.db')}",
+            "DB_AUTO_MIGRATE": "false",
+            "EMAIL_OUTBOX_IN_PROCESS": "false",
+            "DEBUG": "false",
+            "HOST": HOST,
+            "PORT": str(PORT),
+        }
+        subprocess.run(
+            [sys.executable, "-m", "flask", "--app", "app", "init-db"],
+            cwd=BACKEND_DIR,
+            env=env,
+            check=True,
+            capture_output=True,
+        )
+
+        print(f"CPU: {os.cpu_count()}, klienci: {clients}, {seconds:.0f} s na pomiar")
+        for name in SERVERS:
+            if not available(name):
+                print(f"  {name:<14} pominięty (pakiet nie jest zainstalowany)")
+                continue
+            bench_server(name, env, seconds, clients)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Przepustowość odczytów i zapisów SQLite z wielu wątków: domyślne pragmy vs profil.
+
+Każdy wariant działa na świeżej bazie w katalogu tymczasowym. Wątki piszące
+dodają rezerwacje w krótkich transakcjach, wątki czytające pobierają
+stronę listy rezerwacji. Zliczane są też błędy "database is locked".
+
+Uruchomienie (z katalogu backend):
+    python benchmarks/bench_sqlite_concurrency.py [sekundy] [piszący] [czytający]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from src.models import Appointment, db  # noqa: E402
+from src.utils.sqlite_tuning import (  # noqa: E402
+    install_sqlite_pragmas,
+    read_sqlite_pragmas,
+    sqlite_pragmas,
+)
+
+# Ustawienia odpowiadające zachowaniu sprzed wprowadzenia profilu
+LEGACY_CONFIG = {
+    "SQLITE_JOURNAL_MODE": "DELETE",
+    "SQLITE_SYNCHRONOUS": "FULL",
+    "SQLITE_BUSY_TIMEOUT_MS": 5000,
+    "SQLITE_MMAP_SIZE": 0,
+    "SQLITE_CACHE_SIZE": -2000,
+    "SQLITE_TEMP_STORE": "DEFAULT",
+    "SQLITE_FOREIGN_KEYS": False,
+}
+
+
+def make_engine(path: str, config: dict) -> Engine:
+    engine = create_engine(f"sqlite:///{path}", pool_size=16)
+    install_sqlite_pragmas(engine, sqlite_pragmas(config))
+    db.metadata.create_all(engine)
+    start = datetime(2026, 1, 1, 9, 0)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(Appointment),
+            [
+                {
+                    "name": f"Pacjent {i}",
+                    "email": f"pacjent{i}@example.com",
+                    "service": "Konsultacja podologiczna",
+                    "appointment_date": start + timedelta(minutes=30 * i),
+                    "status": "pending",
+                }
+                for i in range(5000)
+            ],
+        )
+    return engine
+
+
+def run(engine: Engine, seconds: float, writers: int, readers: int) -> dict:
+    stop = threading.Event()
+    counts = {"writes": 0, "reads": 0, "locked": 0}
+    lock = threading.Lock()
+    page = (
+        select(Appointment.id, Appointment.name, Appointment.appointment_date)
+        .order_by(Appointment.appointment_date.desc(), Appointment.id.desc())
+        .limit(50)
+    )
+
+    def writer(index: int) -> None:
+        done = locked = 0
+        moment = datetime(2027, 1, 1) + timedelta(days=index * 1000)
+        while not stop.is_set():
+            try:
+                with engine.begin() as connection:
+                    connection.execute(
+                        insert(Appointment).values(
+                            name="Nowy pacjent",
+                            email="nowy@example.com",
+                            service="Konsultacja podologiczna",
+                            appointment_date=moment + timedelta(minutes=done),
+                            status="pending",
+                        )
+                    )
+                done += 1
+            except OperationalError:
+                locked += 1
+        with lock:
+            counts["writes"] += done
+            counts["locked"] += locked
+
+    def reader() -> None:
+        done = locked = 0
+        while not stop.is_set():
+            try:
+                with engine.connect() as connection:
+                    connection.execute(page).all()
+                done += 1
+            except OperationalError:
+                locked += 1
+        with lock:
+            counts["reads"] += done
+            counts["locked"] += locked
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    started = perf_counter()
+    for thread in threads:
+        thread.start()
+    stop.wait(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = perf_counter() - started
+
+    return {
+        "writes/s": counts["writes"] / elapsed,
+        "reads/s": counts["reads"] / elapsed,
+        "locked": counts["locked"],
+    }
+
+
+def main() -> None:
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    writers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    readers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    print(f"Wątki: {writers} piszących, {readers} czytających, {seconds:.0f} s")
+
+    variants = [("domyślne pragmy", LEGACY_CONFIG), ("profil aplikacji", {})]
+    for label, config in variants:
+        with tempfile.TemporaryDirectory() as directory:
+            engine = make_engine(os.path.join(directory, "bench.db"), config)
+            pragmas = read_sqlite_pragmas(engine)
+            result = run(engine, seconds, writers, readers)
+            engine.dispose()
+
+        print(
+            f"  {label:<18} journal={pragmas['journal_mode']:<7} "
+            f"zapisy {result['writes/s']:8.0f}/s  "
+            f"odczyty {result['reads/s']:8.0f}/s  "
+            f"zablokowane {result['locked']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
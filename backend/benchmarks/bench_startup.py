@@ -0,0 +1,135 @@
+"""Czas startu aplikacji: import `app.py` (z `create_app()`) i pierwsze żądanie.
+
+Każdy pomiar uruchamiany jest w nowym procesie Pythona, na kopii bazy
+przygotowanej wcześniej poleceniem `flask init-db`. Import bibliotek
+(Flask, SQLAlchemy) mierzony jest osobno, bo nie zależy od aplikacji.
+
+Cel `TARGET_MS` dotyczy części zależnej od aplikacji: importu `app.py`
+i pierwszego żądania ("app razem"), bez startu interpretera i importu
+bibliotek. Czas całego procesu, od uruchomienia do odpowiedzi na pierwsze
+żądanie, jest podawany obok. Skrypt kończy się błędem, gdy mediana
+"app razem" przekracza cel albo gdy import aplikacji wykonał polecenie SQL.
+
+Uruchomienie (z katalogu backend):
+    python benchmarks/bench_startup.py [liczba_pomiarów]
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import app.py i pierwsze żądanie, bez importu bibliotek
+TARGET_MS = 150.0
+
+# Kod wykonywany w procesie potomnym
+PROBE = """
+import json, sys
+from time import perf_counter
+
+started = perf_counter()
+import flask, flask_cors, flask_mail, flask_sqlalchemy, sqlalchemy.orm
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+libraries = perf_counter()
+
+statements = []
+event.listen(
+    Engine, "before_cursor_execute", lambda *args: statements.append(args[2])
+)
+
+import app as module
+
+imported = perf_counter()
+import_statements = list(statements)
+response = module.app.test_client().get(sys.argv[1])
+finished = perf_counter()
+
+print(json.dumps({
+    "libraries_ms": (libraries - started) * 1000,
+    "import_ms": (imported - libraries) * 1000,
+    "first_request_ms": (finished - imported) * 1000,
+    "status": response.status_code,
+    "import_sql": import_statements,
+}))
+"""
+
+
+def probe(env: dict[str, str], path: str) -> dict:
+    started = perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, path],
+        cwd=BACKEND_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    # Od uruchomienia procesu do odpowiedzi na pierwsze żądanie
+    result["process_ms"] = (perf_counter() - started) * 1000
+    return result
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{os.path.join(directory, 'app.db')}",
+            "EMAIL_OUTBOX_IN_PROCESS": "false",
+        }
+        subprocess.run(
+            [sys.executable, "-m", "flask", "--app", "app", "init-db"],
+            cwd=BACKEND_DIR,
+            env=env,
+            check=True,
+            capture_output=True,
+        )
+
+        over_target = []
+        for path in ("/api/services", "/api/available-slots"):
+            results = [probe(env, path) for _ in range(runs)]
+            leaked = [result for result in results if result["import_sql"]]
+            if leaked:
+                print(f"Import aplikacji wykonał SQL: {leaked[0]['import_sql']}")
+                raise SystemExit(1)
+
+            libraries_ms = statistics.median(r["libraries_ms"] for r in results)
+            import_ms = statistics.median(r["import_ms"] for r in results)
+            request_ms = statistics.median(r["first_request_ms"] for r in results)
+            app_ms = statistics.median(
+                r["import_ms"] + r["first_request_ms"] for r in results
+            )
+            process_ms = statistics.median(r["process_ms"] for r in results)
+            print(
+                f"{path:<22} biblioteki {libraries_ms:6.1f} ms  "
+                f"import app {import_ms:6.1f} ms  "
+                f"pierwsze żądanie {request_ms:6.1f} ms  "
+                f"app razem {app_ms:6.1f} ms  "
+                f"proces razem {process_ms:6.1f} ms"
+            )
+            if app_ms > TARGET_MS:
+                over_target.append(path)
+
+        print(f"Mediany z {runs} pomiarów; import aplikacji nie wykonał SQL")
+        if over_target:
+            print(
+                f"Cel {TARGET_MS:.0f} ms (app razem) przekroczony: "
+                + ", ".join(over_target)
+            )
+            raise SystemExit(1)
+        print(f"Cel {TARGET_MS:.0f} ms (app razem, bez importu bibliotek) spełniony")
+
+
+if __name__ == "__main__":
+    main()
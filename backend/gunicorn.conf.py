@@ -0,0 +1,75 @@
+"""
+Konfiguracja gunicorn dla wdrożenia produkcyjnego.
+
+Uruchomienie (z katalogu backend):
+    gunicorn -c gunicorn.conf.py
+
+Aplikacja ładowana jest raz w procesie głównym (`preload_app`), który
+przygotowuje bazę (`init_database()`) i dopiero potem tworzy procesy
+robocze. Każdy proces roboczy porzuca połączenia odziedziczone po
+procesie głównym i otwiera własne.
+
+Sygnały procesu głównego:
+    HUP          łagodny restart procesów roboczych (nowa konfiguracja,
+                 ten sam kod: aplikacja jest załadowana w procesie głównym)
+    USR2, WINCH  wdrożenie nowego kodu bez przerwy: USR2 uruchamia nowy
+                 proces główny, WINCH zatrzymuje procesy robocze starego,
+                 a QUIT kończy stary proces główny
+    TERM         łagodne zatrzymanie (czeka `graceful_timeout` sekund)
+"""
+
+import os
+import sys
+
+# gunicorn wczytuje ten plik, zanim doda katalog roboczy do sys.path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.utils.server_tuning import server_threads, server_workers
+
+wsgi_app = "wsgi:app"
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', '5000')}"
+
+workers = server_workers()
+threads = server_threads()
+worker_class = "gthread"
+preload_app = True
+
+timeout = int(os.environ.get("SERVER_TIMEOUT", "30"))
+graceful_timeout = int(os.environ.get("SERVER_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.environ.get("SERVER_KEEPALIVE", "5"))
+
+# Okresowa wymiana procesów roboczych (0 = wyłączona); rozrzut zapobiega
+# jednoczesnemu restartowi wszystkich procesów
+max_requests = int(os.environ.get("SERVER_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+pidfile = os.environ.get("SERVER_PIDFILE") or None
+accesslog = os.environ.get("SERVER_ACCESS_LOG") or None
+
+
+def on_starting(server):
+    """Schemat, migracje i dane startowe raz, przed utworzeniem procesów."""
+    from src.bootstrap import init_database
+    from src.models import db
+
+    app = server.app.wsgi()
+    with app.app_context():
+        if app.config["DB_AUTO_MIGRATE"]:
+            init_database()
+        # Procesy robocze nie mogą dzielić połączeń procesu głównego
+        db.engine.dispose()
+
+
+def post_fork(server, worker):
+    """
+    Porzuca pulę połączeń skopiowaną z procesu głównego i uruchamia
+    wysyłkę emaili w tle (`EMAIL_OUTBOX_IN_PROCESS`).
+    """
+    from src.models import db
+    from src.utils.email_outbox import start_outbox_workers
+
+    app = server.app.wsgi()
+    with app.app_context():
+        # close=False: nie zamyka połączeń, które należą do procesu głównego
+        db.engine.dispose(close=False)
+    start_outbox_workers(app)
@@ -0,0 +1,218 @@
+"""Przygotowanie bazy danych: schemat, migracje i dane startowe."""
+
+from __future__ import annotations
+
+from src.migrations import MigrationRunner
+from src.models import Service, ServiceCategory, db
+from src.utils.stats_counters import rebuild_counters
+
+STARTER_CATEGORIES = [
+    ("Podstawowe zabiegi", "Konsultacje i podstawowa pielęgnacja"),
+    ("Zabiegi specjalistyczne", "Zaawansowane zabiegi korekcyjne"),
+    ("Korekcja i ortopedia", "Wsparcie strukturalne stóp"),
+    ("Usługi dodatkowe", "Uzupełniające terapie i wizyty"),
+]
+
+# Dane zgodne z uslugi-podologiczne.md
+STARTER_SERVICES = [
+    # PODSTAWOWE ZABIEGI
+    (
+        "Konsultacja podologiczna",
+        "Profesjonalna ocena stanu zdrowia stóp i doradztwo",
+        100.00,
+        45,
+        "Podstawowe zabiegi",
+    ),
+    (
+        "Podstawowy zabieg podologiczny",
+        "Kompleksowa pielęgnacja stóp z profesjonalnym podejściem",
+        170.00,
+        75,
+        "Podstawowe zabiegi",
+    ),
+    (
+        "Obcięcie paznokci - zdrowe",
+        "Prawidłowe obcięcie zdrowych paznokci u stóp",
+        100.00,
+        30,
+        "Podstawowe zabiegi",
+    ),
+    (
+        "Obcięcie paznokci - zmienione chorobowo",
+        "Obcięcie paznokci zmienionych chorobowo",
+        150.00,
+        45,
+        "Podstawowe zabiegi",
+    ),
+    (
+        "Pękające pięty",
+        "Leczenie i pielęgnacja pękających pięt",
+        150.00,
+        50,
+        "Podstawowe zabiegi",
+    ),
+    # ZABIEGI SPECJALISTYCZNE
+    (
+        "Usunięcie odcisku",
+        "Bezbolesne usuwanie odcisków z zastosowaniem profesjonalnych narzędzi",
+        100.00,
+        30,
+        "Zabiegi specjalistyczne",
+    ),
+    (
+        "Opracowanie modzeli",
+        "Precyzyjne opracowanie modzeli",
+        130.00,
+        40,
+        "Zabiegi specjalistyczne",
+    ),
+    (
+        "Leczenie brodawek",
+        "Skuteczne leczenie brodawek wirusowych metodami podologicznymi",
+        120.00,
+        40,
+        "Zabiegi specjalistyczne",
+    ),
+    (
+        "Rekonstrukcja paznokci",
+        "Odbudowa uszkodzonych lub brakujących paznokci",
+        150.00,
+        60,
+        "Zabiegi specjalistyczne",
+    ),
+    (
+        "Badanie mykologiczne",
+        "Diagnostyka grzybicy paznokci i stóp",
+        150.00,
+        30,
+        "Zabiegi specjalistyczne",
+    ),
+    # KOREKCJA I ORTOPEDIA
+    (
+        "Podcięcie elementu wrastającego + opatrunek",
+        "Leczenie wrastających paznokci z opatrunkiem",
+        150.00,
+        45,
+        "Korekcja i ortopedia",
+    ),
+    (
+        "Założenie klamry korygującej",
+        "Bezbolesne leczenie wrastających paznokci metodą klamrową",
+        200.00,
+        60,
+        "Korekcja i ortopedia",
+    ),
+    (
+        "Przełożenie klamry",
+        "Przełożenie klamry korygującej",
+        150.00,
+        45,
+        "Korekcja i ortopedia",
+    ),
+    (
+        "Tamponada",
+        "Metoda leczenia wrastających paznokci z użyciem tamponady",
+        0.00,
+        30,
+        "Korekcja i ortopedia",
+    ),
+    (
+        "Orteza",
+        "Korekcja kształtu paznokci za pomocą specjalnych ortez",
+        0.00,
+        60,
+        "Korekcja i ortopedia",
+    ),
+    (
+        "Separator palców",
+        "Korekcja ustawienia palców stóp",
+        0.00,
+        30,
+        "Korekcja i ortopedia",
+    ),
+    (
+        "Klin silikonowy",
+        "Zastosowanie klinów silikonowych do korekcji",
+        0.00,
+        30,
+        "Korekcja i ortopedia",
+    ),
+    # USŁUGI DODATKOWE
+    (
+        "Taping (kinesiotaping)",
+        "Terapeutyczne oklejanie stóp taśmami kinesio",
+        40.00,
+        30,
+        "Usługi dodatkowe",
+    ),
+    (
+        "Wizyty domowe",
+        "Profesjonalna opieka podologiczna w zaciszu własnego domu (cena dojazdu indywidualna)",
+        0.00,
+        60,
+        "Usługi dodatkowe",
+    ),
+    (
+        "Leczenie onycholizy",
+        "Leczenie odwarstwienia płytki paznokciowej",
+        120.00,
+        45,
+        "Usługi dodatkowe",
+    ),
+]
+
+
+def seed_catalog() -> int:
+    """
+    Dodaje startowy katalog usług, jeśli nie ma żadnej kategorii ani usługi.
+    Nie zatwierdza transakcji.
+
+    Returns:
+        Liczba dodanych usług (0, gdy katalog nie był pusty)
+    """
+    has_catalog = db.session.execute(
+        db.select(
+            db.select(ServiceCategory.id).exists() | db.select(Service.id).exists()
+        )
+    ).scalar()
+    if has_catalog:
+        return 0
+
+    category_map: dict[str, ServiceCategory] = {}
+    for name, description in STARTER_CATEGORIES:
+        category = ServiceCategory()
+        category.name = name
+        category.description = description
+        db.session.add(category)
+        category_map[name] = category
+
+    db.session.flush()
+
+    for name, description, price, duration, category_name in STARTER_SERVICES:
+        service = Service()
+        service.name = name
+        service.description = description
+        service.price = price
+        service.duration_minutes = duration
+        service.category_id = category_map[category_name].id
+        db.session.add(service)
+    return len(STARTER_SERVICES)
+
+
+def init_database(migrate: bool = True, seed: bool = True) -> None:
+    """
+    Tworzy brakujące tabele, stosuje migracje, dodaje dane startowe
+    i przelicza liczniki statystyk.
+
+    Wywoływane poleceniem `flask init-db`, przy `python app.py` oraz raz
+    w procesie nadrzędnym serwera produkcyjnego - nigdy przy imporcie
+    aplikacji.
+    """
+    db.create_all()
+    if migrate:
+        MigrationRunner(db.engine).upgrade()
+    if seed:
+        seed_catalog()
+    # Liczniki statystyk zgodne z rezerwacjami od pierwszego żądania
+    rebuild_counters()
+    db.session.commit()
@@ -0,0 +1,227 @@
+"""Polecenia CLI aplikacji (`flask <grupa> <polecenie>`)."""
+
+from __future__ import annotations
+
+import os
+from time import perf_counter
+
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+
+from src.bootstrap import init_database, seed_catalog
+from src.migrations import MigrationRunner
+from src.models import db
+from src.utils.appointment_transfer import (
+    IMPORT_BATCH_SIZE,
+    TRANSFER_FORMATS,
+    ImportReport,
+    export_appointments,
+    import_appointments,
+    transfer_format,
+)
+from src.utils.email_outbox import (
+    get_outbox_workers,
+    outbox_counts,
+    process_outbox,
+    retry_dead,
+)
+from src.utils.static_assets import compress_static_files, get_static_manifest
+from src.utils.stats_counters import find_drift, rebuild_counters
+
+outbox_cli = AppGroup("outbox", help="Kolejka wysyłki emaili.")
+stats_cli = AppGroup("stats", help="Liczniki statystyk panelu administratora.")
+db_cli = AppGroup("db", help="Migracje schematu bazy danych.")
+appointments_cli = AppGroup("appointments", help="Import i eksport rezerwacji.")
+static_cli = AppGroup("static", help="Pliki statyczne zbudowanego frontendu.")
+
+
+@click.command("init-db")
+@click.option("--no-seed", is_flag=True, help="Bez startowego katalogu usług.")
+@with_appcontext
+def init_db_command(no_seed: bool) -> None:
+    """Tworzy tabele, stosuje migracje i dodaje startowy katalog usług."""
+    init_database(seed=not no_seed)
+    click.echo("Baza danych jest gotowa")
+
+
+@click.command("seed")
+@with_appcontext
+def seed_command() -> None:
+    """Dodaje startowy katalog usług, jeśli katalog jest pusty."""
+    added = seed_catalog()
+    db.session.commit()
+    if added:
+        click.echo(f"Dodano usług: {added}")
+    else:
+        click.echo("Katalog usług nie jest pusty - pominięto")
+
+
+@outbox_cli.command("work")
+@click.option("--workers", type=int, default=None, help="Liczba wątków roboczych.")
+@click.option(
+    "--once", is_flag=True, help="Wyślij gotowe wiadomości i zakończ działanie."
+)
+def outbox_work(workers: int | None, once: bool) -> None:
+    """Uruchamia wysyłkę wiadomości z kolejki jako osobny proces."""
+    if once:
+        sent, failed = process_outbox()
+        click.echo(f"Wysłano: {sent}, nieudane: {failed}")
+        return
+
+    app = current_app._get_current_object()  # type: ignore[attr-defined]
+    outbox_workers = get_outbox_workers()
+    outbox_workers.start(app, workers)
+    click.echo("Wysyłka kolejki uruchomiona, Ctrl+C kończy działanie")
+    try:
+        outbox_workers.wait()
+    except KeyboardInterrupt:
+        outbox_workers.stop(timeout=30)
+
+
+@outbox_cli.command("status")
+def outbox_status() -> None:
+    """Wyświetla liczbę wiadomości według statusu."""
+    counts = outbox_counts()
+    if not counts:
+        click.echo("Kolejka jest pusta")
+    for status, count in sorted(counts.items()):
+        click.echo(f"{status}: {count}")
+
+
+@outbox_cli.command("retry-dead")
+def outbox_retry_dead() -> None:
+    """Przywraca do kolejki wiadomości, których nie udało się wysłać."""
+    click.echo(f"Przywrócono wiadomości: {retry_dead()}")
+
+
+@stats_cli.command("rebuild")
+def stats_rebuild() -> None:
+    """Przelicza liczniki statystyk od zera na podstawie rezerwacji."""
+    rows = rebuild_counters()
+    db.session.commit()
+    click.echo(f"Zapisano wierszy liczników: {rows}")
+
+
+@stats_cli.command("verify")
+def stats_verify() -> None:
+    """Porównuje liczniki z rezerwacjami i wypisuje rozbieżności."""
+    drift = find_drift()
+    if not drift:
+        click.echo("Liczniki są zgodne z rezerwacjami")
+        return
+
+    for item in drift:
+        click.echo(
+            f"{item['bucket']} / {item['status']}: "
+            f"zapisane {item['stored']}, oczekiwane {item['expected']}"
+        )
+    click.echo(f"Rozbieżności: {len(drift)} (napraw poleceniem: flask stats rebuild)")
+    raise SystemExit(1)
+
+
+@db_cli.command("status")
+def db_status() -> None:
+    """Wyświetla migracje i informację, czy zostały zastosowane."""
+    for migration, applied in MigrationRunner(db.engine).status():
+        mark = "✅" if applied else "⏳"
+        click.echo(f"{mark} {migration.version} {migration.description}")
+
+
+@db_cli.command("upgrade")
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Wykonaj migracje na kopii bazy w pamięci i wypisz SQL z czasami.",
+)
+def db_upgrade(dry_run: bool) -> None:
+    """Stosuje brakujące migracje schematu."""
+    runner = MigrationRunner(db.engine)
+    if dry_run:
+        click.echo("Tryb próbny - baza docelowa nie zostanie zmieniona")
+        results = runner.dry_run(echo=click.echo)
+    else:
+        results = runner.upgrade(echo=click.echo)
+        if results:
+            # Migracje mogą zmieniać dane, od których zależą liczniki
+            rebuild_counters()
+            db.session.commit()
+
+    if not results:
+        click.echo("Brak migracji do zastosowania")
+        return
+    total_ms = sum(result.duration_ms for result in results)
+    click.echo(f"Migracje: {len(results)}, łączny czas: {total_ms:.1f} ms")
+
+
+@appointments_cli.command("import")
+@click.argument("source", type=click.File("rb"))
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(TRANSFER_FORMATS),
+    default=None,
+    help="Format pliku (domyślnie według rozszerzenia).",
+)
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=IMPORT_BATCH_SIZE,
+    show_default=True,
+    help="Wierszy w jednej transakcji.",
+)
+def appointments_import(source, fmt: str | None, batch_size: int) -> None:
+    """Importuje rezerwacje z pliku CSV lub NDJSON (bez powiadomień email)."""
+    fmt = fmt or transfer_format(None, source.name)
+    if fmt is None:
+        raise click.UsageError("Nie rozpoznano formatu pliku, podaj --format")
+
+    report = ImportReport()
+    started = perf_counter()
+    try:
+        import_appointments(source, fmt, report, batch_size)
+    finally:
+        elapsed = perf_counter() - started
+        click.echo(
+            f"Zaimportowano: {report.imported}, odrzucono: {report.failed} "
+            f"({elapsed:.1f} s)"
+        )
+
+    for error in report.errors:
+        fields = f" ({', '.join(error['fields'])})" if "fields" in error else ""
+        click.echo(f"  linia {error['line']}: {error['error']}{fields}")
+    if report.failed > len(report.errors):
+        click.echo(f"  ... oraz {report.failed - len(report.errors)} kolejnych")
+    if report.failed:
+        raise SystemExit(1)
+
+
+@appointments_cli.command("export")
+@click.argument("target", type=click.File("wb"), default="-")
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(TRANSFER_FORMATS),
+    default=None,
+    help="Format pliku (domyślnie według rozszerzenia, inaczej csv).",
+)
+def appointments_export(target, fmt: str | None) -> None:
+    """Eksportuje wszystkie rezerwacje do pliku (domyślnie na wyjście)."""
+    fmt = fmt or transfer_format(None, target.name) or "csv"
+    for chunk in export_appointments(fmt):
+        target.write(chunk)
+
+
+@static_cli.command("compress")
+def static_compress() -> None:
+    """Zapisuje warianty .gz/.br plików tekstowych (po zbudowaniu frontendu)."""
+    root = current_app.static_folder
+    if not root or not os.path.isdir(root):
+        raise click.ClickException(f"Brak katalogu plików statycznych: {root}")
+
+    written = compress_static_files(root)
+    for path, encoding, original, compressed in written:
+        click.echo(f"{path} [{encoding}]: {original} -> {compressed} B")
+    click.echo(f"Zapisane warianty: {len(written)}")
+    # Manifest tego procesu; działający serwer zobaczy warianty po restarcie
+    get_static_manifest().load(root)
@@ -0,0 +1,17 @@
+"""Wersjonowane migracje schematu bazy danych."""
+
+from .runner import (  # noqa: F401
+    Migration,
+    MigrationContext,
+    MigrationResult,
+    MigrationRunner,
+    discover_migrations,
+)
+
+__all__ = [
+    "Migration",
+    "MigrationContext",
+    "MigrationResult",
+    "MigrationRunner",
+    "discover_migrations",
+]
@@ -0,0 +1,248 @@
+"""Wykonywanie migracji i rejestr zastosowanych wersji (`schema_migrations`)."""
+
+from __future__ import annotations
+
+import importlib
+import pkgutil
+import re
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime
+from time import perf_counter
+from typing import Any, Callable, Iterable
+
+from sqlalchemy.engine import Engine
+
+from . import versions
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+_MODULE_NAME = re.compile(r"^(\d{4})_(\w+)$")
+
+Echo = Callable[[str], None]
+
+
+@dataclass(frozen=True)
+class Migration:
+    """Pojedyncza migracja wczytana z pakietu `versions`."""
+
+    version: str
+    name: str
+    description: str
+    upgrade: Callable[["MigrationContext"], None]
+
+
+@dataclass
+class MigrationResult:
+    """Wynik wykonania migracji: polecenia SQL z czasami i łączny czas."""
+
+    migration: Migration
+    statements: list[tuple[str, float]] = field(default_factory=list)
+    duration_ms: float = 0.0
+
+
+def discover_migrations() -> list[Migration]:
+    """Wczytuje moduły migracji w kolejności numerów wersji."""
+    migrations = []
+    for module_info in pkgutil.iter_modules(versions.__path__):
+        match = _MODULE_NAME.match(module_info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{versions.__name__}.{module_info.name}")
+        migrations.append(
+            Migration(
+                version=match.group(1),
+                name=match.group(2),
+                description=getattr(module, "description", match.group(2)),
+                upgrade=module.upgrade,
+            )
+        )
+
+    migrations.sort(key=lambda migration: migration.version)
+    seen = set()
+    for migration in migrations:
+        if migration.version in seen:
+            raise RuntimeError(f"Zduplikowany numer migracji: {migration.version}")
+        seen.add(migration.version)
+    return migrations
+
+
+class MigrationContext:
+    """
+    Połączenie przekazywane do `upgrade()` migracji.
+
+    Każde polecenie jest mierzone i zapisywane, dzięki czemu tryb próbny
+    może pokazać wykonany SQL wraz z czasem trwania.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, echo: Echo | None = None):
+        self.connection = connection
+        self.echo = echo
+        self.statements: list[tuple[str, float]] = []
+
+    def execute(self, sql: str, parameters: Iterable[Any] = ()) -> sqlite3.Cursor:
+        """Wykonuje polecenie SQL, mierząc czas jego trwania."""
+        start = perf_counter()
+        cursor = self.connection.execute(sql, tuple(parameters))
+        elapsed_ms = (perf_counter() - start) * 1000
+        statement = " ".join(sql.split())
+        self.statements.append((statement, elapsed_ms))
+        if self.echo:
+            self.echo(f"    {statement};  -- {elapsed_ms:.1f} ms")
+        return cursor
+
+    def table_exists(self, table: str) -> bool:
+        return (
+            self.connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (table,),
+            ).fetchone()
+            is not None
+        )
+
+    def column_exists(self, table: str, column: str) -> bool:
+        rows = self.connection.execute(f'PRAGMA table_info("{table}")').fetchall()
+        return any(row[1] == column for row in rows)
+
+    def index_exists(self, index: str) -> bool:
+        return (
+            self.connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+                (index,),
+            ).fetchone()
+            is not None
+        )
+
+
+class MigrationRunner:
+    """
+    Stosuje brakujące migracje do bazy SQLite.
+
+    Każda migracja wykonywana jest w osobnej transakcji `BEGIN IMMEDIATE`
+    razem z wpisem do `schema_migrations`, więc przerwana migracja nie
+    zostawia częściowych zmian, a równolegle uruchomione procesy nie
+    zastosują tej samej wersji dwa razy. Czytelnicy w trybie WAL nie są
+    blokowani w trakcie migracji.
+    """
+
+    def __init__(
+        self, engine: Engine, migrations: list[Migration] | None = None
+    ) -> None:
+        if engine.dialect.name != "sqlite":
+            raise RuntimeError("Migracje obsługują wyłącznie bazę SQLite")
+        self.engine = engine
+        self.migrations = (
+            migrations if migrations is not None else discover_migrations()
+        )
+
+    @staticmethod
+    def _ensure_table(connection: sqlite3.Connection) -> None:
+        connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+            "version VARCHAR(20) NOT NULL PRIMARY KEY, "
+            "name VARCHAR(200) NOT NULL, "
+            "applied_at DATETIME NOT NULL, "
+            "duration_ms FLOAT NOT NULL)"
+        )
+
+    @staticmethod
+    def _applied_versions(connection: sqlite3.Connection) -> set[str]:
+        exists = connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (MIGRATIONS_TABLE,),
+        ).fetchone()
+        if not exists:
+            return set()
+        rows = connection.execute(f"SELECT version FROM {MIGRATIONS_TABLE}")
+        return {row[0] for row in rows}
+
+    def _with_connection(self, work: Callable[[sqlite3.Connection], Any]) -> Any:
+        # Połączenie z puli silnika, by zachować pragmy (busy_timeout, WAL);
+        # transakcjami sterujemy ręcznie, bo DDL w sqlite3 nie otwiera ich sam
+        proxy = self.engine.raw_connection()
+        connection: sqlite3.Connection = proxy.driver_connection  # type: ignore
+        isolation_level = connection.isolation_level
+        connection.isolation_level = None
+        try:
+            return work(connection)
+        finally:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            connection.isolation_level = isolation_level
+            proxy.close()
+
+    def status(self) -> list[tuple[Migration, bool]]:
+        """Zwraca listę migracji z informacją, czy zostały zastosowane."""
+        applied = self._with_connection(self._applied_versions)
+        return [
+            (migration, migration.version in applied) for migration in self.migrations
+        ]
+
+    def pending(self) -> list[Migration]:
+        """Zwraca migracje, które nie zostały jeszcze zastosowane."""
+        return [migration for migration, applied in self.status() if not applied]
+
+    def upgrade(self, echo: Echo | None = None) -> list[MigrationResult]:
+        """Stosuje wszystkie brakujące migracje w kolejności wersji."""
+        return self._with_connection(
+            lambda connection: self._apply_pending(connection, echo)
+        )
+
+    def dry_run(self, echo: Echo | None = None) -> list[MigrationResult]:
+        """
+        Wykonuje brakujące migracje na kopii bazy w pamięci i zwraca
+        wykonane polecenia SQL z czasami. Baza docelowa nie jest zmieniana.
+        """
+
+        def run_on_copy(connection: sqlite3.Connection) -> list[MigrationResult]:
+            copy = sqlite3.connect(":memory:", isolation_level=None)
+            try:
+                connection.backup(copy)
+                return self._apply_pending(copy, echo)
+            finally:
+                copy.close()
+
+        return self._with_connection(run_on_copy)
+
+    def _apply_pending(
+        self, connection: sqlite3.Connection, echo: Echo | None
+    ) -> list[MigrationResult]:
+        self._ensure_table(connection)
+        results = []
+
+        for migration in self.migrations:
+            connection.execute("BEGIN IMMEDIATE")
+            # Sprawdzenie pod blokadą zapisu: inny proces mógł nas wyprzedzić
+            if migration.version in self._applied_versions(connection):
+                connection.execute("ROLLBACK")
+                continue
+
+            if echo:
+                echo(f"  {migration.version} {migration.description}")
+            context = MigrationContext(connection, echo)
+            start = perf_counter()
+            try:
+                migration.upgrade(context)
+                duration_ms = (perf_counter() - start) * 1000
+                connection.execute(
+                    f"INSERT INTO {MIGRATIONS_TABLE} "
+                    "(version, name, applied_at, duration_ms) VALUES (?, ?, ?, ?)",
+                    (
+                        migration.version,
+                        migration.name,
+                        datetime.utcnow().isoformat(sep=" "),
+                        duration_ms,
+                    ),
+                )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+            if echo:
+                echo(f"  -> {duration_ms:.1f} ms")
+            results.append(
+                MigrationResult(migration, context.statements, duration_ms)
+            )
+
+        return results
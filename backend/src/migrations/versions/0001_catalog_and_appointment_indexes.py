@@ -0,0 +1,26 @@
+"""Indeksy pod listy rezerwacji, wyszukiwanie bez rozróżniania wielkości liter
+i złączenia katalogu usług."""
+
+from __future__ import annotations
+
+description = "Indeksy rezerwacji, katalogu usług i ustawień"
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_appointments_date_id "
+    "ON appointments (appointment_date, id)",
+    "CREATE INDEX IF NOT EXISTS ix_appointments_status_date_id "
+    "ON appointments (status, appointment_date, id)",
+    "CREATE INDEX IF NOT EXISTS ix_appointments_email_lower "
+    "ON appointments (lower(email), appointment_date)",
+    "CREATE INDEX IF NOT EXISTS ix_service_categories_name_lower "
+    "ON service_categories (lower(name))",
+    "CREATE INDEX IF NOT EXISTS ix_services_category_id ON services (category_id)",
+    'CREATE INDEX IF NOT EXISTS ix_settings_key_lower ON settings (lower("key"))',
+]
+
+
+def upgrade(ctx) -> None:
+    for statement in INDEXES:
+        ctx.execute(statement)
+    # Planer zapytań korzysta ze statystyk indeksów
+    ctx.execute("ANALYZE")
@@ -0,0 +1,42 @@
+"""Powiązanie rezerwacji z usługą z katalogu (klucz obcy zamiast nazwy)."""
+
+from __future__ import annotations
+
+description = "Kolumna appointments.service_id z uzupełnieniem po nazwie usługi"
+
+
+def upgrade(ctx) -> None:
+    if not ctx.column_exists("appointments", "service_id"):
+        ctx.execute(
+            "ALTER TABLE appointments ADD COLUMN service_id INTEGER "
+            "REFERENCES services (id) ON DELETE SET NULL"
+        )
+    ctx.execute(
+        "CREATE INDEX IF NOT EXISTS ix_appointments_service_id "
+        "ON appointments (service_id)"
+    )
+
+    # Dopasowanie nazw w Pythonie, jak dotychczas przy liczeniu przychodu
+    # (lower() w SQLite pomija polskie znaki). Przy powtarzających się
+    # nazwach wygrywa aktywna usługa o najwyższym id.
+    services = ctx.execute(
+        "SELECT name, id FROM services ORDER BY is_active, id"
+    ).fetchall()
+    ids_by_name = {name.lower(): service_id for name, service_id in services}
+    names = ctx.execute(
+        "SELECT DISTINCT service FROM appointments WHERE service_id IS NULL"
+    ).fetchall()
+
+    for (name,) in names:
+        service_id = ids_by_name.get((name or "").lower())
+        if service_id is not None:
+            ctx.execute(
+                "UPDATE appointments SET service_id = ? "
+                "WHERE service_id IS NULL AND service = ?",
+                (service_id, name),
+            )
+
+    # Liczniki liczone były po nazwach; przelicza je według service_id
+    # rebuild_counters() po migracjach (init_database, flask db upgrade)
+    if ctx.table_exists("stats_counters"):
+        ctx.execute("DELETE FROM stats_counters")
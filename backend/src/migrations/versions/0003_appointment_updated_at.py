@@ -0,0 +1,21 @@
+"""Czas ostatniej zmiany rezerwacji (wersje dni w pamięci podręcznej terminów)."""
+
+from __future__ import annotations
+
+description = "Kolumna appointments.updated_at z indeksem pod wersje dni"
+
+
+def upgrade(ctx) -> None:
+    if not ctx.column_exists("appointments", "updated_at"):
+        ctx.execute("ALTER TABLE appointments ADD COLUMN updated_at DATETIME")
+    ctx.execute(
+        "UPDATE appointments SET updated_at = coalesce(created_at, CURRENT_TIMESTAMP) "
+        "WHERE updated_at IS NULL"
+    )
+    # Indeks pokrywający zapytanie o wersje dni okna
+    ctx.execute(
+        "CREATE INDEX IF NOT EXISTS ix_appointments_date_updated "
+        "ON appointments (appointment_date, updated_at)"
+    )
+    # Bez statystyk nowego indeksu planer wybiera ix_appointments_date_id
+    ctx.execute("ANALYZE")
@@ -0,0 +1,8 @@
+"""
+Moduły migracji. Nazwa pliku to `NNNN_opis.py`, gdzie NNNN jest numerem
+wersji. Moduł definiuje `description` oraz `upgrade(ctx: MigrationContext)`.
+
+Migracje muszą działać także na bazie utworzonej od zera przez
+`db.create_all()` (np. `CREATE INDEX IF NOT EXISTS`, sprawdzenie
+`ctx.column_exists()` przed dodaniem kolumny).
+"""
@@ -4,6 +4,8 @@ from .user import User, db  # noqa: F401
 from .appointment import Appointment, AvailableSlot  # noqa: F401
 from .service import Service, ServiceCategory  # noqa: F401
 from .settings import Settings  # noqa: F401
+from .email_outbox import EmailOutbox  # noqa: F401
+from .stats import StatsCounter  # noqa: F401
 
 __all__ = [
     "db",
@@ -13,4 +15,6 @@ __all__ = [
     "Service",
     "ServiceCategory",
     "Settings",
+    "EmailOutbox",
+    "StatsCounter",
 ]
@@ -11,12 +11,35 @@ class Appointment(db.Model):
     email = db.Column(db.String(120), nullable=False)
     phone = db.Column(db.String(20), nullable=True)
     service = db.Column(db.String(100), nullable=False)
+    # Usługa z katalogu; `service` zachowuje nazwę podaną przy rezerwacji
+    service_id = db.Column(
+        db.Integer,
+        db.ForeignKey("services.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+    )
     appointment_date = db.Column(db.DateTime, nullable=False)
     message = db.Column(db.Text, nullable=True)
     status = db.Column(
         db.String(20), default="pending"
     )  # pending, confirmed, cancelled
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    # Wersja dnia w kalendarzu dostępności (COUNT i MAX(updated_at) dnia)
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    # Indeksy pod stronicowanie po (appointment_date, id) i filtry listy
+    __table_args__ = (
+        db.Index("ix_appointments_date_id", "appointment_date", "id"),
+        db.Index(
+            "ix_appointments_status_date_id", "status", "appointment_date", "id"
+        ),
+        db.Index(
+            "ix_appointments_email_lower", db.func.lower(email), "appointment_date"
+        ),
+        db.Index("ix_appointments_date_updated", "appointment_date", "updated_at"),
+    )
 
     def __init__(
         self,
@@ -27,11 +50,13 @@ class Appointment(db.Model):
         phone: Optional[str] = None,
         message: Optional[str] = None,
         status: str = "pending",
+        service_id: Optional[int] = None,
     ):
         self.name = name
         self.email = email
         self.phone = phone
         self.service = service
+        self.service_id = service_id
         self.appointment_date = appointment_date
         self.message = message
         self.status = status
@@ -43,6 +68,7 @@ class Appointment(db.Model):
             "email": self.email,
             "phone": self.phone,
             "service": self.service,
+            "service_id": self.service_id,
             "appointment_date": self.appointment_date.isoformat()
             if self.appointment_date
             else None,
@@ -0,0 +1,62 @@
+"""Model kolejki wiadomości email do wysłania (outbox)."""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from typing import Any
+
+from .user import db
+
+
+class EmailOutbox(db.Model):
+    """
+    Wiadomość oczekująca na wysyłkę.
+
+    Wiersz zapisywany jest w tej samej transakcji co zdarzenie, którego
+    dotyczy (np. rezerwacja), a wysyłką zajmują się wątki robocze.
+    """
+
+    __tablename__ = "email_outbox"
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    # pending, sending, sent, dead
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    def __init__(self, kind: str, payload: dict[str, Any]) -> None:
+        self.kind = kind
+        self.payload = json.dumps(payload, ensure_ascii=False)
+        self.status = "pending"
+        self.attempts = 0
+        self.next_attempt_at = datetime.utcnow()
+
+    def payload_dict(self) -> dict[str, Any]:
+        """Zwraca zdekodowaną treść zadania."""
+        return json.loads(self.payload)
+
+    def to_dict(self) -> dict:
+        """Konwertuje obiekt na słownik."""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "attempts": self.attempts,
+            "next_attempt_at": self.next_attempt_at.isoformat()
+            if self.next_attempt_at
+            else None,
+            "last_error": self.last_error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "sent_at": self.sent_at.isoformat() if self.sent_at else None,
+        }
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+from datetime import datetime
 from decimal import Decimal
 from typing import Optional
 
+from flask import current_app
+from sqlalchemy.orm import joinedload, lazyload, raiseload, selectinload
+
 from .user import db
 
 
@@ -13,17 +17,21 @@ class ServiceCategory(db.Model):
     name = db.Column(db.String(120), unique=True, nullable=False)
     description = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    # Czas z mikrosekundami (UTC) - wersja katalogu opiera się na MAX(updated_at)
     updated_at = db.Column(
-        db.DateTime,
-        default=db.func.current_timestamp(),
-        onupdate=db.func.current_timestamp(),
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    # Indeks wyrażeniowy obsługujący sprawdzanie duplikatów nazw
+    __table_args__ = (
+        db.Index("ix_service_categories_name_lower", db.func.lower(name)),
     )
 
     services = db.relationship(
         "Service",
         back_populates="category",
         cascade="all, delete-orphan",
-        lazy="joined",
+        lazy="select",
     )
 
     def to_dict(self) -> dict[str, Optional[str | int]]:
@@ -47,20 +55,32 @@ class Service(db.Model):
     is_active = db.Column(db.Boolean, nullable=False, default=True)
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     updated_at = db.Column(
-        db.DateTime,
-        default=db.func.current_timestamp(),
-        onupdate=db.func.current_timestamp(),
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
 
     category_id = db.Column(
         db.Integer,
         db.ForeignKey("service_categories.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     category = db.relationship(
-        "ServiceCategory", back_populates="services", lazy="joined"
+        "ServiceCategory", back_populates="services", lazy="select"
     )
 
+    @staticmethod
+    def ids_by_name() -> dict[str, int]:
+        """
+        Zwraca mapę nazwa usługi (małymi literami) -> id, używaną do
+        przypisywania rezerwacji do katalogu. Przy powtarzających się nazwach
+        wygrywa aktywna usługa o najwyższym id. Nazwy porównywane są
+        w Pythonie, bo lower() w SQLite nie obsługuje polskich znaków.
+        """
+        rows = db.session.execute(
+            db.select(Service.name, Service.id).order_by(Service.is_active, Service.id)
+        )
+        return {name.lower(): service_id for name, service_id in rows}
+
     def to_dict(self) -> dict[str, Optional[str | int | float | bool]]:
         price_value = float(self.price) if self.price is not None else 0.0
         return {
@@ -75,3 +95,44 @@ class Service(db.Model):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
+
+
+# Profile ładowania relacji dla endpointów katalogu usług. Relacje są
+# domyślnie leniwe, a każdy endpoint wybiera profil zgodny z tym, co
+# serializuje. "unused" oznacza relację, której endpoint nie potrzebuje.
+LOADING_PROFILES = {
+    "category": {ServiceCategory.services: "unused"},
+    # Usuwanie po sprawdzeniu EXISTS, że kategoria nie ma usług. Kaskada
+    # i tak wczytuje kolekcję przy flush (jedno zapytanie), ale odczyt
+    # `category.services` w kodzie widoku zgłasza wyjątek.
+    "category_delete": {ServiceCategory.services: "raise"},
+    "service": {Service.category: "joined"},
+}
+
+_STRATEGIES = {
+    "lazy": lazyload,
+    "raise": raiseload,
+    "selectin": selectinload,
+    "joined": joinedload,
+}
+
+
+def loading_options(profile: str) -> list:
+    """
+    Zwraca opcje zapytania dla profilu ładowania relacji.
+
+    Nieużywane relacje pozostają leniwe (`lazyload`), więc zapytanie
+    wykonuje się dopiero przy odczycie. W trybie ścisłym
+    (`SQLALCHEMY_STRICT_LOADING`, domyślnie w trybie debug i testowym)
+    zamiast tego zgłaszają wyjątek przy próbie odczytu (`raiseload`), co
+    ujawnia zapytania wykonywane niezamierzenie.
+    """
+    strict = current_app.config.get(
+        "SQLALCHEMY_STRICT_LOADING", current_app.debug or current_app.testing
+    )
+    options = []
+    for relationship, strategy in LOADING_PROFILES[profile].items():
+        if strategy == "unused":
+            strategy = "raise" if strict else "lazy"
+        options.append(_STRATEGIES[strategy](relationship))
+    return options
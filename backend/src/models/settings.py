@@ -2,9 +2,13 @@
 
 from __future__ import annotations
 
+import threading
 from datetime import datetime
+from typing import Any
 
+from flask import current_app, g
 from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from . import db
 
@@ -22,6 +26,9 @@ class Settings(db.Model):
         db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
     )
 
+    # Indeks wyrażeniowy obsługujący wyszukiwanie bez rozróżniania wielkości liter
+    __table_args__ = (db.Index("ix_settings_key_lower", func.lower(key)),)
+
     def __init__(
         self,
         key: str,
@@ -44,9 +51,14 @@ class Settings(db.Model):
 
     @staticmethod
     def get_value(key: str, default: str | None = None) -> str | None:
-        """Pobiera wartość ustawienia po kluczu."""
-        setting = Settings.query.filter(func.lower(Settings.key) == key.lower()).first()
-        return setting.value if setting else default
+        """Pobiera wartość ustawienia po kluczu (z migawki w pamięci)."""
+        values = get_settings_cache().values()
+        return values[key.lower()] if key.lower() in values else default
+
+    @staticmethod
+    def invalidate_cache() -> None:
+        """Unieważnia migawkę ustawień; wywoływane po zatwierdzeniu zmian."""
+        get_settings_cache().invalidate()
 
     @staticmethod
     def set_value(
@@ -62,3 +74,131 @@ class Settings(db.Model):
             setting = Settings(key=key, value=value, description=description)
             db.session.add(setting)
         return setting
+
+    @staticmethod
+    def upsert_many(
+        items: list[tuple[str, str | None, str | None]],
+    ) -> dict[str, str]:
+        """
+        Zapisuje wiele ustawień naraz: (klucz, wartość, opis).
+
+        Istniejące wiersze pobierane są jednym zapytaniem `IN`, a zmienione
+        i nowe zapisywane jednym poleceniem `INSERT ... ON CONFLICT DO UPDATE`.
+        Wiersze bez zmian nie są zapisywane, więc ich `updated_at` zostaje.
+        Tak jak w `set_value`, opis `None` nie nadpisuje istniejącego.
+
+        Zwraca słownik: klucz zapisany w bazie -> "created", "updated"
+        lub "unchanged", w kolejności pierwszego wystąpienia klucza.
+        """
+        # Przy powtórzonym kluczu (bez względu na wielkość liter) wygrywa ostatni
+        latest: dict[str, tuple[str, str | None, str | None]] = {}
+        for key, value, description in items:
+            latest[key.lower()] = (key, value, description)
+        if not latest:
+            return {}
+
+        existing = {
+            row.key.lower(): row
+            for row in db.session.execute(
+                db.select(Settings.key, Settings.value, Settings.description).where(
+                    func.lower(Settings.key).in_(list(latest))
+                )
+            )
+        }
+
+        now = datetime.utcnow()
+        statuses: dict[str, str] = {}
+        changed = []
+        for lowered, (key, value, description) in latest.items():
+            current = existing.get(lowered)
+            if current is None:
+                statuses[key] = "created"
+            elif current.value == value and description in (
+                None,
+                current.description,
+            ):
+                statuses[current.key] = "unchanged"
+                continue
+            else:
+                # Zapis pod kluczem z bazy, by konflikt trafił w istniejący wiersz
+                key = current.key
+                statuses[key] = "updated"
+            changed.append(
+                {
+                    "key": key,
+                    "value": value,
+                    "description": description,
+                    "updated_at": now,
+                }
+            )
+
+        if changed:
+            # Jedno polecenie z listą VALUES (bez grupowania wierszy przez ORM)
+            statement = sqlite_insert(Settings.__table__).values(changed)
+            statement = statement.on_conflict_do_update(
+                index_elements=[Settings.key],
+                set_={
+                    "value": statement.excluded.value,
+                    "description": func.coalesce(
+                        statement.excluded.description, Settings.description
+                    ),
+                    "updated_at": statement.excluded.updated_at,
+                },
+            )
+            db.session.execute(statement)
+        return statuses
+
+
+class SettingsCache:
+    """
+    Migawka wszystkich ustawień w pamięci procesu.
+
+    Wszystkie wiersze ładowane są jednym zapytaniem, a odczyty obsługuje
+    słownik. Zmiany zapisane przez inne procesy (np. workery gunicorn)
+    wykrywane są tanim sprawdzeniem wersji `COUNT(*), MAX(updated_at)`,
+    wykonywanym najwyżej raz na kontekst aplikacji (żądanie).
+    """
+
+    def __init__(self) -> None:
+        self._values: dict[str, str | None] | None = None
+        self._version: tuple[Any, ...] | None = None
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def _current_version(self) -> tuple[Any, ...]:
+        row = db.session.execute(
+            db.select(func.count(Settings.id), func.max(Settings.updated_at))
+        ).one()
+        return tuple(row)
+
+    def _reload(self, version: tuple[Any, ...]) -> dict[str, str | None]:
+        rows = db.session.execute(db.select(Settings.key, Settings.value))
+        values = {key.lower(): value for key, value in rows}
+        with self._lock:
+            self._values = values
+            self._version = version
+            self.loads += 1
+        return values
+
+    def values(self) -> dict[str, str | None]:
+        """Zwraca aktualną migawkę ustawień (klucze małymi literami)."""
+        values = self._values
+        if values is not None and g.get("_settings_version_checked"):
+            return values
+
+        version = self._current_version()
+        g._settings_version_checked = True
+        if values is None or version != self._version:
+            values = self._reload(version)
+        return values
+
+    def invalidate(self) -> None:
+        """Wymusza ponowne wczytanie przy następnym odczycie."""
+        with self._lock:
+            self._values = None
+            self._version = None
+
+
+def get_settings_cache() -> SettingsCache:
+    """Pobiera migawkę ustawień z aplikacji."""
+    return current_app.extensions["settings_cache"]
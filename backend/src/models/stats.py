@@ -0,0 +1,41 @@
+"""Model liczników statystyk panelu administratora."""
+
+from __future__ import annotations
+
+from decimal import Decimal
+
+from .user import db
+
+# Kubełek zbiorczy obejmujący wszystkie dni
+ALL_BUCKET = "all"
+
+
+class StatsCounter(db.Model):
+    """
+    Liczba rezerwacji i suma ich wartości dla pary (kubełek, status).
+
+    Kubełek to data wizyty w formacie YYYY-MM-DD lub `all` dla sumy ze
+    wszystkich dni. Wiersze aktualizowane są w tej samej transakcji co
+    rezerwacje, więc odczyt statystyk nie wymaga przeglądania rezerwacji.
+    """
+
+    __tablename__ = "stats_counters"
+
+    id = db.Column(db.Integer, primary_key=True)
+    bucket = db.Column(db.String(10), nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    appointments = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Numeric(12, 2), nullable=False, default=Decimal("0.00"))
+
+    __table_args__ = (
+        db.UniqueConstraint("bucket", "status", name="uq_stats_counters_bucket_status"),
+    )
+
+    def to_dict(self) -> dict:
+        """Konwertuje obiekt na słownik."""
+        return {
+            "bucket": self.bucket,
+            "status": self.status,
+            "appointments": self.appointments,
+            "revenue": float(self.revenue or 0),
+        }
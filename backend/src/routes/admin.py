@@ -3,19 +3,26 @@ from __future__ import annotations
 from datetime import date, datetime, timezone
 from typing import Any, cast
 
-from flask import Blueprint, current_app, jsonify
-from sqlalchemy import func
+from flask import Blueprint, Response, current_app, jsonify
+from sqlalchemy import case, func
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm.attributes import InstrumentedAttribute
 
 from src.models import Appointment, Service, ServiceCategory, db
+from src.utils.availability import get_availability_cache
+from src.utils.catalog import get_catalog_cache
+from src.utils.request_metrics import get_request_metrics
+from src.utils.sqlite_tuning import read_sqlite_pragmas
+from src.utils.stats_counters import read_summary
 
 admin_bp = Blueprint("admin", __name__)
 
 STATUS_COLUMN = cast(InstrumentedAttribute[str], Appointment.status)
-APPOINTMENT_DATE_COLUMN = cast(
-    InstrumentedAttribute[datetime], Appointment.appointment_date
-)
+
+
+def _count_where(condition: Any) -> Any:
+    """Zlicza wiersze spełniające warunek (agregacja warunkowa)."""
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
 
 
 @admin_bp.route("/admin/summary", methods=["GET"])
@@ -24,33 +31,17 @@ def get_admin_summary() -> Any:
     today = date.today()
 
     try:
-        total_appointments = Appointment.query.count()
-        pending_appointments = Appointment.query.filter_by(status="pending").count()
-        confirmed_appointments = Appointment.query.filter_by(status="confirmed").count()
-        cancelled_appointments = Appointment.query.filter_by(status="cancelled").count()
-        upcoming_appointments = (
-            Appointment.query.filter(STATUS_COLUMN.in_(["pending", "confirmed"]))
-            .filter(APPOINTMENT_DATE_COLUMN >= now)
-            .count()
-        )
-        today_appointments = Appointment.query.filter(
-            func.date(APPOINTMENT_DATE_COLUMN) == today
-        ).count()
-
-        total_services = Service.query.count()
-        active_services = Service.query.filter_by(is_active=True).count()
-        average_price = db.session.query(func.avg(Service.price)).scalar() or 0
-
-        service_prices = {
-            service.name.lower(): float(service.price or 0)
-            for service in Service.query.filter_by(is_active=True).all()
-        }
-
-        confirmed_list = Appointment.query.filter_by(status="confirmed").all()
-        potential_revenue = sum(
-            service_prices.get((appointment.service or "").lower(), 0)
-            for appointment in confirmed_list
-        )
+        # Liczniki utrzymywane przyrostowo w tabeli stats_counters
+        counters = read_summary(today, now)
+
+        total_services, active_services, average_price = db.session.execute(
+            db.select(
+                func.count(Service.id),
+                _count_where(Service.is_active.is_(True)),
+                func.avg(Service.price),
+            )
+        ).one()
+        average_price = average_price or 0
 
     except SQLAlchemyError:
         current_app.logger.exception("Błąd podczas pobierania danych administratora")
@@ -64,12 +55,12 @@ def get_admin_summary() -> Any:
     return jsonify(
         {
             "appointments": {
-                "total": total_appointments,
-                "pending": pending_appointments,
-                "confirmed": confirmed_appointments,
-                "cancelled": cancelled_appointments,
-                "upcoming": upcoming_appointments,
-                "today": today_appointments,
+                "total": counters["total"],
+                "pending": counters["pending"],
+                "confirmed": counters["confirmed"],
+                "cancelled": counters["cancelled"],
+                "upcoming": counters["upcoming"],
+                "today": counters["today"],
             },
             "services": {
                 "total": total_services,
@@ -77,18 +68,86 @@ def get_admin_summary() -> Any:
                 "averagePrice": float(average_price),
             },
             "financials": {
-                "potentialRevenue": float(potential_revenue),
+                "potentialRevenue": float(counters["revenue"]),
             },
         }
     )
 
 
+@admin_bp.route("/admin/services/stats", methods=["GET"])
+def get_service_stats() -> Any:
+    """
+    Statystyki rezerwacji dla każdej usługi z katalogu.
+
+    Rezerwacje łączone są z usługami po `service_id` (indeks), a przychód
+    liczony jest z potwierdzonych wizyt według bieżącej ceny usługi.
+    """
+    confirmed = STATUS_COLUMN == "confirmed"
+    try:
+        rows = db.session.execute(
+            db.select(
+                Service.id,
+                Service.name,
+                Service.is_active,
+                Service.price,
+                func.count(Appointment.id),
+                _count_where(STATUS_COLUMN == "pending"),
+                _count_where(confirmed),
+                _count_where(STATUS_COLUMN == "cancelled"),
+            )
+            .outerjoin(Appointment, Appointment.service_id == Service.id)
+            .group_by(Service.id)
+            .order_by(func.count(Appointment.id).desc(), Service.name.asc())
+        ).all()
+        unassigned = db.session.execute(
+            db.select(func.count(Appointment.id)).where(
+                Appointment.service_id.is_(None)
+            )
+        ).scalar()
+    except SQLAlchemyError:
+        current_app.logger.exception("Błąd podczas pobierania statystyk usług")
+        return jsonify({"error": "Wystąpił błąd podczas pobierania statystyk"}), 500
+
+    return jsonify(
+        {
+            "services": [
+                {
+                    "id": service_id,
+                    "name": name,
+                    "isActive": is_active,
+                    "appointments": {
+                        "total": total,
+                        "pending": pending,
+                        "confirmed": confirmed_count,
+                        "cancelled": cancelled,
+                    },
+                    "revenue": float((price or 0) * confirmed_count)
+                    if is_active
+                    else 0.0,
+                }
+                for (
+                    service_id,
+                    name,
+                    is_active,
+                    price,
+                    total,
+                    pending,
+                    confirmed_count,
+                    cancelled,
+                ) in rows
+            ],
+            "unassignedAppointments": unassigned or 0,
+        }
+    )
+
+
 @admin_bp.route("/admin/health", methods=["GET"])
 def health_check() -> Any:
     try:
         categories = ServiceCategory.query.count()
         services = Service.query.count()
         appointments = Appointment.query.count()
+        sqlite = read_sqlite_pragmas(db.engine)
     except SQLAlchemyError:
         current_app.logger.exception("Błąd podczas sprawdzania stanu aplikacji")
         return (
@@ -105,5 +164,19 @@ def health_check() -> Any:
                 "services": services,
                 "appointments": appointments,
             },
+            "sqlite": sqlite,
+            "caches": {
+                "availability": get_availability_cache().stats(),
+                "catalog": get_catalog_cache().stats(),
+            },
         }
     )
+
+
+@admin_bp.route("/admin/metrics", methods=["GET"])
+def get_metrics() -> Response:
+    """Histogramy czasu, czasu SQL i liczby zapytań według trasy (Prometheus)."""
+    return Response(
+        get_request_metrics().render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
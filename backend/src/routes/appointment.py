@@ -1,12 +1,57 @@
-from datetime import date, datetime, time, timedelta
+import base64
+import binascii
+import json
+from datetime import date, datetime, timedelta
 from typing import cast
 
-from flask import Blueprint, current_app, jsonify, request
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    jsonify,
+    request,
+    stream_with_context,
+)
+from sqlalchemy import Row, func, tuple_
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm.attributes import InstrumentedAttribute
 
-from src.models.appointment import Appointment, db
-from src.utils.email_utils import send_appointment_notification
+from src.models import Appointment, Service, db
+from src.utils.appointment_validation import (
+    APPOINTMENT_STATUSES,
+    AppointmentDataError,
+    ServiceLookup,
+    validate_appointment,
+)
+from src.utils.appointment_transfer import (
+    ImportReport,
+    export_appointments,
+    import_appointments,
+    transfer_format,
+)
+from src.utils.availability import (
+    compute_available_slots,
+    compute_service_slots,
+    get_availability_cache,
+    load_day_versions,
+)
+from src.utils.email_outbox import (
+    APPOINTMENT_NOTIFICATION,
+    enqueue_email,
+    get_outbox_workers,
+)
+from src.utils.serializers import (
+    APPOINTMENT_PROJECTION,
+    fetch_rows,
+    json_response,
+    requested_fields,
+)
+from src.utils.stats_counters import appointment_state, record_appointment_change
+from src.utils.streaming import (
+    NDJSON_MIMETYPE,
+    requested_stream_format,
+    stream_query,
+)
 
 appointment_bp = Blueprint("appointment", __name__)
 
@@ -15,8 +60,10 @@ APPOINTMENT_DATE_COLUMN = cast(
     InstrumentedAttribute[datetime], Appointment.appointment_date
 )
 
+DEFAULT_AVAILABILITY_DAYS = 30
 
-DEFAULT_APPOINTMENT_TIME = time(9, 0)
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
 
 
 @appointment_bp.route("/appointments", methods=["POST"])
@@ -26,74 +73,22 @@ def create_appointment():
     if not isinstance(data, dict):
         return jsonify({"error": "Nieprawidłowy format danych"}), 400
 
-    required_fields = ("name", "email", "service", "date")
-    missing_fields = [
-        field for field in required_fields if not str(data.get(field, "")).strip()
-    ]
-    if missing_fields:
-        return (
-            jsonify(
-                {
-                    "error": "Brakuje wymaganych danych",
-                    "fields": missing_fields,
-                }
-            ),
-            400,
-        )
-
-    date_str = str(data.get("date", "")).strip()
-    time_str = str(data.get("time", "")).strip()
-    datetime_str = str(data.get("datetime", "")).strip()
-
-    appointment_datetime: datetime | None = None
-
-    if datetime_str:
-        try:
-            appointment_datetime = datetime.fromisoformat(datetime_str)
-        except ValueError:
-            return jsonify({"error": "Nieprawidłowy format pola datetime"}), 400
+    try:
+        values = validate_appointment(data, ServiceLookup())
+    except AppointmentDataError as e:
+        return jsonify(e.to_dict()), 400
 
-    if appointment_datetime is None:
-        try:
-            parsed_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        except ValueError:
-            return jsonify({"error": "Nieprawidłowy format daty. Użyj YYYY-MM-DD"}), 400
-
-        if time_str:
-            try:
-                parsed_time = datetime.strptime(time_str, "%H:%M").time()
-            except ValueError:
-                return jsonify({"error": "Nieprawidłowy format czasu. Użyj HH:MM"}), 400
-        else:
-            parsed_time = DEFAULT_APPOINTMENT_TIME
-
-        appointment_datetime = datetime.combine(parsed_date, parsed_time)
-
-    if appointment_datetime < datetime.now():
-        return jsonify({"error": "Nie można umówić wizyty w przeszłości"}), 400
-
-    appointment = Appointment(
-        name=str(data.get("name", "")).strip(),
-        email=str(data.get("email", "")).strip(),
-        phone=str(data.get("phone", "")).strip() or None,
-        service=str(data.get("service", "")).strip(),
-        appointment_date=appointment_datetime,
-        message=str(data.get("message", "")).strip() or None,
-        status="pending",
-    )
+    appointment = Appointment(**values)
 
     try:
         db.session.add(appointment)
+        db.session.flush()
+        record_appointment_change(None, appointment_state(appointment))
+        # Powiadomienie trafia do kolejki w tej samej transakcji co rezerwacja
+        enqueue_email(APPOINTMENT_NOTIFICATION, appointment.to_dict())
         db.session.commit()
-
-        # Wyślij email z powiadomieniem
-        appointment_dict = appointment.to_dict()
-        email_sent = send_appointment_notification(appointment_dict)
-
-        if not email_sent:
-            current_app.logger.warning(
-                f"Rezerwacja utworzona (ID: {appointment.id}), ale nie udało się wysłać emaila"
-            )
+        get_availability_cache().invalidate_day(appointment.appointment_date.date())
+        get_outbox_workers().notify()
 
     except SQLAlchemyError:
         db.session.rollback()
@@ -111,11 +106,163 @@ def create_appointment():
     )
 
 
+@appointment_bp.route("/appointments/import", methods=["POST"])
+def import_appointments_file():
+    """
+    Importuje rezerwacje z treści żądania w formacie CSV lub NDJSON.
+
+    Format z `?format=csv|ndjson` albo z nagłówka Content-Type. Treść
+    czytana jest strumieniowo. Zwraca liczbę zapisanych i odrzuconych
+    wierszy oraz błędy z numerami linii.
+    """
+    if request.args.get("format"):
+        fmt = transfer_format(request.args["format"])
+    else:
+        fmt = {"text/csv": "csv", NDJSON_MIMETYPE: "ndjson"}.get(request.mimetype)
+    if fmt is None:
+        return jsonify({"error": "Nieobsługiwany format (csv lub ndjson)"}), 400
+
+    report = ImportReport()
+    try:
+        import_appointments(request.stream, fmt, report)
+    except SQLAlchemyError:
+        db.session.rollback()
+        current_app.logger.exception("Błąd podczas importu rezerwacji")
+        error = {"error": "Wystąpił błąd podczas importu rezerwacji"}
+        return jsonify({**error, **report.to_dict()}), 500
+    except UnicodeDecodeError:
+        db.session.rollback()
+        error = {"error": "Plik musi być zapisany w UTF-8"}
+        return jsonify({**error, **report.to_dict()}), 400
+
+    return jsonify(report.to_dict()), 200
+
+
+@appointment_bp.route("/appointments/export", methods=["GET"])
+def export_appointments_file():
+    """Eksportuje wszystkie rezerwacje jako CSV (domyślnie) lub NDJSON."""
+    fmt = transfer_format(request.args.get("format") or "csv")
+    if fmt is None:
+        return jsonify({"error": "Nieobsługiwany format (csv lub ndjson)"}), 400
+
+    mimetype = "text/csv" if fmt == "csv" else NDJSON_MIMETYPE
+    response = Response(
+        stream_with_context(export_appointments(fmt)), mimetype=mimetype
+    )
+    response.headers["Content-Disposition"] = (
+        f"attachment; filename=appointments.{fmt}"
+    )
+    return response
+
+
+def encode_cursor(appointment: Appointment | Row) -> str:
+    """Koduje pozycję (appointment_date, id) ostatniego elementu strony."""
+    raw = json.dumps([appointment.appointment_date.isoformat(), appointment.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> tuple[datetime, int]:
+    """Dekoduje kursor; zgłasza ValueError dla nieprawidłowego tokenu."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        date_str, appointment_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(date_str), int(appointment_id)
+    except (TypeError, binascii.Error, json.JSONDecodeError) as e:
+        raise ValueError("Nieprawidłowy kursor") from e
+
+
+def _parse_date_bound(value: str, end_of_day: bool) -> datetime:
+    if "T" in value or " " in value:
+        return datetime.fromisoformat(value)
+    parsed = datetime.strptime(value, "%Y-%m-%d")
+    return parsed + timedelta(days=1) if end_of_day else parsed
+
+
 @appointment_bp.route("/appointments", methods=["GET"])
 def get_appointments():
+    """
+    Zwraca rezerwacje od najpóźniejszych.
+
+    Filtry: status, date_from, date_to (YYYY-MM-DD lub ISO), email.
+    Parametr `limit` lub `cursor` włącza stronicowanie kluczem
+    (appointment_date, id): odpowiedź ma postać
+    {"appointments": [...], "next_cursor": "..."}, a koszt każdej strony
+    jest taki sam jak pierwszej. Bez nich zwracana jest pełna lista.
+
+    `?stream=1` lub `Accept: application/x-ndjson` zwraca wszystkie pasujące
+    rezerwacje strumieniowo, bez budowania całej listy w pamięci.
+
+    `?fields=id,name,status` ogranicza zestaw zwracanych pól.
+    """
+    try:
+        fields = requested_fields(APPOINTMENT_PROJECTION)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    query = APPOINTMENT_PROJECTION.select(fields)
+    serialize = APPOINTMENT_PROJECTION.serializer(fields)
+
+    status = request.args.get("status", "").strip()
+    if status:
+        if status not in APPOINTMENT_STATUSES:
+            return jsonify({"error": "Nieprawidłowy status"}), 400
+        query = query.where(STATUS_COLUMN == status)
+
+    try:
+        if request.args.get("date_from"):
+            query = query.where(
+                APPOINTMENT_DATE_COLUMN
+                >= _parse_date_bound(request.args["date_from"], end_of_day=False)
+            )
+        if request.args.get("date_to"):
+            query = query.where(
+                APPOINTMENT_DATE_COLUMN
+                < _parse_date_bound(request.args["date_to"], end_of_day=True)
+            )
+    except ValueError:
+        return jsonify({"error": "Nieprawidłowy format daty. Użyj YYYY-MM-DD"}), 400
+
+    email = request.args.get("email", "").strip()
+    if email:
+        query = query.where(func.lower(Appointment.email) == email.lower())
+
+    query = query.order_by(APPOINTMENT_DATE_COLUMN.desc(), Appointment.id.desc())
+
+    stream_format = requested_stream_format()
+    if stream_format:
+        return stream_query(query, serialize, stream_format)
+
+    paginate = "limit" in request.args or "cursor" in request.args
+
     try:
-        appointments = Appointment.query.order_by(APPOINTMENT_DATE_COLUMN.desc()).all()
-        return jsonify([appointment.to_dict() for appointment in appointments])
+        if not paginate:
+            rows = fetch_rows(query)
+            return json_response([serialize(row) for row in rows])
+
+        try:
+            limit = int(request.args.get("limit", DEFAULT_PAGE_SIZE))
+            cursor = request.args.get("cursor", "").strip()
+            if cursor:
+                cursor_date, cursor_id = decode_cursor(cursor)
+                query = query.where(
+                    tuple_(APPOINTMENT_DATE_COLUMN, Appointment.id)
+                    < tuple_(cursor_date, cursor_id)
+                )
+        except ValueError:
+            return jsonify({"error": "Nieprawidłowy parametr limit lub cursor"}), 400
+
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        # Pobieramy jeden element więcej, by wiedzieć, czy istnieje kolejna strona
+        rows = fetch_rows(query.limit(limit + 1)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        return json_response(
+            {
+                "appointments": [serialize(row) for row in rows],
+                "next_cursor": encode_cursor(rows[-1]) if has_more else None,
+            }
+        )
     except SQLAlchemyError:
         current_app.logger.exception("Błąd podczas pobierania rezerwacji")
         return jsonify({"error": "Wystąpił błąd podczas pobierania rezerwacji"}), 500
@@ -123,26 +270,30 @@ def get_appointments():
 
 @appointment_bp.route("/appointments/<int:appointment_id>", methods=["GET"])
 def get_appointment(appointment_id):
-    appointment = Appointment.query.get_or_404(appointment_id)
+    appointment = db.get_or_404(Appointment, appointment_id)
     return jsonify(appointment.to_dict())
 
 
 @appointment_bp.route("/appointments/<int:appointment_id>", methods=["PUT"])
 def update_appointment(appointment_id):
-    appointment = Appointment.query.get_or_404(appointment_id)
+    appointment = db.get_or_404(Appointment, appointment_id)
     data = request.get_json(silent=True) or {}
 
     if not isinstance(data, dict):
         return jsonify({"error": "Nieprawidłowy format danych"}), 400
 
+    before = appointment_state(appointment)
+
     if "status" in data:
         new_status = str(data["status"]).strip()
-        if new_status not in {"pending", "confirmed", "cancelled"}:
+        if new_status not in APPOINTMENT_STATUSES:
             return jsonify({"error": "Nieprawidłowy status"}), 400
         appointment.status = new_status
 
     try:
+        record_appointment_change(before, appointment_state(appointment))
         db.session.commit()
+        get_availability_cache().invalidate_day(appointment.appointment_date.date())
     except SQLAlchemyError:
         db.session.rollback()
         current_app.logger.exception("Błąd podczas aktualizacji rezerwacji")
@@ -158,11 +309,15 @@ def update_appointment(appointment_id):
 
 @appointment_bp.route("/appointments/<int:appointment_id>", methods=["DELETE"])
 def delete_appointment(appointment_id):
-    appointment = Appointment.query.get_or_404(appointment_id)
+    appointment = db.get_or_404(Appointment, appointment_id)
+    appointment_day = appointment.appointment_date.date()
+    before = appointment_state(appointment)
 
     try:
+        record_appointment_change(before, None)
         db.session.delete(appointment)
         db.session.commit()
+        get_availability_cache().invalidate_day(appointment_day)
     except SQLAlchemyError:
         db.session.rollback()
         current_app.logger.exception("Błąd podczas usuwania rezerwacji")
@@ -173,57 +328,56 @@ def delete_appointment(appointment_id):
 
 @appointment_bp.route("/available-slots", methods=["GET"])
 def get_available_slots():
+    # Domyślnie terminy na następne 30 dni, od jutra
+    start_date = date.today() + timedelta(days=1)
+    max_days = current_app.config.get("AVAILABILITY_MAX_DAYS", 90)
+
     try:
-        # Generowanie dostępnych terminów na następne 30 dni
-        available_slots = []
-        start_date = date.today() + timedelta(days=1)  # Od jutra
-
-        # Godziny pracy: 9:00-18:00, co godzinę
-        working_hours = [
-            time(9, 0),
-            time(10, 0),
-            time(11, 0),
-            time(12, 0),
-            time(13, 0),
-            time(14, 0),
-            time(15, 0),
-            time(16, 0),
-            time(17, 0),
-        ]
-
-        for i in range(30):  # 30 dni do przodu
-            current_date = start_date + timedelta(days=i)
-
-            # Pomijamy niedziele (weekday 6)
-            if current_date.weekday() == 6:
-                continue
-
-            # Soboty tylko do 14:00
-            if current_date.weekday() == 5:
-                day_hours = [t for t in working_hours if t.hour <= 14]
-            else:
-                day_hours = working_hours
-
-            for hour in day_hours:
-                slot_start = datetime.combine(current_date, hour)
-                slot_end = slot_start + timedelta(hours=1)
-
-                existing_appointment = Appointment.query.filter(
-                    STATUS_COLUMN.in_(["pending", "confirmed"]),
-                    APPOINTMENT_DATE_COLUMN >= slot_start,
-                    APPOINTMENT_DATE_COLUMN < slot_end,
-                ).first()
-
-                if not existing_appointment:
-                    available_slots.append(
-                        {
-                            "date": current_date.isoformat(),
-                            "time": hour.isoformat(timespec="minutes"),
-                            "datetime": slot_start.isoformat(),
-                        }
-                    )
-
-        return jsonify(available_slots)
+        days = int(request.args.get("days", DEFAULT_AVAILABILITY_DAYS))
+        granularity = int(
+            request.args.get(
+                "granularity",
+                current_app.config.get("AVAILABILITY_GRANULARITY_MINUTES", 15),
+            )
+        )
+        service_id = request.args.get("service_id", type=int)
+    except ValueError:
+        return jsonify({"error": "Nieprawidłowe parametry zapytania"}), 400
+
+    if not 1 <= days <= max_days:
+        return jsonify({"error": f"Parametr days musi mieścić się w 1-{max_days}"}), 400
+
+    if not 5 <= granularity <= 120:
+        return jsonify({"error": "Parametr granularity musi mieścić się w 5-120"}), 400
+
+    try:
+        if "service_id" not in request.args:
+            return jsonify(
+                get_availability_cache().get_window(
+                    None,
+                    start_date,
+                    days,
+                    compute_available_slots,
+                    versions=load_day_versions,
+                )
+            )
+
+        service = db.session.get(Service, service_id) if service_id else None
+        if service is None or not service.is_active:
+            return jsonify({"error": "Wybrana usługa nie istnieje"}), 404
+
+        duration = service.duration_minutes
+        return jsonify(
+            get_availability_cache().get_window(
+                (service.id, granularity),
+                start_date,
+                days,
+                lambda start, count: compute_service_slots(
+                    start, count, duration, granularity
+                ),
+                versions=load_day_versions,
+            )
+        )
 
     except SQLAlchemyError:
         current_app.logger.exception("Błąd podczas pobierania dostępnych terminów")
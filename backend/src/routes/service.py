@@ -6,18 +6,74 @@ from typing import Any
 from flask import Blueprint, current_app, jsonify, request
 from sqlalchemy.exc import SQLAlchemyError
 
-from src.models import Service, ServiceCategory, db
+from src.models import Appointment, Service, ServiceCategory, db
+from src.models.service import loading_options
+from src.utils.availability import get_availability_cache
+from src.utils.catalog import build_catalog, cached_catalog_response
+from src.utils.serializers import (
+    SERVICE_PROJECTION,
+    dumps_json,
+    fetch_rows,
+    requested_fields,
+)
+from src.utils.query_budget import query_budget
+from src.utils.stats_counters import adjust_service_revenue, effective_price
+from src.utils.streaming import requested_stream_format, stream_query
 
 service_bp = Blueprint("service", __name__)
 
 
+def _link_unassigned_appointments(service: Service) -> None:
+    """
+    Przypisuje usłudze rezerwacje bez powiązania, złożone pod jej nazwą,
+    i dolicza ich przychód do liczników statystyk.
+    """
+    names = db.session.execute(
+        db.select(Appointment.service)
+        .where(Appointment.service_id.is_(None))
+        .distinct()
+    ).scalars()
+    # Porównanie w Pythonie - lower() w SQLite pomija polskie znaki
+    matching = [name for name in names if name.lower() == service.name.lower()]
+    if matching:
+        unassigned = Appointment.service_id.is_(None) & Appointment.service.in_(
+            matching
+        )
+        adjust_service_revenue(
+            unassigned, effective_price(service.price, service.is_active)
+        )
+        db.session.execute(
+            db.update(Appointment)
+            .where(
+                Appointment.service_id.is_(None), Appointment.service.in_(matching)
+            )
+            .values(service_id=service.id)
+        )
+
+
+@service_bp.route("/catalog", methods=["GET"])
+@query_budget(2)
+def get_catalog() -> Any:
+    """Aktywne usługi pogrupowane według kategorii (strona główna, cennik)."""
+    return cached_catalog_response(("catalog",), build_catalog)
+
+
 @service_bp.route("/service-categories", methods=["GET"])
+@query_budget(2)
 def list_categories() -> Any:
-    categories = ServiceCategory.query.order_by(ServiceCategory.name.asc()).all()
-    return jsonify([category.to_dict() for category in categories])
+    def build() -> bytes:
+        categories = (
+            ServiceCategory.query.options(*loading_options("category"))
+            .order_by(ServiceCategory.name.asc())
+            .all()
+        )
+        return dumps_json([category.to_dict() for category in categories])
+
+    return cached_catalog_response(("service-categories",), build)
 
 
 @service_bp.route("/service-categories", methods=["POST"])
+@query_budget(3)
 def create_category() -> Any:
     data = request.get_json() or {}
     name = (data.get("name") or "").strip()
@@ -47,8 +103,11 @@ def create_category() -> Any:
 
 
 @service_bp.route("/service-categories/<int:category_id>", methods=["PUT"])
+@query_budget(4)
 def update_category(category_id: int) -> Any:
-    category = ServiceCategory.query.get_or_404(category_id)
+    category = db.get_or_404(
+        ServiceCategory, category_id, options=loading_options("category")
+    )
     data = request.get_json() or {}
     name = (data.get("name") or "").strip()
     description = (data.get("description") or "").strip() or None
@@ -79,13 +138,20 @@ def update_category(category_id: int) -> Any:
 
 
 @service_bp.route("/service-categories/<int:category_id>", methods=["DELETE"])
+@query_budget(4)
 def delete_category(category_id: int) -> Any:
-    category = ServiceCategory.query.get_or_404(category_id)
-    if category.services:
+    has_services = db.session.execute(
+        db.select(db.exists().where(Service.category_id == category_id))
+    ).scalar()
+    if has_services:
         return jsonify(
             {"error": "Usuń lub przenieś usługi przed usunięciem kategorii"}
         ), 400
 
+    category = db.get_or_404(
+        ServiceCategory, category_id, options=loading_options("category_delete")
+    )
+
     try:
         db.session.delete(category)
         db.session.commit()
@@ -98,16 +164,30 @@ def delete_category(category_id: int) -> Any:
 
 
 @service_bp.route("/services", methods=["GET"])
+@query_budget(2)
 def list_services() -> Any:
-    services = (
-        Service.query.options(db.joinedload(Service.category))
-        .order_by(Service.is_active.desc(), Service.name.asc())
-        .all()
+    try:
+        fields = requested_fields(SERVICE_PROJECTION)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    query = SERVICE_PROJECTION.select(fields).order_by(
+        Service.is_active.desc(), Service.name.asc()
+    )
+    serialize = SERVICE_PROJECTION.serializer(fields)
+
+    stream_format = requested_stream_format()
+    if stream_format:
+        return stream_query(query, serialize, stream_format)
+
+    return cached_catalog_response(
+        ("services", tuple(fields)),
+        lambda: dumps_json([serialize(row) for row in fetch_rows(query)]),
     )
-    return jsonify([service.to_dict() for service in services])
 
 
 @service_bp.route("/services", methods=["POST"])
+@query_budget(7)
 def create_service() -> Any:
     data = request.get_json() or {}
     name = (data.get("name") or "").strip()
@@ -130,7 +210,9 @@ def create_service() -> Any:
     except Exception:
         return jsonify({"error": "Nieprawidłowa cena"}), 400
 
-    category = ServiceCategory.query.get(category_id)
+    category = db.session.get(
+        ServiceCategory, category_id, options=loading_options("category")
+    )
     if category is None:
         return jsonify({"error": "Wybrana kategoria nie istnieje"}), 404
 
@@ -143,7 +225,11 @@ def create_service() -> Any:
         service.is_active = is_active
         service.category = category
         db.session.add(service)
+        db.session.flush()
+        _link_unassigned_appointments(service)
         db.session.commit()
+        # Czas trwania usług wpływa na wszystkie wyliczone terminy
+        get_availability_cache().clear()
     except SQLAlchemyError:
         db.session.rollback()
         current_app.logger.exception("Błąd podczas tworzenia usługi")
@@ -153,8 +239,9 @@ def create_service() -> Any:
 
 
 @service_bp.route("/services/<int:service_id>", methods=["PUT"])
+@query_budget(8)
 def update_service(service_id: int) -> Any:
-    service = Service.query.get_or_404(service_id)
+    service = db.get_or_404(Service, service_id, options=loading_options("service"))
     data = request.get_json() or {}
 
     name = (data.get("name") or "").strip()
@@ -177,11 +264,20 @@ def update_service(service_id: int) -> Any:
     except Exception:
         return jsonify({"error": "Nieprawidłowa cena"}), 400
 
-    category = ServiceCategory.query.get(category_id)
+    category = db.session.get(
+        ServiceCategory, category_id, options=loading_options("category")
+    )
     if category is None:
         return jsonify({"error": "Wybrana kategoria nie istnieje"}), 404
 
     try:
+        # Przychód w licznikach zależy od ceny i aktywności usługi
+        adjust_service_revenue(
+            Appointment.service_id == service_id,
+            effective_price(price, is_active)
+            - effective_price(service.price, service.is_active),
+        )
+
         service.name = name
         service.description = description
         service.price = price
@@ -189,7 +285,9 @@ def update_service(service_id: int) -> Any:
         service.is_active = is_active
         service.category = category
 
+        _link_unassigned_appointments(service)
         db.session.commit()
+        get_availability_cache().clear()
     except SQLAlchemyError:
         db.session.rollback()
         current_app.logger.exception("Błąd podczas aktualizacji usługi")
@@ -199,12 +297,25 @@ def update_service(service_id: int) -> Any:
 
 
 @service_bp.route("/services/<int:service_id>", methods=["DELETE"])
+@query_budget(4)
 def delete_service(service_id: int) -> Any:
-    service = Service.query.get_or_404(service_id)
+    service = db.get_or_404(Service, service_id)
 
     try:
+        # Rezerwacje odłączone od usługi przestają wnosić jej cenę do przychodu
+        adjust_service_revenue(
+            Appointment.service_id == service_id,
+            -effective_price(service.price, service.is_active),
+        )
+        # Niezależnie od PRAGMA foreign_keys rezerwacje tracą powiązanie
+        db.session.execute(
+            db.update(Appointment)
+            .where(Appointment.service_id == service_id)
+            .values(service_id=None)
+        )
         db.session.delete(service)
         db.session.commit()
+        get_availability_cache().clear()
     except SQLAlchemyError:
         db.session.rollback()
         current_app.logger.exception("Błąd podczas usuwania usługi")
@@ -48,6 +48,7 @@ def create_or_update_setting() -> Any:
     try:
         setting = Settings.set_value(key, value, description)
         db.session.commit()
+        Settings.invalidate_cache()
         return jsonify(setting.to_dict()), 200
     except SQLAlchemyError:
         db.session.rollback()
@@ -67,34 +68,48 @@ def update_settings_bulk() -> Any:
     if not isinstance(settings_data, list):
         return jsonify({"error": "Pole 'settings' musi być tablicą"}), 400
 
-    try:
-        updated_settings = []
-        for item in settings_data:
-            if not isinstance(item, dict):
-                continue
-
-            key = (item.get("key") or "").strip()
-            if not key:
-                continue
+    items = []
+    for item in settings_data:
+        if not isinstance(item, dict):
+            continue
 
-            value = item.get("value")
-            description = (item.get("description") or "").strip() or None
+        key = (item.get("key") or "").strip()
+        if not key:
+            continue
 
-            setting = Settings.set_value(key, value, description)
-            updated_settings.append(setting)
+        value = item.get("value")
+        # Kolumna jest tekstowa; porównanie z zapisaną wartością wymaga tekstu
+        if value is not None and not isinstance(value, str):
+            value = str(value)
+        description = (item.get("description") or "").strip() or None
+        items.append((key, value, description))
 
+    try:
+        statuses = Settings.upsert_many(items)
         db.session.commit()
-        return jsonify(
-            {
-                "message": f"Zaktualizowano {len(updated_settings)} ustawień",
-                "settings": [s.to_dict() for s in updated_settings],
-            }
-        ), 200
     except SQLAlchemyError:
         db.session.rollback()
         current_app.logger.exception("Błąd podczas zapisywania ustawień")
         return jsonify({"error": "Nie udało się zapisać ustawień"}), 500
 
+    changed = [key for key, status in statuses.items() if status != "unchanged"]
+    if changed:
+        Settings.invalidate_cache()
+
+    settings = {
+        setting.key: setting
+        for setting in Settings.query.filter(Settings.key.in_(list(statuses)))
+    }
+    return jsonify(
+        {
+            "message": f"Zaktualizowano {len(changed)} ustawień",
+            "settings": [settings[key].to_dict() for key in statuses],
+            "results": [
+                {"key": key, "status": status} for key, status in statuses.items()
+            ],
+        }
+    ), 200
+
 
 @settings_bp.route("/settings/<string:key>", methods=["DELETE"])
 def delete_setting(key: str) -> Any:
@@ -107,6 +122,7 @@ def delete_setting(key: str) -> Any:
     try:
         db.session.delete(setting)
         db.session.commit()
+        Settings.invalidate_cache()
         return jsonify({"message": "Ustawienie zostało usunięte"}), 200
     except SQLAlchemyError:
         db.session.rollback()
@@ -5,6 +5,13 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm.attributes import InstrumentedAttribute
 
 from src.models.user import User, db
+from src.utils.serializers import (
+    USER_PROJECTION,
+    fetch_rows,
+    json_response,
+    requested_fields,
+)
+from src.utils.streaming import requested_stream_format, stream_query
 
 user_bp = Blueprint("user", __name__)
 
@@ -14,8 +21,20 @@ CREATED_AT_COLUMN = cast(InstrumentedAttribute, User.created_at)
 @user_bp.route("/users", methods=["GET"])
 def get_users():
     try:
-        users = User.query.order_by(CREATED_AT_COLUMN.desc()).all()
-        return jsonify([user.to_dict() for user in users])
+        fields = requested_fields(USER_PROJECTION)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    query = USER_PROJECTION.select(fields).order_by(CREATED_AT_COLUMN.desc())
+    serialize = USER_PROJECTION.serializer(fields)
+
+    stream_format = requested_stream_format()
+    if stream_format:
+        return stream_query(query, serialize, stream_format)
+
+    try:
+        rows = fetch_rows(query)
+        return json_response([serialize(row) for row in rows])
     except SQLAlchemyError:
         current_app.logger.exception("Błąd podczas pobierania użytkowników")
         return jsonify({"error": "Wystąpił błąd podczas pobierania użytkowników"}), 500
@@ -0,0 +1,225 @@
+"""Import i eksport rezerwacji w formacie CSV lub NDJSON."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from typing import IO, Any, Iterator
+
+from src.models import Appointment, db
+from src.utils.appointment_validation import (
+    AppointmentDataError,
+    ServiceLookup,
+    validate_appointment,
+)
+from src.utils.availability import get_availability_cache
+from src.utils.serializers import dumps_json, fetch_rows
+from src.utils.stats_counters import AppointmentState, record_appointments_created
+
+TRANSFER_FORMATS = ("csv", "ndjson")
+
+# Liczba wierszy zapisywanych w jednej transakcji (executemany)
+IMPORT_BATCH_SIZE = 2000
+
+# Raport importu zawiera co najwyżej tyle opisów błędnych wierszy
+MAX_REPORTED_ERRORS = 1000
+
+EXPORT_BATCH_SIZE = 1000
+
+# Kolumny eksportu; plik można ponownie zaimportować (`id` i `created_at`
+# są przy imporcie pomijane)
+EXPORT_COLUMNS = (
+    "id",
+    "name",
+    "email",
+    "phone",
+    "service",
+    "service_id",
+    "date",
+    "time",
+    "status",
+    "message",
+    "created_at",
+)
+
+
+@dataclass
+class ImportReport:
+    """Wynik importu: liczba zapisanych i odrzuconych wierszy oraz błędy."""
+
+    imported: int = 0
+    failed: int = 0
+    errors: list[dict[str, Any]] = field(default_factory=list)
+
+    def add_error(self, line: int, error: AppointmentDataError) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, **error.to_dict()})
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+
+def transfer_format(name: str | None, filename: str | None = None) -> str | None:
+    """Ustala format z nazwy (`csv`, `ndjson`) lub rozszerzenia pliku."""
+    if name:
+        name = name.strip().lower()
+        return name if name in TRANSFER_FORMATS else None
+    if filename:
+        extension = filename.rsplit(".", 1)[-1].lower()
+        if extension == "csv":
+            return "csv"
+        if extension in ("ndjson", "jsonl"):
+            return "ndjson"
+    return None
+
+
+def read_records(
+    stream: IO[bytes], fmt: str
+) -> Iterator[tuple[int, dict[str, Any] | None]]:
+    """
+    Czyta kolejne wiersze pliku bez wczytywania go w całości.
+
+    Zwraca pary (numer linii, dane); dane są None dla linii, której nie
+    da się odczytać jako obiektu JSON.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(text, restval="")
+            for record in reader:
+                yield reader.line_num, record
+            return
+
+        for line_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield line_number, record if isinstance(record, dict) else None
+    finally:
+        # Strumień należy do wywołującego
+        text.detach()
+
+
+def _insert_batch(rows: list[dict[str, Any]]) -> None:
+    db.session.execute(db.insert(Appointment.__table__), rows)
+    record_appointments_created(
+        [
+            AppointmentState(
+                row["status"], row["appointment_date"].date(), row["service_id"]
+            )
+            for row in rows
+        ]
+    )
+    db.session.commit()
+    availability_cache = get_availability_cache()
+    for day in {row["appointment_date"].date() for row in rows}:
+        availability_cache.invalidate_day(day)
+
+
+def import_appointments(
+    stream: IO[bytes],
+    fmt: str,
+    report: ImportReport,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> ImportReport:
+    """
+    Importuje rezerwacje (np. historię z poprzedniego systemu).
+
+    Wiersze sprawdzane są tymi samymi regułami co `POST /api/appointments`,
+    z dopuszczeniem dat z przeszłości i statusu z pliku. Poprawne wiersze
+    zapisywane są porcjami po `batch_size` w osobnych transakcjach razem
+    z licznikami statystyk; powiadomienia email nie są wysyłane. Błędne
+    wiersze trafiają do raportu i nie przerywają importu.
+
+    `report` wypełniany jest na bieżąco, więc po błędzie bazy danych
+    (`SQLAlchemyError`) wskazuje, ile wierszy zdążyło zostać zapisanych.
+    """
+    services = ServiceLookup()
+    batch: list[dict[str, Any]] = []
+
+    for line, record in read_records(stream, fmt):
+        try:
+            if record is None:
+                raise AppointmentDataError("Nieprawidłowy wiersz JSON")
+            batch.append(validate_appointment(record, services, historical=True))
+        except AppointmentDataError as e:
+            report.add_error(line, e)
+            continue
+
+        if len(batch) >= batch_size:
+            _insert_batch(batch)
+            report.imported += len(batch)
+            batch = []
+
+    if batch:
+        _insert_batch(batch)
+        report.imported += len(batch)
+    return report
+
+
+def _export_record(row: Any) -> dict[str, Any]:
+    return {
+        "id": row.id,
+        "name": row.name,
+        "email": row.email,
+        "phone": row.phone,
+        "service": row.service,
+        "service_id": row.service_id,
+        "date": row.appointment_date.date().isoformat(),
+        "time": row.appointment_date.strftime("%H:%M"),
+        "status": row.status,
+        "message": row.message,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+    }
+
+
+def export_appointments(fmt: str) -> Iterator[bytes]:
+    """
+    Koduje wszystkie rezerwacje (chronologicznie) porcjami bajtów.
+
+    Wiersze pobierane są z kursora po `EXPORT_BATCH_SIZE`, więc zużycie
+    pamięci nie zależy od liczby rezerwacji.
+    """
+    statement = (
+        db.select(
+            Appointment.id,
+            Appointment.name,
+            Appointment.email,
+            Appointment.phone,
+            Appointment.service,
+            Appointment.service_id,
+            Appointment.appointment_date,
+            Appointment.status,
+            Appointment.message,
+            Appointment.created_at,
+        )
+        .order_by(Appointment.appointment_date.asc(), Appointment.id.asc())
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    rows = fetch_rows(statement)
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+        for partition in rows.partitions():
+            writer.writerows(_export_record(row) for row in partition)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+        return
+
+    for partition in rows.partitions():
+        yield b"".join(dumps_json(_export_record(row)) + b"\n" for row in partition)
@@ -0,0 +1,148 @@
+"""Walidacja danych rezerwacji wspólna dla API i importu."""
+
+from __future__ import annotations
+
+from datetime import datetime, time
+from typing import Any, Mapping
+
+from src.models import Service, db
+
+APPOINTMENT_STATUSES = {"pending", "confirmed", "cancelled"}
+
+DEFAULT_APPOINTMENT_TIME = time(9, 0)
+
+REQUIRED_FIELDS = ("name", "email", "service", "date")
+
+
+class AppointmentDataError(ValueError):
+    """Nieprawidłowe dane rezerwacji; `fields` wskazuje brakujące pola."""
+
+    def __init__(self, message: str, fields: list[str] | None = None) -> None:
+        super().__init__(message)
+        self.fields = fields
+
+    def to_dict(self) -> dict[str, Any]:
+        result: dict[str, Any] = {"error": str(self)}
+        if self.fields:
+            result["fields"] = self.fields
+        return result
+
+
+class ServiceLookup:
+    """
+    Usługi z katalogu potrzebne do walidacji rezerwacji.
+
+    Katalog wczytywany jest przy pierwszym użyciu i jest współdzielony przez
+    wszystkie walidowane wiersze (np. w trakcie importu).
+    """
+
+    def __init__(self) -> None:
+        self._names: dict[int, str] | None = None
+        self._ids: dict[str, int] | None = None
+
+    def name_for(self, service_id: int) -> str | None:
+        """Zwraca nazwę usługi o podanym identyfikatorze."""
+        if self._names is None:
+            rows = db.session.execute(db.select(Service.id, Service.name))
+            self._names = {service_id: name for service_id, name in rows}
+        return self._names.get(service_id)
+
+    def id_for(self, name: str) -> int | None:
+        """Zwraca identyfikator usługi z katalogu o podanej nazwie."""
+        if not name:
+            return None
+        if self._ids is None:
+            self._ids = Service.ids_by_name()
+        return self._ids.get(name.lower())
+
+
+def _text(data: Mapping[str, Any], field: str) -> str:
+    value = data.get(field)
+    return "" if value is None else str(value).strip()
+
+
+def validate_appointment(
+    data: Mapping[str, Any], services: ServiceLookup, historical: bool = False
+) -> dict[str, Any]:
+    """
+    Sprawdza dane rezerwacji i zwraca wartości kolumn do zapisu.
+
+    Przy `historical=True` (import historii) dopuszczalne są daty z
+    przeszłości, a status może pochodzić z danych. Zwykła rezerwacja
+    zawsze otrzymuje status "pending".
+
+    Raises:
+        AppointmentDataError: gdy dane są niekompletne lub nieprawidłowe
+    """
+    missing_fields = [field for field in REQUIRED_FIELDS if not _text(data, field)]
+    has_service_id = _text(data, "service_id") != ""
+    if "service" in missing_fields and has_service_id:
+        # Usługę można wskazać samym identyfikatorem z katalogu
+        missing_fields.remove("service")
+    if missing_fields:
+        raise AppointmentDataError("Brakuje wymaganych danych", missing_fields)
+
+    date_str = _text(data, "date")
+    time_str = _text(data, "time")
+    datetime_str = _text(data, "datetime")
+
+    appointment_datetime: datetime | None = None
+
+    if datetime_str:
+        try:
+            appointment_datetime = datetime.fromisoformat(datetime_str)
+        except ValueError:
+            raise AppointmentDataError("Nieprawidłowy format pola datetime") from None
+
+    if appointment_datetime is None:
+        try:
+            parsed_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+        except ValueError:
+            raise AppointmentDataError(
+                "Nieprawidłowy format daty. Użyj YYYY-MM-DD"
+            ) from None
+
+        if time_str:
+            try:
+                parsed_time = datetime.strptime(time_str, "%H:%M").time()
+            except ValueError:
+                raise AppointmentDataError(
+                    "Nieprawidłowy format czasu. Użyj HH:MM"
+                ) from None
+        else:
+            parsed_time = DEFAULT_APPOINTMENT_TIME
+
+        appointment_datetime = datetime.combine(parsed_date, parsed_time)
+
+    if not historical and appointment_datetime < datetime.now():
+        raise AppointmentDataError("Nie można umówić wizyty w przeszłości")
+
+    status = "pending"
+    if historical and _text(data, "status"):
+        status = _text(data, "status")
+        if status not in APPOINTMENT_STATUSES:
+            raise AppointmentDataError("Nieprawidłowy status")
+
+    service_name = _text(data, "service")
+    if has_service_id:
+        try:
+            service_id: int | None = int(_text(data, "service_id"))
+        except ValueError:
+            service_id = None
+        catalog_name = services.name_for(service_id) if service_id else None
+        if catalog_name is None:
+            raise AppointmentDataError("Wybrana usługa nie istnieje")
+        service_name = service_name or catalog_name
+    else:
+        service_id = services.id_for(service_name)
+
+    return {
+        "name": _text(data, "name"),
+        "email": _text(data, "email"),
+        "phone": _text(data, "phone") or None,
+        "service": service_name,
+        "service_id": service_id,
+        "appointment_date": appointment_datetime,
+        "message": _text(data, "message") or None,
+        "status": status,
+    }
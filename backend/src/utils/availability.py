@@ -0,0 +1,424 @@
+"""Silnik wyliczania wolnych terminów wizyt."""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime, time, timedelta
+from time import monotonic
+from typing import Any, Callable, Hashable, cast
+
+from flask import current_app
+from sqlalchemy import func, literal, union_all
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+
+from src.models import Appointment, Service, db
+
+STATUS_COLUMN = cast(InstrumentedAttribute[str], Appointment.status)
+APPOINTMENT_DATE_COLUMN = cast(
+    InstrumentedAttribute[datetime], Appointment.appointment_date
+)
+
+# Statusy rezerwacji, które blokują termin w kalendarzu
+BLOCKING_STATUSES = ("pending", "confirmed")
+
+# Godziny pracy: 9:00-18:00, w soboty 9:00-15:00, niedziele wolne
+OPENING_TIME = time(9, 0)
+CLOSING_TIME = time(18, 0)
+SATURDAY_CLOSING_TIME = time(15, 0)
+
+SLOT_LENGTH = timedelta(hours=1)
+
+# Czas trwania przyjmowany dla rezerwacji, których usługi nie ma w katalogu
+DEFAULT_DURATION_MINUTES = 60
+
+
+def working_window_for(day: date) -> tuple[int, int] | None:
+    """Zwraca godziny pracy danego dnia jako minuty od północy (otwarcie, zamknięcie)."""
+    if day.weekday() == 6:
+        return None
+
+    closing = SATURDAY_CLOSING_TIME if day.weekday() == 5 else CLOSING_TIME
+    return (
+        OPENING_TIME.hour * 60 + OPENING_TIME.minute,
+        closing.hour * 60 + closing.minute,
+    )
+
+
+def working_hours_for(day: date) -> list[time]:
+    """Zwraca pełne godziny rozpoczęcia jednogodzinnych wizyt dla danego dnia."""
+    window = working_window_for(day)
+    if window is None:
+        return []
+
+    opening, closing = window
+    return [time(minute // 60, 0) for minute in range(opening, closing, 60)]
+
+
+def load_occupancy(start: datetime, end: datetime) -> dict[date, list[datetime]]:
+    """
+    Pobiera jednym zapytaniem wszystkie blokujące rezerwacje z przedziału.
+
+    Returns:
+        Słownik dzień -> posortowana lista godzin rozpoczęcia rezerwacji
+    """
+    rows = db.session.execute(
+        db.select(APPOINTMENT_DATE_COLUMN)
+        .where(
+            STATUS_COLUMN.in_(BLOCKING_STATUSES),
+            APPOINTMENT_DATE_COLUMN >= start,
+            APPOINTMENT_DATE_COLUMN < end,
+        )
+        .order_by(APPOINTMENT_DATE_COLUMN)
+    ).scalars()
+
+    occupancy: dict[date, list[datetime]] = defaultdict(list)
+    for appointment_date in rows:
+        occupancy[appointment_date.date()].append(appointment_date)
+    return occupancy
+
+
+def load_busy_intervals(
+    start: datetime, end: datetime
+) -> dict[date, list[tuple[int, int]]]:
+    """
+    Buduje indeks zajętości: dzień -> posortowane, scalone przedziały zajęte.
+
+    Przedziały wyrażone są w minutach od północy, a ich długość wynika
+    z rzeczywistego czasu trwania zarezerwowanej usługi (złączenie po
+    `service_id`).
+    """
+    longest = max(
+        db.session.execute(db.select(func.max(Service.duration_minutes))).scalar()
+        or 0,
+        DEFAULT_DURATION_MINUTES,
+    )
+
+    # Rezerwacje z końcówki poprzedniego dnia mogą zachodzić na okno
+    rows = db.session.execute(
+        db.select(APPOINTMENT_DATE_COLUMN, Service.duration_minutes)
+        .outerjoin(Service, Service.id == Appointment.service_id)
+        .where(
+            STATUS_COLUMN.in_(BLOCKING_STATUSES),
+            APPOINTMENT_DATE_COLUMN >= start - timedelta(minutes=longest),
+            APPOINTMENT_DATE_COLUMN < end,
+        )
+        .order_by(APPOINTMENT_DATE_COLUMN)
+    )
+
+    raw: dict[date, list[tuple[int, int]]] = defaultdict(list)
+    for appointment_date, duration in rows:
+        duration = duration or DEFAULT_DURATION_MINUTES
+        day = appointment_date.date()
+        begin = appointment_date.hour * 60 + appointment_date.minute
+        finish = begin + duration
+        raw[day].append((begin, min(finish, 24 * 60)))
+        # Wizyta przechodząca przez północ zajmuje też początek kolejnego dnia
+        if finish > 24 * 60:
+            raw[day + timedelta(days=1)].append((0, finish - 24 * 60))
+
+    index: dict[date, list[tuple[int, int]]] = {}
+    for day, intervals in raw.items():
+        intervals.sort()
+        merged = [intervals[0]]
+        for begin, finish in intervals[1:]:
+            last_begin, last_finish = merged[-1]
+            if begin <= last_finish:
+                merged[-1] = (last_begin, max(last_finish, finish))
+            else:
+                merged.append((begin, finish))
+        index[day] = merged
+    return index
+
+
+def _is_slot_taken(starts: list[datetime], slot_start: datetime) -> bool:
+    # Termin jest zajęty, jeśli jakaś rezerwacja zaczyna się w [start, start + 1h)
+    index = bisect_left(starts, slot_start)
+    return index < len(starts) and starts[index] < slot_start + SLOT_LENGTH
+
+
+def _slot_dict(day: date, minute: int) -> dict[str, str]:
+    slot_start = datetime.combine(day, time(minute // 60, minute % 60))
+    return {
+        "date": day.isoformat(),
+        "time": slot_start.time().isoformat(timespec="minutes"),
+        "datetime": slot_start.isoformat(),
+    }
+
+
+def compute_available_slots(start_date: date, days: int) -> list[dict[str, str]]:
+    """
+    Wylicza wolne godzinne terminy dla `days` kolejnych dni od `start_date`.
+
+    Wszystkie rezerwacje z okna są ładowane jednym zapytaniem, a dostępność
+    każdego terminu sprawdzana jest w pamięci.
+    """
+    window_start = datetime.combine(start_date, time.min)
+    window_end = window_start + timedelta(days=days)
+    occupancy = load_occupancy(window_start, window_end)
+
+    available_slots = []
+    for i in range(days):
+        current_date = start_date + timedelta(days=i)
+        starts = occupancy.get(current_date, [])
+
+        for hour in working_hours_for(current_date):
+            slot_start = datetime.combine(current_date, hour)
+            if _is_slot_taken(starts, slot_start):
+                continue
+
+            available_slots.append(
+                {
+                    "date": current_date.isoformat(),
+                    "time": hour.isoformat(timespec="minutes"),
+                    "datetime": slot_start.isoformat(),
+                }
+            )
+
+    return available_slots
+
+
+def compute_service_slots(
+    start_date: date, days: int, duration_minutes: int, granularity_minutes: int
+) -> list[dict[str, str]]:
+    """
+    Wylicza godziny rozpoczęcia, w których mieści się wizyta o danej długości.
+
+    Kandydaci generowani są co `granularity_minutes` od otwarcia gabinetu,
+    a wizyta musi skończyć się przed zamknięciem i nie nachodzić na żadną
+    istniejącą rezerwację.
+    """
+    window_start = datetime.combine(start_date, time.min)
+    window_end = window_start + timedelta(days=days)
+    busy = load_busy_intervals(window_start, window_end)
+
+    available_slots = []
+    for i in range(days):
+        current_date = start_date + timedelta(days=i)
+        window = working_window_for(current_date)
+        if window is None:
+            continue
+
+        opening, closing = window
+        intervals = busy.get(current_date, [])
+        position = 0
+        candidate = opening
+
+        while candidate + duration_minutes <= closing:
+            # Pomijamy przedziały, które kończą się przed kandydatem
+            while position < len(intervals) and intervals[position][1] <= candidate:
+                position += 1
+
+            if (
+                position < len(intervals)
+                and intervals[position][0] < candidate + duration_minutes
+            ):
+                # Przeskok do pierwszego kandydata po końcu zajętego przedziału
+                busy_end = intervals[position][1]
+                steps = -(-(busy_end - opening) // granularity_minutes)
+                candidate = opening + steps * granularity_minutes
+                continue
+
+            available_slots.append(_slot_dict(current_date, candidate))
+            candidate += granularity_minutes
+
+    return available_slots
+
+
+def load_day_versions(start_date: date, days: int) -> dict[date, Hashable]:
+    """
+    Zwraca wersje dni okna jednym zapytaniem (indeks pokrywający
+    `appointment_date, updated_at`).
+
+    Wersja dnia to liczba i `MAX(updated_at)` rezerwacji tego dnia i dnia
+    poprzedniego (wizyta przechodząca przez północ) oraz wersja usług
+    (czas trwania). Dodanie, zmiana lub usunięcie rezerwacji w dowolnym
+    procesie serwera zmienia wersję jej dnia.
+    """
+    window_start = datetime.combine(start_date - timedelta(days=1), time.min)
+    window_end = datetime.combine(start_date + timedelta(days=days), time.min)
+    # Data z tekstu kolumny (YYYY-MM-DD ...): taniej niż date() dla każdego wiersza
+    day = func.substr(APPOINTMENT_DATE_COLUMN, 1, 10)
+    per_day = (
+        db.select(day, func.count(), func.max(Appointment.updated_at))
+        .where(
+            APPOINTMENT_DATE_COLUMN >= window_start,
+            APPOINTMENT_DATE_COLUMN < window_end,
+        )
+        .group_by(day)
+    )
+    services = db.select(
+        literal(None), func.count(Service.id), func.max(Service.updated_at)
+    )
+
+    catalog: tuple[Any, ...] | None = None
+    by_day: dict[date, tuple[Any, ...]] = {}
+    for bucket, count, updated in db.session.execute(union_all(per_day, services)):
+        if bucket is None:
+            catalog = (count, updated)
+        else:
+            by_day[date.fromisoformat(bucket)] = (count, updated)
+
+    versions: dict[date, Hashable] = {}
+    for i in range(days):
+        current = start_date + timedelta(days=i)
+        versions[current] = (
+            catalog,
+            by_day.get(current - timedelta(days=1)),
+            by_day.get(current),
+        )
+    return versions
+
+
+class AvailabilityCache:
+    """
+    Pamięć podręczna wolnych terminów z dokładnością do jednego dnia.
+
+    Wpisy mają klucz (dzień, wariant), gdzie wariant opisuje sposób liczenia
+    terminów (np. identyfikator usługi i krok siatki). Dzięki temu zapis
+    rezerwacji unieważnia tylko swój dzień, a okno dat składane jest z wpisów
+    poszczególnych dni. Rozmiar jest ograniczony (LRU), a wpisy wygasają po
+    `ttl` sekundach.
+
+    Wpis pamięta wersję swojego dnia (`load_day_versions`) i jest używany
+    tylko przy zgodnej wersji, więc rezerwacje zapisane przez inne procesy
+    serwera (workery gunicorn) są widoczne od razu, a nie po `ttl`.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl: float = 60.0) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # (dzień, wariant) -> (czas zapisu, wersja dnia, terminy)
+        self._entries: OrderedDict[
+            tuple[date, Hashable], tuple[float, Hashable, list[dict[str, str]]]
+        ] = OrderedDict()
+        self._variants_by_day: dict[date, set[Hashable]] = defaultdict(set)
+        # Numery unieważnień: dnia (`invalidate_day`) i całości (`clear`)
+        self._day_generations: dict[date, int] = defaultdict(int)
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale = 0
+
+    def get_window(
+        self,
+        variant: Hashable,
+        start_date: date,
+        days: int,
+        compute: Callable[[date, int], list[dict[str, str]]],
+        versions: Callable[[date, int], dict[date, Hashable]] | None = None,
+    ) -> list[dict[str, str]]:
+        """
+        Zwraca terminy dla okna dat, licząc tylko brakujące dni.
+
+        `compute(start, days)` musi zwracać płaską listę terminów posortowaną
+        chronologicznie, tak jak funkcje `compute_*_slots`. `versions(start,
+        days)` zwraca wersje dni okna (np. `load_day_versions`); wpis
+        o innej wersji liczony jest ponownie.
+        """
+        window = [start_date + timedelta(days=i) for i in range(days)]
+        # Wersje odczytane przed wyliczeniem: zapis w trakcie wyliczenia
+        # zmieni wersję dnia, więc zapamiętany wpis nie zostanie użyty
+        current = versions(start_date, days) if versions is not None else {}
+        now = monotonic()
+        found: dict[date, list[dict[str, str]]] = {}
+
+        with self._lock:
+            for day in window:
+                entry = self._entries.get((day, variant))
+                if entry is None or now - entry[0] >= self.ttl:
+                    self.misses += 1
+                elif entry[1] != current.get(day):
+                    self.misses += 1
+                    self.stale += 1
+                else:
+                    self._entries.move_to_end((day, variant))
+                    found[day] = entry[2]
+                    self.hits += 1
+
+            missing = [day for day in window if day not in found]
+            generation = self._generation
+            day_generations = {
+                day: self._day_generations.get(day, 0) for day in missing
+            }
+
+        if missing:
+            # Jedno wyliczenie obejmujące wszystkie brakujące dni
+            first, last = missing[0], missing[-1]
+            computed: dict[date, list[dict[str, str]]] = defaultdict(list)
+            for slot in compute(first, (last - first).days + 1):
+                computed[date.fromisoformat(slot["date"])].append(slot)
+
+            with self._lock:
+                for day in missing:
+                    found[day] = computed.get(day, [])
+                    # Dzień unieważniony w trakcie wyliczenia mógł zostać
+                    # policzony ze stanu sprzed zapisu; nie trafia do pamięci
+                    if (
+                        self._generation == generation
+                        and self._day_generations.get(day, 0) == day_generations[day]
+                    ):
+                        self._store((day, variant), current.get(day), found[day], now)
+
+        return [slot for day in window for slot in found[day]]
+
+    def _store(
+        self,
+        key: tuple[date, Hashable],
+        version: Hashable,
+        slots: list[dict[str, str]],
+        now: float,
+    ) -> None:
+        self._entries[key] = (now, version, slots)
+        self._entries.move_to_end(key)
+        self._variants_by_day[key[0]].add(key[1])
+
+        while len(self._entries) > self.max_entries:
+            (day, variant), _ = self._entries.popitem(last=False)
+            self._forget_variant(day, variant)
+            self.evictions += 1
+
+    def _forget_variant(self, day: date, variant: Hashable) -> None:
+        variants = self._variants_by_day.get(day)
+        if variants is not None:
+            variants.discard(variant)
+            if not variants:
+                del self._variants_by_day[day]
+
+    def invalidate_day(self, day: date) -> None:
+        """Usuwa wszystkie warianty wpisów dla wskazanego dnia."""
+        with self._lock:
+            self._day_generations[day] += 1
+            for variant in self._variants_by_day.pop(day, set()):
+                if self._entries.pop((day, variant), None) is not None:
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        """Usuwa całą zawartość, np. po zmianie czasu trwania usług."""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._variants_by_day.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Zwraca liczniki trafień, chybień i usunięć."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "stale": self.stale,
+            }
+
+
+def get_availability_cache() -> AvailabilityCache:
+    """Pobiera pamięć podręczną terminów z aplikacji."""
+    return current_app.extensions["availability_cache"]
@@ -0,0 +1,158 @@
+"""Pamięć podręczna zserializowanego katalogu usług i warunkowe GET."""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Hashable
+
+from flask import Response, current_app, has_app_context, request
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from src.models import Service, ServiceCategory, db
+from src.utils.serializers import CATALOG_PROJECTION, dumps_json, fetch_rows
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    """Zakodowana odpowiedź wraz z wersją katalogu, z której powstała."""
+
+    body: bytes
+    etag: str
+    version: tuple[Any, ...]
+    last_modified: datetime | None
+
+
+def catalog_version() -> tuple[Any, ...]:
+    """
+    Zwraca wersję katalogu jednym zapytaniem.
+
+    Liczby wierszy wykrywają usunięcia, a `MAX(updated_at)` dodania
+    i zmiany, także zapisane przez inne procesy serwera.
+    """
+    row = db.session.execute(
+        db.select(
+            db.select(func.count(Service.id)).scalar_subquery(),
+            db.select(func.max(Service.updated_at)).scalar_subquery(),
+            db.select(func.count(ServiceCategory.id)).scalar_subquery(),
+            db.select(func.max(ServiceCategory.updated_at)).scalar_subquery(),
+        )
+    ).one()
+    return tuple(row)
+
+
+def build_catalog() -> bytes:
+    """
+    Koduje aktywny katalog pogrupowany według kategorii.
+
+    Wynik to lista `{"category": {...}, "services": [...]}` w kolejności
+    nazw kategorii i usług, pobrana jednym zapytaniem. Usługi nie powtarzają
+    w sobie danych kategorii; usługi bez kategorii nie trafiają do katalogu.
+    """
+    fields = list(CATALOG_PROJECTION.fields)
+    statement = CATALOG_PROJECTION.select(fields).order_by(
+        ServiceCategory.name.asc(), ServiceCategory.id.asc(), Service.name.asc()
+    )
+    serialize = CATALOG_PROJECTION.serializer(fields)
+
+    groups: list[dict[str, Any]] = []
+    for row in fetch_rows(statement):
+        service = serialize(row)
+        category = service.pop("category")
+        if not groups or groups[-1]["category"]["id"] != category["id"]:
+            groups.append({"category": category, "services": []})
+        if service["id"] is not None:
+            groups[-1]["services"].append(service)
+    return dumps_json(groups)
+
+
+class CatalogCache:
+    """
+    Zakodowane odpowiedzi endpointów katalogu usług.
+
+    Wpis jest ważny, dopóki wersja katalogu (`catalog_version()`) się nie
+    zmieni, więc powracający klient kosztuje jedno zapytanie o wersję.
+    Zapisy usług i kategorii w tym procesie czyszczą pamięć od razu po
+    zatwierdzeniu transakcji.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[Hashable, CachedBody] = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def get(
+        self, key: Hashable, version: tuple[Any, ...], build: Callable[[], bytes]
+    ) -> CachedBody:
+        """Zwraca wpis dla `key`, budując go ponownie po zmianie wersji."""
+        entry = self._entries.get(key)
+        if entry is not None and entry.version == version:
+            return entry
+
+        body = build()
+        modified = [value for value in (version[1], version[3]) if value is not None]
+        entry = CachedBody(
+            body=body,
+            etag=hashlib.sha256(body).hexdigest()[:32],
+            version=version,
+            last_modified=max(modified) if modified else None,
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self.builds += 1
+        return entry
+
+    def invalidate(self) -> None:
+        """Usuwa wszystkie wpisy."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "builds": self.builds}
+
+
+def get_catalog_cache() -> CatalogCache:
+    """Pobiera pamięć podręczną katalogu z aplikacji."""
+    return current_app.extensions["catalog_cache"]
+
+
+def cached_catalog_response(key: Hashable, build: Callable[[], bytes]) -> Response:
+    """
+    Zwraca odpowiedź JSON z pamięci podręcznej katalogu.
+
+    Ustawia silny ETag (skrót treści) i `Last-Modified`, a dla pasującego
+    `If-None-Match` / `If-Modified-Since` odpowiada `304 Not Modified`.
+    """
+    entry = get_catalog_cache().get(key, catalog_version(), build)
+    response = current_app.response_class(entry.body, mimetype="application/json")
+    response.set_etag(entry.etag)
+    if entry.last_modified is not None:
+        response.last_modified = entry.last_modified
+    # Przeglądarka zawsze pyta o aktualność, ale przy braku zmian dostaje 304
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_catalog_writes(session: Session, _: Any) -> None:
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, (Service, ServiceCategory)):
+            session.info["catalog_changed"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    if session.info.pop("catalog_changed", False) and has_app_context():
+        catalog_cache = current_app.extensions.get("catalog_cache")
+        if catalog_cache is not None:
+            catalog_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_catalog_writes(session: Session) -> None:
+    session.info.pop("catalog_changed", None)
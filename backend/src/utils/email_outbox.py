@@ -0,0 +1,282 @@
+"""Kolejka wysyłki emaili (outbox) i wątki robocze, które ją opróżniają."""
+
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from flask import Flask, current_app
+from sqlalchemy import case, or_, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.models import EmailOutbox, db
+from src.utils.email_utils import deliver_appointment_notification
+
+APPOINTMENT_NOTIFICATION = "appointment_notification"
+
+# Błąd zapisywany, gdy wiadomość odzyskano po wygaśnięciu dzierżawy
+LEASE_EXPIRED_ERROR = "Przekroczono czas dzierżawy (przerwana wysyłka)"
+
+# Rodzaj wiadomości -> funkcja wysyłająca (zgłasza wyjątek przy niepowodzeniu)
+HANDLERS: dict[str, Callable[[dict[str, Any]], None]] = {
+    APPOINTMENT_NOTIFICATION: deliver_appointment_notification,
+}
+
+
+def enqueue_email(kind: str, payload: dict[str, Any]) -> EmailOutbox:
+    """
+    Dodaje wiadomość do kolejki w bieżącej transakcji.
+
+    Wiersz zostaje zapisany dopiero razem z `db.session.commit()` wywołującego,
+    więc wiadomość istnieje wtedy i tylko wtedy, gdy zapisało się zdarzenie.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"Nieznany rodzaj wiadomości: {kind}")
+
+    entry = EmailOutbox(kind=kind, payload=payload)
+    db.session.add(entry)
+    return entry
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Zwraca opóźnienie kolejnej próby (wykładnicze, z górnym limitem)."""
+    base = current_app.config.get("EMAIL_OUTBOX_BACKOFF_SECONDS", 30)
+    limit = current_app.config.get("EMAIL_OUTBOX_BACKOFF_MAX_SECONDS", 3600)
+    return timedelta(seconds=min(base * 2 ** max(attempts - 1, 0), limit))
+
+
+def _claim_next() -> EmailOutbox | None:
+    """
+    Rezerwuje jedną wiadomość gotową do wysłania.
+
+    Rezerwacja to warunkowy UPDATE, więc wiele wątków i procesów może
+    bezpiecznie pobierać z tej samej kolejki. Wiadomości porzucone w stanie
+    `sending` (np. po awarii procesu) wracają do obiegu po czasie dzierżawy.
+
+    Każda rezerwacja zwiększa `attempts`, więc wygasła dzierżawa liczy się
+    jak nieudana próba: wiadomość, która zawiesza lub zabija proces, po
+    `EMAIL_OUTBOX_MAX_ATTEMPTS` rezerwacjach trafia do martwych.
+    """
+    now = datetime.utcnow()
+    max_attempts = current_app.config.get("EMAIL_OUTBOX_MAX_ATTEMPTS", 8)
+    lease = timedelta(
+        seconds=current_app.config.get("EMAIL_OUTBOX_LEASE_SECONDS", 300)
+    )
+    ready = or_(
+        (EmailOutbox.status == "pending") & (EmailOutbox.next_attempt_at <= now),
+        (EmailOutbox.status == "sending") & (EmailOutbox.locked_at < now - lease),
+    )
+
+    candidate_ids = db.session.execute(
+        db.select(EmailOutbox.id)
+        .where(ready)
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+        .limit(10)
+    ).scalars().all()
+
+    for candidate_id in candidate_ids:
+        claimed = db.session.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id == candidate_id, ready)
+            .values(
+                status="sending",
+                locked_at=now,
+                attempts=EmailOutbox.attempts + 1,
+                last_error=case(
+                    (EmailOutbox.status == "sending", LEASE_EXPIRED_ERROR),
+                    else_=EmailOutbox.last_error,
+                ),
+            )
+        )
+        db.session.commit()
+        if not claimed.rowcount:
+            continue
+
+        entry = db.session.get(EmailOutbox, candidate_id)
+        if entry is not None and entry.attempts > max_attempts:
+            # Poprzednie próby wyczerpały limit, a ostatnia nie dobiegła końca
+            entry.attempts -= 1
+            entry.status = "dead"
+            entry.locked_at = None
+            db.session.commit()
+            current_app.logger.error(
+                f"Wiadomość {entry.id} przeniesiona do martwych po "
+                f"{entry.attempts} próbach: {entry.last_error}"
+            )
+            continue
+        return entry
+
+    return None
+
+
+def _deliver(entry: EmailOutbox) -> bool:
+    max_attempts = current_app.config.get("EMAIL_OUTBOX_MAX_ATTEMPTS", 8)
+
+    # `attempts` zwiększono już przy rezerwacji wiadomości
+    try:
+        HANDLERS[entry.kind](entry.payload_dict())
+    except Exception as e:
+        entry.last_error = str(e)
+        entry.locked_at = None
+        if entry.attempts >= max_attempts:
+            entry.status = "dead"
+            current_app.logger.error(
+                f"Wiadomość {entry.id} przeniesiona do martwych po "
+                f"{entry.attempts} próbach: {e}"
+            )
+        else:
+            entry.status = "pending"
+            entry.next_attempt_at = datetime.utcnow() + retry_delay(entry.attempts)
+            current_app.logger.warning(
+                f"Nie udało się wysłać wiadomości {entry.id} "
+                f"(próba {entry.attempts}): {e}"
+            )
+        db.session.commit()
+        return False
+
+    entry.status = "sent"
+    entry.sent_at = datetime.utcnow()
+    entry.locked_at = None
+    entry.last_error = None
+    db.session.commit()
+    return True
+
+
+def process_outbox(limit: int | None = None) -> tuple[int, int]:
+    """
+    Wysyła gotowe wiadomości z kolejki. Wymaga kontekstu aplikacji.
+
+    Returns:
+        Krotka (wysłane, nieudane)
+    """
+    sent = failed = 0
+    while limit is None or sent + failed < limit:
+        entry = _claim_next()
+        if entry is None:
+            break
+        if _deliver(entry):
+            sent += 1
+        else:
+            failed += 1
+    return sent, failed
+
+
+def retry_dead() -> int:
+    """Przywraca martwe wiadomości do kolejki. Zwraca ich liczbę."""
+    result = db.session.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.status == "dead")
+        .values(status="pending", attempts=0, next_attempt_at=datetime.utcnow())
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def outbox_counts() -> dict[str, int]:
+    """Zwraca liczbę wiadomości w kolejce według statusu."""
+    rows = db.session.execute(
+        db.select(EmailOutbox.status, db.func.count()).group_by(EmailOutbox.status)
+    )
+    return {status: count for status, count in rows}
+
+
+class OutboxWorkerPool:
+    """
+    Pula wątków opróżniających kolejkę wysyłki w tle.
+
+    Wątki uruchamiane są przy starcie procesu serwera
+    (`start_outbox_workers`), więc wiadomości zaległe po restarcie
+    i czekające na ponowienie są wysyłane bez nowych rezerwacji. Budzą się
+    co `EMAIL_OUTBOX_POLL_SECONDS` lub natychmiast po `notify()`,
+    wywoływanym po zapisaniu nowej wiadomości.
+    """
+
+    def __init__(self) -> None:
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self, app: Flask, workers: int | None = None) -> None:
+        """Uruchamia wątki robocze, jeśli jeszcze nie działają."""
+        with self._lock:
+            if self.running:
+                return
+
+            count = workers or app.config.get("EMAIL_OUTBOX_WORKERS", 1)
+            self._stopping.clear()
+            self._threads = [
+                threading.Thread(
+                    target=self._run,
+                    args=(app,),
+                    name=f"email-outbox-{index}",
+                    daemon=True,
+                )
+                for index in range(count)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def notify(self) -> None:
+        """
+        Budzi wątki robocze. Uruchamia je, jeśli jeszcze nie działają
+        (np. `flask run`, który nie wywołuje `start_outbox_workers`),
+        a włączono wysyłkę w procesie aplikacji (`EMAIL_OUTBOX_IN_PROCESS`).
+        """
+        app = current_app._get_current_object()  # type: ignore[attr-defined]
+        if app.config.get("EMAIL_OUTBOX_IN_PROCESS", True) and not self.running:
+            self.start(app)
+        self._wakeup.set()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Zatrzymuje wątki po zakończeniu bieżącej wysyłki."""
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def wait(self) -> None:
+        """Blokuje do czasu zatrzymania wątków (tryb osobnego procesu)."""
+        for thread in self._threads:
+            while thread.is_alive():
+                thread.join(1.0)
+
+    def _run(self, app: Flask) -> None:
+        poll_interval = app.config.get("EMAIL_OUTBOX_POLL_SECONDS", 5.0)
+        while not self._stopping.is_set():
+            self._wakeup.clear()
+            with app.app_context():
+                try:
+                    process_outbox(limit=50)
+                except SQLAlchemyError:
+                    db.session.rollback()
+                    app.logger.exception("Błąd podczas przetwarzania kolejki email")
+                finally:
+                    db.session.remove()
+
+            self._wakeup.wait(poll_interval)
+
+
+def get_outbox_workers() -> OutboxWorkerPool:
+    """Pobiera pulę wątków wysyłki z aplikacji."""
+    return current_app.extensions["outbox_workers"]
+
+
+def start_outbox_workers(app: Flask) -> bool:
+    """
+    Uruchamia wysyłkę w tle przy starcie procesu serwera, jeśli włączono
+    `EMAIL_OUTBOX_IN_PROCESS`. Zwraca True, gdy wątki działają.
+
+    Przy gunicorn wywoływane w każdym procesie roboczym (`post_fork`):
+    wątki procesu głównego nie przechodzą do procesów potomnych.
+    """
+    if not app.config.get("EMAIL_OUTBOX_IN_PROCESS", True):
+        return False
+    workers: OutboxWorkerPool = app.extensions["outbox_workers"]
+    workers.start(app)
+    return workers.running
@@ -0,0 +1,169 @@
+"""Rejestr skompilowanych szablonów wiadomości email."""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Iterable
+
+from flask import current_app
+from jinja2 import Template
+
+from src.models import Settings
+
+APPOINTMENT_NOTIFICATION_HTML = "appointment_notification.html"
+APPOINTMENT_NOTIFICATION_TEXT = "appointment_notification.txt"
+
+DEFAULT_CLINIC_NAME = "Gabinet Podologiczny"
+
+TEMPLATE_SOURCES: dict[str, str] = {
+    APPOINTMENT_NOTIFICATION_HTML: """\
+<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }
+        .content { background: #f9f9f9; padding: 30px; border-radius: 0 0 10px 10px; }
+        .info-row { margin: 15px 0; padding: 10px; background: white; border-radius: 5px; }
+        .label { font-weight: bold; color: #667eea; }
+        .footer { text-align: center; margin-top: 20px; color: #888; font-size: 12px; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>{{ clinic_name }}</h1>
+            <p>Nowa rezerwacja wizyty</p>
+        </div>
+        <div class="content">
+            <h2>Szczegóły rezerwacji</h2>
+            
+            <div class="info-row">
+                <span class="label">Pacjent:</span> {{ name }}
+            </div>
+            
+            <div class="info-row">
+                <span class="label">Email:</span> {{ email }}
+            </div>
+            
+            {% if phone %}
+            <div class="info-row">
+                <span class="label">Telefon:</span> {{ phone }}
+            </div>
+            {% endif %}
+            
+            <div class="info-row">
+                <span class="label">Usługa:</span> {{ service }}
+            </div>
+            
+            <div class="info-row">
+                <span class="label">Data i godzina:</span> {{ appointment_date }}
+            </div>
+            
+            {% if message %}
+            <div class="info-row">
+                <span class="label">Wiadomość:</span><br>
+                {{ message }}
+            </div>
+            {% endif %}
+            
+            <div class="info-row">
+                <span class="label">Status:</span> <strong>Oczekuje potwierdzenia</strong>
+            </div>
+        </div>
+        <div class="footer">
+            <p>To jest automatyczna wiadomość z systemu rezerwacji {{ clinic_name }}</p>
+        </div>
+    </div>
+</body>
+</html>
+""",
+    # Treść tekstowa nie jest HTML-em, więc wyłączamy escapowanie
+    APPOINTMENT_NOTIFICATION_TEXT: """\
+{% autoescape false -%}
+Nowa rezerwacja w {{ clinic_name }}
+
+Pacjent: {{ name }}
+Email: {{ email }}
+Telefon: {{ phone or "nie podano" }}
+Usługa: {{ service }}
+Data i godzina: {{ appointment_date }}
+Wiadomość: {{ message or "brak" }}
+
+Status: Oczekuje potwierdzenia
+{%- endautoescape %}
+""",
+}
+
+
+def template_globals() -> dict[str, Any]:
+    """Zwraca zmienne wspólne dla wszystkich szablonów, pochodzące z ustawień."""
+    return {
+        "clinic_name": Settings.get_value("clinic_name", DEFAULT_CLINIC_NAME),
+    }
+
+
+class TemplateRegistry:
+    """
+    Szablony email kompilowane raz i przechowywane według nazwy.
+
+    Zmienne pochodzące z ustawień (np. nazwa gabinetu) są dołączane do
+    skompilowanego szablonu jako zmienne globalne, a ich wartości stanowią
+    wersję wpisu: zmiana ustawienia powoduje jednorazową ponowną kompilację.
+    """
+
+    def __init__(self, sources: dict[str, str]) -> None:
+        self._sources = dict(sources)
+        self._compiled: dict[str, tuple[tuple[Any, ...], Template]] = {}
+        self._lock = threading.Lock()
+        self.compilations = 0
+
+    def register(self, name: str, source: str) -> None:
+        """Dodaje lub podmienia źródło szablonu."""
+        with self._lock:
+            self._sources[name] = source
+            self._compiled.pop(name, None)
+
+    def get(self, name: str) -> Template:
+        """Zwraca skompilowany szablon dla bieżących ustawień."""
+        shared = template_globals()
+        version = tuple(sorted(shared.items()))
+
+        entry = self._compiled.get(name)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        with self._lock:
+            if name not in self._sources:
+                raise KeyError(f"Nieznany szablon email: {name}")
+            template = current_app.jinja_env.from_string(
+                self._sources[name], globals=shared
+            )
+            self._compiled[name] = (version, template)
+            self.compilations += 1
+        return template
+
+    def render(self, name: str, context: dict[str, Any]) -> str:
+        """Renderuje szablon dla pojedynczego zestawu danych."""
+        return self.get(name).render(context)
+
+    def render_many(
+        self, name: str, contexts: Iterable[dict[str, Any]]
+    ) -> list[str]:
+        """
+        Renderuje szablon dla wielu zestawów danych (np. przypomnień lub
+        zestawień), odczytując ustawienia i szablon tylko raz.
+        """
+        template = self.get(name)
+        return [template.render(context) for context in contexts]
+
+    def clear(self) -> None:
+        """Usuwa skompilowane szablony."""
+        with self._lock:
+            self._compiled.clear()
+
+
+def get_email_templates() -> TemplateRegistry:
+    """Pobiera rejestr szablonów email z aplikacji."""
+    return current_app.extensions["email_templates"]
@@ -2,10 +2,25 @@
 
 from __future__ import annotations
 
-from flask import current_app, render_template_string
-from flask_mail import Mail, Message
+import atexit
+import smtplib
+import threading
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Iterator
+
+from flask import current_app
+from flask_mail import Mail, Message, sanitize_address, sanitize_addresses
 
 from src.models import Settings
+from src.utils.email_templates import (
+    APPOINTMENT_NOTIFICATION_HTML,
+    APPOINTMENT_NOTIFICATION_TEXT,
+    get_email_templates,
+)
 
 
 def get_mail_instance() -> Mail | None:
@@ -13,6 +28,169 @@ def get_mail_instance() -> Mail | None:
     return current_app.extensions.get("mail")
 
 
+class EmailDeliveryError(Exception):
+    """Błąd uniemożliwiający wysłanie wiadomości."""
+
+
+@dataclass(frozen=True)
+class SMTPSettings:
+    """Parametry połączenia SMTP, zarazem klucz puli połączeń."""
+
+    host: str
+    port: int
+    username: str | None
+    password: str | None = field(repr=False)
+    use_tls: bool
+    use_ssl: bool
+    timeout: float
+
+
+def load_smtp_settings() -> SMTPSettings:
+    """
+    Składa parametry połączenia SMTP.
+
+    Dane logowania z panelu administratora (tabela settings) mają priorytet
+    nad zmiennymi środowiskowymi, serwer i port pochodzą z konfiguracji.
+    """
+    config = current_app.config
+    return SMTPSettings(
+        host=config.get("MAIL_SERVER", "localhost"),
+        port=int(config.get("MAIL_PORT", 25)),
+        username=Settings.get_value("mail_username") or config.get("MAIL_USERNAME"),
+        password=Settings.get_value("mail_password") or config.get("MAIL_PASSWORD"),
+        use_tls=bool(config.get("MAIL_USE_TLS", False)),
+        use_ssl=bool(config.get("MAIL_USE_SSL", False)),
+        timeout=float(config.get("MAIL_TIMEOUT", 30)),
+    )
+
+
+class SMTPConnectionPool:
+    """
+    Pula uwierzytelnionych połączeń SMTP współdzielona przez wątki.
+
+    Połączenia grupowane są według `SMTPSettings`, więc zmiana danych
+    logowania w panelu automatycznie kieruje wysyłkę do nowych sesji.
+    Bezczynne połączenie starsze niż `idle_timeout` jest zamykane, a starsze
+    niż `noop_interval` sprawdzane poleceniem NOOP przed ponownym użyciem.
+    """
+
+    def __init__(
+        self, max_idle: int = 4, idle_timeout: float = 60.0, noop_interval: float = 10.0
+    ) -> None:
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.noop_interval = noop_interval
+        self._idle: dict[SMTPSettings, deque[tuple[smtplib.SMTP, float]]] = {}
+        self._lock = threading.Lock()
+        _pools.add(self)
+
+    def _open(self, settings: SMTPSettings) -> smtplib.SMTP:
+        host: smtplib.SMTP
+        if settings.use_ssl:
+            host = smtplib.SMTP_SSL(settings.host, settings.port, timeout=settings.timeout)
+        else:
+            host = smtplib.SMTP(settings.host, settings.port, timeout=settings.timeout)
+
+        try:
+            if settings.use_tls:
+                host.starttls()
+            if settings.username and settings.password:
+                host.login(settings.username, settings.password)
+        except Exception:
+            _close_quietly(host)
+            raise
+        return host
+
+    def _take_idle(self, settings: SMTPSettings) -> smtplib.SMTP | None:
+        while True:
+            with self._lock:
+                idle = self._idle.get(settings)
+                if not idle:
+                    return None
+                host, released_at = idle.pop()
+
+            idle_for = monotonic() - released_at
+            if idle_for > self.idle_timeout:
+                _close_quietly(host)
+                continue
+
+            if idle_for > self.noop_interval:
+                try:
+                    code, _ = host.noop()
+                except smtplib.SMTPException:
+                    code = -1
+                except OSError:
+                    code = -1
+                if code != 250:
+                    _close_quietly(host)
+                    continue
+
+            return host
+
+    def _release(self, settings: SMTPSettings, host: smtplib.SMTP) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(settings, deque())
+            if len(idle) < self.max_idle:
+                idle.append((host, monotonic()))
+                return
+        _close_quietly(host)
+
+    @contextmanager
+    def connection(self, settings: SMTPSettings) -> Iterator[smtplib.SMTP]:
+        """Wypożycza połączenie; po błędzie nie wraca ono do puli."""
+        host = self._take_idle(settings) or self._open(settings)
+        try:
+            yield host
+        except Exception:
+            _close_quietly(host)
+            raise
+        self._release(settings, host)
+
+    def send(self, message: Message, settings: SMTPSettings) -> None:
+        """Wysyła wiadomość, ponawiając raz, jeśli serwer zamknął sesję."""
+        envelope = (
+            sanitize_address(message.sender),
+            list(sanitize_addresses(message.send_to)),
+            message.as_bytes(),
+        )
+        try:
+            with self.connection(settings) as host:
+                host.sendmail(*envelope)
+        except smtplib.SMTPServerDisconnected:
+            with self.connection(settings) as host:
+                host.sendmail(*envelope)
+
+    def close_all(self) -> None:
+        """Zamyka wszystkie bezczynne połączenia."""
+        with self._lock:
+            pools, self._idle = self._idle, {}
+        for idle in pools.values():
+            for host, _ in idle:
+                _close_quietly(host)
+
+
+def _close_quietly(host: smtplib.SMTP) -> None:
+    try:
+        host.quit()
+    except Exception:
+        host.close()
+
+
+# Pule wszystkich aplikacji procesu; zamykane jednym wywołaniem przy wyjściu
+_pools: weakref.WeakSet[SMTPConnectionPool] = weakref.WeakSet()
+
+
+@atexit.register
+def _close_pools() -> None:
+    for pool in list(_pools):
+        pool.close_all()
+
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    """Pobiera pulę połączeń SMTP z aplikacji."""
+    return current_app.extensions["smtp_pool"]
+
+
 def send_appointment_notification(appointment_data: dict) -> bool:
     """
     Wysyła email z powiadomieniem o nowej rezerwacji.
@@ -24,152 +202,72 @@ def send_appointment_notification(appointment_data: dict) -> bool:
         True jeśli email został wysłany pomyślnie, False w przeciwnym razie
     """
     try:
-        # Pobierz ustawienia email z bazy danych
-        mail_username = Settings.get_value("mail_username")
-        mail_password = Settings.get_value("mail_password")
-
-        if not mail_username or not mail_password:
-            current_app.logger.warning(
-                "Brak skonfigurowanych danych logowania Gmail (mail_username lub mail_password)"
-            )
-            return False
-
-        # Zaktualizuj konfigurację Flask z danymi z bazy
-        current_app.config["MAIL_USERNAME"] = mail_username
-        current_app.config["MAIL_PASSWORD"] = mail_password
-        current_app.config["MAIL_DEFAULT_SENDER"] = mail_username
-
-        mail = get_mail_instance()
-        if not mail:
-            current_app.logger.warning("Flask-Mail nie jest skonfigurowany")
-            return False
-
-        # Pobierz email odbiorcy z ustawień
-        recipient_email = Settings.get_value("notification_email")
-        if not recipient_email:
-            current_app.logger.warning(
-                "Brak skonfigurowanego adresu email dla powiadomień"
-            )
-            return False
-
-        # Pobierz dane nadawcy z ustawień
-        sender_email = Settings.get_value("mail_username")
-        if not sender_email:
-            # Fallback na konfigurację z app.config
-            sender_email = current_app.config.get(
-                "MAIL_DEFAULT_SENDER"
-            ) or current_app.config.get("MAIL_USERNAME")
-            if not sender_email:
-                current_app.logger.warning("Brak skonfigurowanego adresu email nadawcy")
-                return False
-
-        # Pobierz nazwę gabinetu z ustawień (opcjonalne)
-        clinic_name = Settings.get_value("clinic_name", "Gabinet Podologiczny")
-
-        # Przygotuj treść emaila
-        subject = f"Nowa rezerwacja: {appointment_data.get('service', 'Usługa')}"
-
-        html_body = render_template_string(
-            """
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <style>
-                    body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
-                    .container { max-width: 600px; margin: 0 auto; padding: 20px; }
-                    .header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }
-                    .content { background: #f9f9f9; padding: 30px; border-radius: 0 0 10px 10px; }
-                    .info-row { margin: 15px 0; padding: 10px; background: white; border-radius: 5px; }
-                    .label { font-weight: bold; color: #667eea; }
-                    .footer { text-align: center; margin-top: 20px; color: #888; font-size: 12px; }
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="header">
-                        <h1>{{ clinic_name }}</h1>
-                        <p>Nowa rezerwacja wizyty</p>
-                    </div>
-                    <div class="content">
-                        <h2>Szczegóły rezerwacji</h2>
-                        
-                        <div class="info-row">
-                            <span class="label">Pacjent:</span> {{ name }}
-                        </div>
-                        
-                        <div class="info-row">
-                            <span class="label">Email:</span> {{ email }}
-                        </div>
-                        
-                        {% if phone %}
-                        <div class="info-row">
-                            <span class="label">Telefon:</span> {{ phone }}
-                        </div>
-                        {% endif %}
-                        
-                        <div class="info-row">
-                            <span class="label">Usługa:</span> {{ service }}
-                        </div>
-                        
-                        <div class="info-row">
-                            <span class="label">Data i godzina:</span> {{ appointment_date }}
-                        </div>
-                        
-                        {% if message %}
-                        <div class="info-row">
-                            <span class="label">Wiadomość:</span><br>
-                            {{ message }}
-                        </div>
-                        {% endif %}
-                        
-                        <div class="info-row">
-                            <span class="label">Status:</span> <strong>Oczekuje potwierdzenia</strong>
-                        </div>
-                    </div>
-                    <div class="footer">
-                        <p>To jest automatyczna wiadomość z systemu rezerwacji {{ clinic_name }}</p>
-                    </div>
-                </div>
-            </body>
-            </html>
-            """,
-            clinic_name=clinic_name,
-            name=appointment_data.get("name", ""),
-            email=appointment_data.get("email", ""),
-            phone=appointment_data.get("phone", ""),
-            service=appointment_data.get("service", ""),
-            appointment_date=appointment_data.get("appointment_date", ""),
-            message=appointment_data.get("message", ""),
-        )
+        deliver_appointment_notification(appointment_data)
+        return True
+    except EmailDeliveryError as e:
+        current_app.logger.warning(str(e))
+        return False
+    except Exception as e:
+        current_app.logger.error(f"Błąd podczas wysyłania emaila: {str(e)}")
+        return False
+
+
+def appointment_notification_context(appointment_data: dict) -> dict:
+    """Zwraca zmienne szablonu powiadomienia o rezerwacji."""
+    return {
+        "name": appointment_data.get("name", ""),
+        "email": appointment_data.get("email", ""),
+        "phone": appointment_data.get("phone", ""),
+        "service": appointment_data.get("service", ""),
+        "appointment_date": appointment_data.get("appointment_date", ""),
+        "message": appointment_data.get("message", ""),
+    }
 
-        text_body = f"""
-        Nowa rezerwacja w {clinic_name}
-        
-        Pacjent: {appointment_data.get("name", "")}
-        Email: {appointment_data.get("email", "")}
-        Telefon: {appointment_data.get("phone", "nie podano")}
-        Usługa: {appointment_data.get("service", "")}
-        Data i godzina: {appointment_data.get("appointment_date", "")}
-        Wiadomość: {appointment_data.get("message", "brak")}
-        
-        Status: Oczekuje potwierdzenia
-        """
-
-        msg = Message(
-            subject=subject,
-            sender=sender_email,
-            recipients=[recipient_email],
-            body=text_body,
-            html=html_body,
+
+def deliver_appointment_notification(appointment_data: dict) -> None:
+    """
+    Wysyła email z powiadomieniem o nowej rezerwacji.
+
+    W odróżnieniu od `send_appointment_notification` zgłasza wyjątek przy
+    niepowodzeniu, dzięki czemu kolejka wysyłki może ponowić próbę.
+
+    Raises:
+        EmailDeliveryError: gdy brakuje konfiguracji wysyłki
+        Exception: błędy połączenia SMTP
+    """
+    smtp_settings = load_smtp_settings()
+    if not smtp_settings.username or not smtp_settings.password:
+        raise EmailDeliveryError(
+            "Brak skonfigurowanych danych logowania Gmail (mail_username lub mail_password)"
         )
 
-        # Użyj kontekstu połączenia aby zastosować zaktualizowane dane logowania
-        with mail.connect() as conn:
-            conn.send(msg)
+    # Pobierz email odbiorcy z ustawień
+    recipient_email = Settings.get_value("notification_email")
+    if not recipient_email:
+        raise EmailDeliveryError("Brak skonfigurowanego adresu email dla powiadomień")
 
-        current_app.logger.info(f"Email z powiadomieniem wysłany do {recipient_email}")
-        return True
+    # Nadawcą jest konto, na które logujemy się do serwera SMTP
+    sender_email = smtp_settings.username
 
-    except Exception as e:
-        current_app.logger.error(f"Błąd podczas wysyłania emaila: {str(e)}")
-        return False
+    # Przygotuj treść emaila
+    subject = f"Nowa rezerwacja: {appointment_data.get('service', 'Usługa')}"
+    context = appointment_notification_context(appointment_data)
+    email_templates = get_email_templates()
+    html_body = email_templates.render(APPOINTMENT_NOTIFICATION_HTML, context)
+    text_body = email_templates.render(APPOINTMENT_NOTIFICATION_TEXT, context)
+
+    msg = Message(
+        subject=subject,
+        sender=sender_email,
+        recipients=[recipient_email],
+        body=text_body,
+        html=html_body,
+    )
+
+    if current_app.config.get("MAIL_SUPPRESS_SEND", current_app.testing):
+        current_app.logger.info("Wysyłka emaili wyłączona (MAIL_SUPPRESS_SEND)")
+        return
+
+    get_smtp_pool().send(msg, smtp_settings)
+
+    current_app.logger.info(f"Email z powiadomieniem wysłany do {recipient_email}")
@@ -0,0 +1,45 @@
+"""Limit liczby zapytań SQL wykonywanych przez endpoint."""
+
+from __future__ import annotations
+
+from functools import wraps
+from typing import Any, Callable
+
+from flask import current_app, g
+
+
+def query_budget(limit: int) -> Callable:
+    """
+    Dekorator widoku sprawdzający, czy obsługa żądania nie przekroczyła
+    `limit` zapytań SQL (np. przez przypadkowe leniwe ładowanie relacji).
+
+    Zapytania liczy pomiar żądań (`g.request_timing` z `request_metrics`);
+    poza żądaniem HTTP limit nie jest sprawdzany. Przekroczenie jest tylko
+    logowane jako ostrzeżenie: widok mógł już zatwierdzić zapis, więc
+    wyjątek zamieniłby udaną zmianę w błąd 500. Dokładne liczby zapytań
+    sprawdzają testy (`tests/test_query_budgets.py`). Zapytania wykonane
+    już po zwróceniu odpowiedzi (np. w odpowiedziach strumieniowych) nie
+    są liczone.
+    """
+
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            timing = g.get("request_timing")
+            if timing is None:
+                return view(*args, **kwargs)
+
+            before = timing.queries
+            response = view(*args, **kwargs)
+            count = timing.queries - before
+
+            if count > limit:
+                current_app.logger.warning(
+                    "%s wykonał %d zapytań SQL (limit %d)", view.__name__, count, limit
+                )
+            return response
+
+        wrapper.query_budget = limit  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
@@ -0,0 +1,266 @@
+"""Pomiary żądań HTTP: czas obsługi, czas i liczba zapytań SQL, wolne zapytania."""
+
+from __future__ import annotations
+
+import re
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Iterable
+
+from flask import Flask, Response, current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Granice koszyków histogramów (Prometheus: le = "mniejsze lub równe")
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Długość zapytania zapisywanego w logu wolnych zapytań
+MAX_LOGGED_STATEMENT = 500
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class RequestTiming:
+    """Pomiary bieżącego żądania, przechowywane w `g.request_timing`."""
+
+    started: float
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+@dataclass
+class Histogram:
+    """Histogram skumulowany w formacie Prometheus."""
+
+    bounds: tuple[float, ...]
+    buckets: list[int] = field(default_factory=list)
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        self.buckets = [0] * len(self.bounds)
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)
+        if index < len(self.buckets):
+            self.buckets[index] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> Iterable[tuple[str, int]]:
+        running = 0
+        for bound, hits in zip(self.bounds, self.buckets):
+            running += hits
+            yield _format_number(bound), running
+        yield "+Inf", self.count
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict[str, str]) -> str:
+    return ",".join(f'{name}="{_label_value(value)}"' for name, value in labels.items())
+
+
+class RequestMetrics:
+    """
+    Histogramy żądań według trasy i metody oraz licznik wolnych zapytań.
+
+    Dane są liczone osobno w każdym procesie, więc przy kilku procesach
+    gunicorn `/api/admin/metrics` pokazuje stan procesu, który obsłużył
+    żądanie. Trasa to wzorzec reguły URL (`/api/services/<int:service_id>`),
+    więc liczba serii nie rośnie z liczbą identyfikatorów.
+    """
+
+    def __init__(
+        self, slow_query_seconds: float | None = 0.1, server_timing: bool = True
+    ) -> None:
+        self._lock = threading.Lock()
+        self._durations: dict[tuple[str, str], Histogram] = {}
+        self._db_durations: dict[tuple[str, str], Histogram] = {}
+        self._query_counts: dict[tuple[str, str], Histogram] = {}
+        self._responses: dict[tuple[str, str, str], int] = {}
+        self.slow_queries = 0
+        # None wyłącza log wolnych zapytań
+        self.slow_query_seconds = slow_query_seconds
+        self.server_timing = server_timing
+
+    def observe(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        timing: RequestTiming,
+        elapsed: float,
+    ) -> None:
+        key = (method, route)
+        with self._lock:
+            for series, bounds, value in (
+                (self._durations, DURATION_BUCKETS, elapsed),
+                (self._db_durations, DURATION_BUCKETS, timing.db_seconds),
+                (self._query_counts, QUERY_COUNT_BUCKETS, timing.queries),
+            ):
+                histogram = series.get(key)
+                if histogram is None:
+                    histogram = series[key] = Histogram(bounds)
+                histogram.observe(value)
+            response_key = (method, route, str(status))
+            self._responses[response_key] = self._responses.get(response_key, 0) + 1
+
+    def record_slow_query(self) -> None:
+        with self._lock:
+            self.slow_queries += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._durations.clear()
+            self._db_durations.clear()
+            self._query_counts.clear()
+            self._responses.clear()
+            self.slow_queries = 0
+
+    def render(self) -> str:
+        """Zwraca pomiary w formacie tekstowym Prometheus (wersja 0.0.4)."""
+        lines: list[str] = []
+        with self._lock:
+            for name, help_text, series in (
+                (
+                    "http_request_duration_seconds",
+                    "Czas obsługi żądania HTTP",
+                    self._durations,
+                ),
+                (
+                    "http_request_db_seconds",
+                    "Łączny czas zapytań SQL w żądaniu",
+                    self._db_durations,
+                ),
+                (
+                    "http_request_queries",
+                    "Liczba zapytań SQL w żądaniu",
+                    self._query_counts,
+                ),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for (method, route), histogram in sorted(series.items()):
+                    labels = {"method": method, "route": route}
+                    for bound, hits in histogram.cumulative():
+                        bucket = _labels({**labels, "le": bound})
+                        lines.append(f"{name}_bucket{{{bucket}}} {hits}")
+                    selector = _labels(labels)
+                    total = _format_number(histogram.total)
+                    lines.append(f"{name}_sum{{{selector}}} {total}")
+                    lines.append(f"{name}_count{{{selector}}} {histogram.count}")
+
+            lines.append("# HELP http_responses_total Liczba odpowiedzi HTTP")
+            lines.append("# TYPE http_responses_total counter")
+            for (method, route, status), count in sorted(self._responses.items()):
+                labels = _labels({"method": method, "route": route, "status": status})
+                lines.append(f"http_responses_total{{{labels}}} {count}")
+
+            lines.append(
+                "# HELP db_slow_queries_total Zapytania SQL powyżej progu SLOW_QUERY_MS"
+            )
+            lines.append("# TYPE db_slow_queries_total counter")
+            lines.append(f"db_slow_queries_total {self.slow_queries}")
+        return "\n".join(lines) + "\n"
+
+
+def get_request_metrics() -> RequestMetrics:
+    """Pobiera pomiary żądań z aplikacji."""
+    return current_app.extensions["request_metrics"]
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _query_started(conn: Any, *_: Any) -> None:
+    conn.info.setdefault("query_started", []).append(perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _query_finished(
+    conn: Any, cursor: Any, statement: str, parameters: Any, *_: Any
+) -> None:
+    elapsed = perf_counter() - conn.info["query_started"].pop()
+    if not has_app_context():
+        return
+
+    timing = g.get("request_timing")
+    if timing is not None:
+        timing.queries += 1
+        timing.db_seconds += elapsed
+
+    # Nasłuch obejmuje każdy silnik, także aplikacji bez pomiaru żądań
+    request_metrics = current_app.extensions.get("request_metrics")
+    if request_metrics is None:
+        return
+
+    threshold = request_metrics.slow_query_seconds
+    if threshold is not None and elapsed >= threshold:
+        request_metrics.record_slow_query()
+        # Bez parametrów: zawierają dane pacjentów (email, telefon)
+        text = _WHITESPACE.sub(" ", statement).strip()[:MAX_LOGGED_STATEMENT]
+        current_app.logger.warning(
+            "Wolne zapytanie SQL (%.1f ms): %s", elapsed * 1000, text
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _query_failed(context: Any) -> None:
+    # after_cursor_execute nie zostanie wywołane dla nieudanego zapytania
+    if context.connection is not None:
+        started = context.connection.info.get("query_started")
+        if started:
+            started.pop()
+
+
+def _start_timing() -> None:
+    g.request_timing = RequestTiming(started=perf_counter())
+
+
+def _finish_timing(response: Response) -> Response:
+    timing: RequestTiming | None = g.get("request_timing")
+    if timing is None:
+        return response
+
+    request_metrics = get_request_metrics()
+    if request_metrics.server_timing:
+        elapsed = perf_counter() - timing.started
+        response.headers["Server-Timing"] = (
+            f"app;dur={elapsed * 1000:.1f}, "
+            f'db;dur={timing.db_seconds * 1000:.1f};desc="SQL x{timing.queries}"'
+        )
+
+    method = request.method
+    route = request.url_rule.rule if request.url_rule else UNMATCHED_ROUTE
+    status = response.status_code
+
+    # Histogram zapisywany po wysłaniu całej treści, więc odpowiedzi
+    # strumieniowe liczone są razem z zapytaniami wykonanymi w trakcie
+    def record() -> None:
+        request_metrics.observe(
+            method, route, status, timing, perf_counter() - timing.started
+        )
+
+    response.call_on_close(record)
+    return response
+
+
+def install_request_metrics(app: Flask, metrics: RequestMetrics) -> None:
+    """
+    Rejestruje pomiar żądań: nagłówek `Server-Timing` (czas aplikacji
+    i zapytań SQL) oraz histogramy dla `/api/admin/metrics`.
+    """
+    app.extensions["request_metrics"] = metrics
+    app.before_request(_start_timing)
+    app.after_request(_finish_timing)
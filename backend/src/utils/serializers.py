@@ -0,0 +1,232 @@
+"""Serializacja list bez tworzenia obiektów ORM.
+
+Projekcja wybiera z bazy tylko kolumny potrzebne do odpowiedzi (krotki
+zamiast instancji modeli) i zamienia je na słowniki o tym samym kształcie,
+co `to_dict()` odpowiednich modeli. Parametr `?fields=` pozwala klientowi
+ograniczyć zestaw pól.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+from typing import Any, Callable, Iterable, NamedTuple
+
+from flask import Response, current_app, request
+from sqlalchemy import Select
+
+from src.models import Appointment, Service, ServiceCategory, User, db
+
+try:  # pragma: no cover - zależność opcjonalna
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def dumps_json(data: Any) -> bytes:
+    """
+    Koduje dane do JSON. Używa `orjson`, jeśli jest zainstalowany, w przeciwnym
+    razie dostawcy JSON aplikacji Flask. Klucze są sortowane w obu wariantach,
+    tak jak w `jsonify`.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    return current_app.json.dumps(data).encode()
+
+
+def json_response(data: Any, status: int = 200) -> Response:
+    """Odpowiednik `jsonify` korzystający z `dumps_json`."""
+    return current_app.response_class(
+        dumps_json(data), status=status, mimetype="application/json"
+    )
+
+
+def fetch_rows(statement: Select) -> Any:
+    """
+    Wykonuje zapytanie projekcji na połączeniu sesji, z pominięciem warstwy
+    ładowania ORM (wiersze i tak nie są zamieniane na obiekty modeli).
+    """
+    return db.session.connection().execute(statement)
+
+
+def _isoformat(value: date | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+def _price(value: Decimal | None) -> float:
+    return float(value) if value is not None else 0.0
+
+
+class Field(NamedTuple):
+    """Pole odpowiedzi: kolumny, z których powstaje, i funkcja konwersji."""
+
+    columns: tuple[Any, ...]
+    convert: Callable[..., Any] | None = None
+
+
+def column(col: Any, convert: Callable[[Any], Any] | None = None) -> Field:
+    """Pole odpowiadające jednej kolumnie."""
+    return Field((col,), convert)
+
+
+class Projection:
+    """
+    Opis kolumn i konwersji potrzebnych do serializacji jednego modelu.
+
+    `select()` buduje zapytanie zwracające krotki, a `serializer()` funkcję,
+    która zamienia wiersz na słownik. Kolumny z `key_columns` są zawsze
+    dołączane do zapytania (np. na potrzeby kursora stronicowania), ale nie
+    trafiają do odpowiedzi, jeśli klient o nie nie poprosił.
+    """
+
+    def __init__(
+        self,
+        fields: dict[str, Field],
+        key_columns: Iterable[Any] = (),
+        joins: Callable[[Select], Select] | None = None,
+    ) -> None:
+        self.fields = fields
+        self.key_columns = tuple(key_columns)
+        self.joins = joins
+
+    def resolve(self, requested: str | None = None) -> list[str]:
+        """
+        Zamienia wartość parametru `fields` na listę pól.
+
+        Raises:
+            ValueError: gdy klient podał nieznane pole
+        """
+        if not requested:
+            return list(self.fields)
+
+        names = [name.strip() for name in requested.split(",") if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ValueError(f"Nieznane pola: {', '.join(unknown)}")
+        return list(dict.fromkeys(names)) or list(self.fields)
+
+    def _columns(self, names: list[str]) -> list[Any]:
+        columns: list[Any] = []
+        for name in names:
+            columns.extend(self.fields[name].columns)
+        columns.extend(self.key_columns)
+        # Każda kolumna pojawia się w zapytaniu tylko raz
+        return list({id(col): col for col in columns}.values())
+
+    def select(self, names: list[str]) -> Select:
+        """Zwraca zapytanie wybierające kolumny potrzebne dla `names`."""
+        statement = db.select(*self._columns(names))
+        return self.joins(statement) if self.joins else statement
+
+    def serializer(self, names: list[str]) -> Callable[[Any], dict[str, Any]]:
+        """Zwraca funkcję wiersz -> słownik dla wierszy z `select(names)`."""
+        positions = {id(col): index for index, col in enumerate(self._columns(names))}
+        plain: list[tuple[str, int]] = []
+        converted: list[tuple[str, Callable[..., Any], tuple[int, ...]]] = []
+
+        for name in names:
+            field = self.fields[name]
+            indexes = tuple(positions[id(col)] for col in field.columns)
+            if field.convert is None:
+                plain.append((name, indexes[0]))
+            else:
+                converted.append((name, field.convert, indexes))
+
+        def serialize(row: Any) -> dict[str, Any]:
+            result = {name: row[index] for name, index in plain}
+            for name, convert, indexes in converted:
+                result[name] = convert(*[row[index] for index in indexes])
+            return result
+
+        return serialize
+
+
+def requested_fields(projection: Projection) -> list[str]:
+    """Odczytuje `?fields=` z bieżącego żądania (ValueError dla nieznanych pól)."""
+    return projection.resolve(request.args.get("fields"))
+
+
+APPOINTMENT_PROJECTION = Projection(
+    {
+        "id": column(Appointment.id),
+        "name": column(Appointment.name),
+        "email": column(Appointment.email),
+        "phone": column(Appointment.phone),
+        "service": column(Appointment.service),
+        "service_id": column(Appointment.service_id),
+        "appointment_date": column(Appointment.appointment_date, _isoformat),
+        "message": column(Appointment.message),
+        "status": column(Appointment.status),
+        "created_at": column(Appointment.created_at, _isoformat),
+    },
+    # Potrzebne do kursora stronicowania
+    key_columns=(Appointment.appointment_date, Appointment.id),
+)
+
+USER_PROJECTION = Projection(
+    {
+        "id": column(User.id),
+        "name": column(User.name),
+        "email": column(User.email),
+        "phone": column(User.phone),
+        "created_at": column(User.created_at, _isoformat),
+    }
+)
+
+
+def _category(
+    category_id: int | None,
+    name: str | None,
+    description: str | None,
+    created_at: date | None,
+    updated_at: date | None,
+) -> dict[str, Any] | None:
+    if category_id is None:
+        return None
+    return {
+        "id": category_id,
+        "name": name,
+        "description": description,
+        "created_at": _isoformat(created_at),
+        "updated_at": _isoformat(updated_at),
+    }
+
+
+SERVICE_PROJECTION = Projection(
+    {
+        "id": column(Service.id),
+        "name": column(Service.name),
+        "description": column(Service.description),
+        "price": column(Service.price, _price),
+        "duration_minutes": column(Service.duration_minutes),
+        "is_active": column(Service.is_active),
+        "category_id": column(Service.category_id),
+        "category": Field(
+            (
+                ServiceCategory.id,
+                ServiceCategory.name,
+                ServiceCategory.description,
+                ServiceCategory.created_at,
+                ServiceCategory.updated_at,
+            ),
+            _category,
+        ),
+        "created_at": column(Service.created_at, _isoformat),
+        "updated_at": column(Service.updated_at, _isoformat),
+    },
+    joins=lambda statement: statement.select_from(Service).outerjoin(
+        ServiceCategory, Service.category_id == ServiceCategory.id
+    ),
+)
+
+# Kategorie z aktywnymi usługami: jeden wiersz na usługę, a kategoria bez
+# aktywnych usług daje jeden wiersz z pustymi kolumnami usługi
+CATALOG_PROJECTION = Projection(
+    SERVICE_PROJECTION.fields,
+    joins=lambda statement: statement.select_from(ServiceCategory).outerjoin(
+        Service,
+        db.and_(
+            Service.category_id == ServiceCategory.id, Service.is_active.is_(True)
+        ),
+    ),
+)
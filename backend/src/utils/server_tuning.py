@@ -0,0 +1,46 @@
+"""Liczba procesów i wątków serwera produkcyjnego (gunicorn, waitress)."""
+
+from __future__ import annotations
+
+import os
+
+# Wątki na proces gunicorn; obsługa żądania to głównie oczekiwanie na SQLite
+# i SMTP, więc kilka wątków na proces wykorzystuje czas blokady GIL
+DEFAULT_THREADS_PER_WORKER = 4
+
+
+def available_cpus() -> int:
+    """Liczba procesorów dostępnych dla procesu (z uwzględnieniem affinity)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - np. Windows, macOS
+        return os.cpu_count() or 1
+
+
+def _env_int(name: str) -> int | None:
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return None
+    number = int(value)
+    if number < 1:
+        raise ValueError(f"{name} musi być liczbą dodatnią: {value}")
+    return number
+
+
+def server_workers(cpus: int | None = None) -> int:
+    """
+    Liczba procesów roboczych gunicorn: `SERVER_WORKERS` albo 2 × CPU + 1.
+
+    Zapisy do SQLite i tak są szeregowane (WAL), ale odczyty oraz kod
+    Pythona skalują się z liczbą procesów, a nie wątków.
+    """
+    configured = _env_int("SERVER_WORKERS")
+    if configured is not None:
+        return configured
+    return 2 * (cpus or available_cpus()) + 1
+
+
+def server_threads(default: int = DEFAULT_THREADS_PER_WORKER) -> int:
+    """Liczba wątków na proces: `SERVER_THREADS` albo `default`."""
+    configured = _env_int("SERVER_THREADS")
+    return configured if configured is not None else default
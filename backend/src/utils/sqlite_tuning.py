@@ -0,0 +1,110 @@
+"""Profil wydajności SQLite: pragmy ustawiane na każdym nowym połączeniu."""
+
+from __future__ import annotations
+
+from typing import Any, Mapping
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+TEMP_STORE_MODES = {"DEFAULT", "FILE", "MEMORY"}
+
+# Wartości domyślne profilu (nadpisywane zmiennymi środowiskowymi w app.py)
+DEFAULT_SQLITE_CONFIG: dict[str, Any] = {
+    "SQLITE_JOURNAL_MODE": "WAL",
+    "SQLITE_SYNCHRONOUS": "NORMAL",
+    "SQLITE_BUSY_TIMEOUT_MS": 5000,
+    "SQLITE_MMAP_SIZE": 256 * 1024 * 1024,
+    # Wartość ujemna oznacza rozmiar w KiB, a nie liczbę stron
+    "SQLITE_CACHE_SIZE": -16000,
+    "SQLITE_TEMP_STORE": "MEMORY",
+    "SQLITE_FOREIGN_KEYS": True,
+}
+
+
+def _choice(value: Any, allowed: set[str], name: str) -> str:
+    normalized = str(value).strip().upper()
+    if normalized not in allowed:
+        raise ValueError(
+            f"Nieprawidłowa wartość {name}: {value} "
+            f"(dozwolone: {', '.join(sorted(allowed))})"
+        )
+    return normalized
+
+
+def sqlite_pragmas(config: Mapping[str, Any]) -> list[tuple[str, str | int]]:
+    """
+    Buduje listę pragm z konfiguracji aplikacji.
+
+    Wartości są walidowane, ponieważ trafiają bezpośrednio do poleceń PRAGMA.
+    Kolejność ma znaczenie: `busy_timeout` ustawiany jest przed zmianą trybu
+    dziennika, która może wymagać chwilowej blokady bazy.
+
+    Raises:
+        ValueError: gdy któraś z wartości jest nieprawidłowa
+    """
+
+    def get(key: str) -> Any:
+        return config.get(key, DEFAULT_SQLITE_CONFIG[key])
+
+    return [
+        ("busy_timeout", int(get("SQLITE_BUSY_TIMEOUT_MS"))),
+        (
+            "journal_mode",
+            _choice(get("SQLITE_JOURNAL_MODE"), JOURNAL_MODES, "SQLITE_JOURNAL_MODE"),
+        ),
+        (
+            "synchronous",
+            _choice(
+                get("SQLITE_SYNCHRONOUS"), SYNCHRONOUS_MODES, "SQLITE_SYNCHRONOUS"
+            ),
+        ),
+        ("mmap_size", int(get("SQLITE_MMAP_SIZE"))),
+        ("cache_size", int(get("SQLITE_CACHE_SIZE"))),
+        (
+            "temp_store",
+            _choice(get("SQLITE_TEMP_STORE"), TEMP_STORE_MODES, "SQLITE_TEMP_STORE"),
+        ),
+        ("foreign_keys", "ON" if get("SQLITE_FOREIGN_KEYS") else "OFF"),
+    ]
+
+
+def install_sqlite_pragmas(
+    engine: Engine, pragmas: list[tuple[str, str | int]]
+) -> None:
+    """
+    Rejestruje ustawianie pragm na każdym nowym połączeniu silnika.
+
+    Dla baz innych niż SQLite nic nie robi. Połączenia już otwarte w puli
+    są zamykane, by również przeszły przez nową konfigurację.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    statements = [f"PRAGMA {name}={value}" for name, value in pragmas]
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection: Any, _: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    engine.dispose()
+
+
+def read_sqlite_pragmas(engine: Engine) -> dict[str, Any]:
+    """Odczytuje bieżące wartości pragm profilu (np. do diagnostyki)."""
+    if engine.dialect.name != "sqlite":
+        return {}
+
+    names = [name for name, _ in sqlite_pragmas({})]
+    with engine.connect() as connection:
+        return {
+            name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in names
+        }
@@ -0,0 +1,303 @@
+"""Serwowanie zbudowanego frontendu (SPA) z manifestu plików statycznych."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from flask import Response, current_app, request, send_file
+
+try:  # pragma: no cover - zależność opcjonalna
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+INDEX_FILE = "index.html"
+
+# Manifest budowania Vite (`build.manifest: true`): Vite 5+ i starsze wersje
+VITE_MANIFESTS = (".vite/manifest.json", "manifest.json")
+
+# Bez manifestu: 8-znakowy hash Vite tuż przed rozszerzeniem,
+# np. assets/index-B1x9aZ_q.js
+HASHED_NAME = re.compile(r"-([A-Za-z0-9_-]{8})\.[a-z0-9]+$")
+
+# Rozszerzenia wariantów skompresowanych, w kolejności preferencji
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "application/xml",
+    "image/svg+xml",
+)
+
+# Mniejszych plików nie opłaca się kompresować
+MIN_COMPRESS_SIZE = 1024
+
+
+@dataclass(frozen=True)
+class StaticFile:
+    """Plik na dysku wraz z wyliczonym ETagiem."""
+
+    path: str
+    etag: str
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    """Pozycja manifestu: plik, jego typ i warianty skompresowane."""
+
+    url_path: str
+    file: StaticFile
+    mimetype: str
+    immutable: bool
+    last_modified: datetime
+    variants: dict[str, StaticFile] = field(default_factory=dict)
+
+
+def _file_etag(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+def _mimetype(path: str) -> str:
+    return mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+
+def _is_compressible(mimetype: str) -> bool:
+    return mimetype.startswith(COMPRESSIBLE_TYPES)
+
+
+def read_vite_manifest(root: str) -> set[str] | None:
+    """
+    Zwraca ścieżki plików z hashem w nazwie według manifestu Vite.
+
+    Returns:
+        Zbiór ścieżek względem `root` albo None, gdy manifestu nie ma
+        (`manifest.json` bez wpisów `file` to np. manifest PWA)
+    """
+    for relative in VITE_MANIFESTS:
+        path = os.path.join(root, relative)
+        if not os.path.isfile(path):
+            continue
+        try:
+            with open(path, encoding="utf-8") as handle:
+                chunks = json.load(handle)
+        except (OSError, ValueError):
+            continue
+        if not isinstance(chunks, dict) or not all(
+            isinstance(chunk, dict) and "file" in chunk for chunk in chunks.values()
+        ):
+            continue
+
+        hashed: set[str] = set()
+        for chunk in chunks.values():
+            hashed.add(chunk["file"])
+            hashed.update(chunk.get("css", []))
+            hashed.update(chunk.get("assets", []))
+        return hashed
+    return None
+
+
+def _looks_hashed(url_path: str) -> bool:
+    match = HASHED_NAME.search(url_path)
+    if not url_path.startswith("assets/") or match is None:
+        return False
+    # Hash Vite (base64url) prawie zawsze zawiera cyfrę, wielką literę, "-"
+    # lub "_"; same małe litery to zwykle słowo, np. logo-original.png
+    segment = match.group(1)
+    return not (segment.isalpha() and segment.islower())
+
+
+class StaticManifest:
+    """
+    Manifest plików katalogu statycznego budowany przy starcie aplikacji.
+
+    Żądanie nie sprawdza już systemu plików: ścieżka, typ, ETag (skrót
+    treści) i dostępne warianty `.br`/`.gz` są znane z góry. Pliki z hashem
+    w nazwie (bundle Vite, według jego manifestu) są niezmienne i mogą być
+    trzymane przez przeglądarkę bez odpytywania serwera.
+    """
+
+    def __init__(
+        self, max_age: int = 3600, immutable_max_age: int = 365 * 24 * 3600
+    ) -> None:
+        self.root: str | None = None
+        self.assets: dict[str, StaticAsset] = {}
+        # Czas przechowywania plików bez hasha w nazwie (np. obrazów z public/)
+        self.max_age = max_age
+        self.immutable_max_age = immutable_max_age
+
+    def load(self, root: str | None) -> int:
+        """Buduje manifest dla katalogu `root`; zwraca liczbę plików."""
+        assets: dict[str, StaticAsset] = {}
+        if root and os.path.isdir(root):
+            hashed = read_vite_manifest(root)
+            for directory, subdirectories, names in os.walk(root):
+                # Manifest Vite 5+ (.vite/) nie jest serwowany
+                subdirectories[:] = [d for d in subdirectories if d != ".vite"]
+                for name in names:
+                    if name.endswith((".br", ".gz")):
+                        continue
+                    path = os.path.join(directory, name)
+                    url_path = os.path.relpath(path, root).replace(os.sep, "/")
+                    immutable = (
+                        url_path in hashed
+                        if hashed is not None
+                        else _looks_hashed(url_path)
+                    )
+                    assets[url_path] = self._describe(url_path, path, immutable)
+
+        self.root = root
+        self.assets = assets
+        return len(assets)
+
+    @staticmethod
+    def _describe(url_path: str, path: str, immutable: bool) -> StaticAsset:
+        stat = os.stat(path)
+        variants = {}
+        for encoding, suffix in ENCODINGS:
+            if os.path.isfile(path + suffix):
+                variant = path + suffix
+                variants[encoding] = StaticFile(variant, _file_etag(variant))
+        return StaticAsset(
+            url_path=url_path,
+            file=StaticFile(path, _file_etag(path)),
+            mimetype=_mimetype(path),
+            immutable=immutable,
+            last_modified=datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+            variants=variants,
+        )
+
+    def get(self, url_path: str) -> StaticAsset | None:
+        return self.assets.get(url_path)
+
+    def stats(self) -> dict[str, int]:
+        assets = list(self.assets.values())
+        return {
+            "files": len(assets),
+            "immutable": sum(asset.immutable for asset in assets),
+            "precompressed": sum(bool(asset.variants) for asset in assets),
+        }
+
+
+def get_static_manifest() -> StaticManifest:
+    """Pobiera manifest plików statycznych z aplikacji."""
+    return current_app.extensions["static_manifest"]
+
+
+def _choose_variant(asset: StaticAsset) -> tuple[str | None, StaticFile]:
+    for encoding, _ in ENCODINGS:
+        variant = asset.variants.get(encoding)
+        if variant is not None and request.accept_encodings[encoding] > 0:
+            return encoding, variant
+    return None, asset.file
+
+
+def send_asset(asset: StaticAsset) -> Response:
+    """
+    Wysyła plik z manifestu.
+
+    Wariant `.br`/`.gz` wybierany jest według `Accept-Encoding`. `send_file`
+    obsługuje `Range` oraz `If-None-Match`/`If-Modified-Since` (304).
+    """
+    encoding, served = _choose_variant(asset)
+    static_manifest = get_static_manifest()
+    if asset.immutable:
+        max_age: int | None = static_manifest.immutable_max_age
+    elif asset.url_path == INDEX_FILE:
+        # index.html wskazuje aktualne bundle, więc zawsze jest odpytywany
+        max_age = None
+    else:
+        max_age = static_manifest.max_age
+
+    # Bez max_age send_file ustawia "no-cache"
+    response = send_file(
+        served.path,
+        mimetype=asset.mimetype,
+        conditional=True,
+        etag=served.etag,
+        last_modified=asset.last_modified,
+        max_age=max_age,
+    )
+    if asset.immutable:
+        response.cache_control.immutable = True
+
+    if encoding is not None:
+        response.content_encoding = encoding
+    if asset.variants:
+        response.vary.add("Accept-Encoding")
+    return response
+
+
+def serve_spa(path: str) -> Response | tuple[str, int]:
+    """
+    Zwraca plik statyczny albo `index.html` dla ścieżek aplikacji (routing SPA).
+
+    Brakujący plik z rozszerzeniem (np. bundle z poprzedniego wdrożenia)
+    kończy się 404, a nie stroną HTML podaną jako skrypt.
+    """
+    static_manifest = get_static_manifest()
+    if static_manifest.root is None:
+        return "Static folder not configured", 404
+
+    asset = static_manifest.get(path) if path else None
+    if asset is not None:
+        return send_asset(asset)
+
+    if "." in path.rsplit("/", 1)[-1]:
+        return "Not found", 404
+
+    index = static_manifest.get(INDEX_FILE)
+    if index is None:
+        return "index.html not found", 404
+    return send_asset(index)
+
+
+def compress_static_files(root: str) -> list[tuple[str, str, int, int]]:
+    """
+    Zapisuje warianty `.gz` (oraz `.br`, jeśli dostępny jest pakiet `brotli`)
+    dla plików tekstowych katalogu `root`.
+
+    Wariant zapisywany jest tylko, gdy jest mniejszy od oryginału.
+
+    Returns:
+        Lista (ścieżka, kodowanie, rozmiar oryginału, rozmiar wariantu)
+    """
+    written = []
+    for directory, _, names in os.walk(root):
+        for name in names:
+            if name.endswith((".br", ".gz")):
+                continue
+            path = os.path.join(directory, name)
+            if not _is_compressible(_mimetype(path)):
+                continue
+            with open(path, "rb") as handle:
+                data = handle.read()
+            if len(data) < MIN_COMPRESS_SIZE:
+                continue
+
+            encoded = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                encoded["br"] = brotli.compress(data, quality=11)
+
+            for encoding, suffix in ENCODINGS:
+                variant = encoded.get(encoding)
+                if variant is None or len(variant) >= len(data):
+                    continue
+                with open(path + suffix, "wb") as handle:
+                    handle.write(variant)
+                relative = os.path.relpath(path, root).replace(os.sep, "/")
+                written.append((relative, encoding, len(data), len(variant)))
+    return written
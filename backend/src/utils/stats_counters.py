@@ -0,0 +1,315 @@
+"""Przyrostowo aktualizowane liczniki statystyk rezerwacji."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import NamedTuple
+
+from sqlalchemy import ColumnElement, func, literal, union_all, update
+from sqlalchemy.dialects.sqlite import insert
+
+from src.models import Appointment, Service, StatsCounter, db
+from src.models.stats import ALL_BUCKET
+
+CounterKey = tuple[str, str]
+
+
+class AppointmentState(NamedTuple):
+    """Pola rezerwacji, od których zależą liczniki."""
+
+    status: str
+    day: date
+    service_id: int | None
+
+
+def appointment_state(appointment: Appointment) -> AppointmentState:
+    """Zapamiętuje stan rezerwacji przed jej zmianą."""
+    return AppointmentState(
+        appointment.status or "pending",
+        appointment.appointment_date.date(),
+        appointment.service_id,
+    )
+
+
+def active_service_prices(service_ids: set[int]) -> dict[int, Decimal]:
+    """Zwraca mapę identyfikator aktywnej usługi -> cena dla wskazanych usług."""
+    if not service_ids:
+        return {}
+    return {
+        service_id: price or Decimal("0")
+        for service_id, price in db.session.execute(
+            db.select(Service.id, Service.price).where(
+                Service.id.in_(service_ids), Service.is_active.is_(True)
+            )
+        )
+    }
+
+
+def _apply(deltas: dict[CounterKey, tuple[int, Decimal]]) -> None:
+    rows = [
+        {"bucket": bucket, "status": status, "appointments": count, "revenue": revenue}
+        for (bucket, status), (count, revenue) in deltas.items()
+        if count or revenue
+    ]
+    if not rows:
+        return
+
+    statement = insert(StatsCounter).values(rows)
+    db.session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[StatsCounter.bucket, StatsCounter.status],
+            set_={
+                "appointments": StatsCounter.appointments
+                + statement.excluded.appointments,
+                "revenue": StatsCounter.revenue + statement.excluded.revenue,
+            },
+        )
+    )
+
+
+def record_appointment_change(
+    before: AppointmentState | None, after: AppointmentState | None
+) -> None:
+    """
+    Aktualizuje liczniki po utworzeniu (`before=None`), zmianie lub usunięciu
+    (`after=None`) rezerwacji. Nie zatwierdza transakcji - wywołujący robi
+    to razem z zapisem samej rezerwacji.
+    """
+    if before == after:
+        return
+
+    prices = active_service_prices(
+        {
+            state.service_id
+            for state in (before, after)
+            if state is not None and state.service_id is not None
+        }
+    )
+    deltas: dict[CounterKey, tuple[int, Decimal]] = defaultdict(
+        lambda: (0, Decimal("0"))
+    )
+    for state, sign in ((before, -1), (after, 1)):
+        if state is None:
+            continue
+        revenue = prices.get(state.service_id, Decimal("0")) * sign
+        for bucket in (ALL_BUCKET, state.day.isoformat()):
+            count, total = deltas[(bucket, state.status)]
+            deltas[(bucket, state.status)] = (count + sign, total + revenue)
+
+    _apply(deltas)
+
+
+def record_appointments_created(states: list[AppointmentState]) -> None:
+    """
+    Dolicza wiele nowych rezerwacji naraz (import) jednym zapytaniem o ceny
+    i jednym zapisem liczników. Nie zatwierdza transakcji.
+    """
+    prices = active_service_prices(
+        {state.service_id for state in states if state.service_id is not None}
+    )
+    deltas: dict[CounterKey, tuple[int, Decimal]] = defaultdict(
+        lambda: (0, Decimal("0"))
+    )
+    for state in states:
+        revenue = prices.get(state.service_id, Decimal("0"))
+        for bucket in (ALL_BUCKET, state.day.isoformat()):
+            count, total = deltas[(bucket, state.status)]
+            deltas[(bucket, state.status)] = (count + 1, total + revenue)
+
+    _apply(deltas)
+
+
+def effective_price(price: Decimal | None, is_active: bool | None) -> Decimal:
+    """Cena wliczana do przychodu: nieaktywne usługi nie generują przychodu."""
+    return Decimal(price or 0) if is_active else Decimal("0")
+
+
+def adjust_service_revenue(
+    condition: ColumnElement[bool], delta: Decimal
+) -> None:
+    """
+    Zmienia przychód liczników o `delta` na każdą rezerwację spełniającą
+    `condition` (np. wszystkie rezerwacje danej usługi po zmianie ceny).
+
+    Jedno polecenie `UPDATE ... FROM` z liczbą rezerwacji na (dzień, status),
+    więc koszt zależy od liczby rezerwacji tej usługi, a nie całej tabeli.
+    Nie zatwierdza transakcji.
+    """
+    if not delta:
+        return
+
+    status = func.coalesce(Appointment.status, "pending")
+    day = func.date(Appointment.appointment_date)
+    per_day = (
+        db.select(
+            status.label("status"),
+            day.label("bucket"),
+            func.count(Appointment.id).label("appointments"),
+        )
+        .where(condition)
+        .group_by(status, day)
+    )
+    overall = (
+        db.select(
+            status.label("status"),
+            literal(ALL_BUCKET).label("bucket"),
+            func.count(Appointment.id).label("appointments"),
+        )
+        .where(condition)
+        .group_by(status)
+    )
+    changes = union_all(per_day, overall).subquery()
+    db.session.execute(
+        update(StatsCounter)
+        .where(
+            StatsCounter.bucket == changes.c.bucket,
+            StatsCounter.status == changes.c.status,
+        )
+        .values(revenue=StatsCounter.revenue + changes.c.appointments * delta)
+    )
+
+
+def compute_counters() -> dict[CounterKey, tuple[int, Decimal]]:
+    """
+    Wylicza liczniki od zera na podstawie tabeli rezerwacji.
+
+    Przychód to suma cen aktywnych usług, do których rezerwacje są
+    przypisane kluczem `service_id`.
+    """
+    appointment_day = func.date(Appointment.appointment_date)
+    rows = db.session.execute(
+        db.select(
+            Appointment.status,
+            appointment_day,
+            func.count(Appointment.id),
+            func.coalesce(func.sum(Service.price), 0),
+        )
+        .outerjoin(
+            Service,
+            (Service.id == Appointment.service_id) & Service.is_active.is_(True),
+        )
+        .group_by(Appointment.status, appointment_day)
+    )
+
+    counters: dict[CounterKey, tuple[int, Decimal]] = defaultdict(
+        lambda: (0, Decimal("0"))
+    )
+    for status, day, count, revenue in rows:
+        revenue = Decimal(str(revenue or 0))
+        for bucket in (ALL_BUCKET, day):
+            current_count, current_revenue = counters[(bucket, status or "pending")]
+            counters[(bucket, status or "pending")] = (
+                current_count + count,
+                current_revenue + revenue,
+            )
+    return dict(counters)
+
+
+def stored_counters() -> dict[CounterKey, tuple[int, Decimal]]:
+    """Zwraca liczniki zapisane w tabeli `stats_counters`."""
+    rows = db.session.execute(
+        db.select(
+            StatsCounter.bucket,
+            StatsCounter.status,
+            StatsCounter.appointments,
+            StatsCounter.revenue,
+        )
+    )
+    return {
+        (bucket, status): (count, revenue or Decimal("0"))
+        for bucket, status, count, revenue in rows
+        if count or revenue
+    }
+
+
+def find_drift() -> list[dict]:
+    """Porównuje zapisane liczniki z wyliczonymi od zera i zwraca różnice."""
+    expected = compute_counters()
+    stored = stored_counters()
+    drift = []
+    for key in sorted(set(expected) | set(stored)):
+        want = expected.get(key, (0, Decimal("0")))
+        have = stored.get(key, (0, Decimal("0")))
+        if want[0] != have[0] or Decimal(want[1]) != Decimal(have[1]):
+            drift.append(
+                {
+                    "bucket": key[0],
+                    "status": key[1],
+                    "expected": {"appointments": want[0], "revenue": float(want[1])},
+                    "stored": {"appointments": have[0], "revenue": float(have[1])},
+                }
+            )
+    return drift
+
+
+def rebuild_counters() -> int:
+    """
+    Przelicza wszystkie liczniki od zera. Nie zatwierdza transakcji.
+
+    Wywoływane przy przygotowaniu bazy (`init_database`) i z CLI; zmiany
+    cen usług obsługuje przyrostowo `adjust_service_revenue`.
+
+    Returns:
+        Liczba zapisanych wierszy liczników
+    """
+    counters = compute_counters()
+    db.session.execute(db.delete(StatsCounter))
+    rows = [
+        {"bucket": bucket, "status": status, "appointments": count, "revenue": revenue}
+        for (bucket, status), (count, revenue) in counters.items()
+    ]
+    if rows:
+        db.session.execute(db.insert(StatsCounter), rows)
+    return len(rows)
+
+
+def read_summary(today: date, now: datetime) -> dict[str, int | Decimal]:
+    """
+    Odczytuje liczniki potrzebne w podsumowaniu panelu administratora.
+
+    Liczniki zbiorcze i dzisiejsze pochodzą z `stats_counters` (kilka
+    wierszy), a jedynie liczba nadchodzących wizyt, zależna od bieżącej
+    godziny, liczona jest zapytaniem zakresowym po indeksie.
+    """
+    query = db.select(
+        StatsCounter.bucket,
+        StatsCounter.status,
+        StatsCounter.appointments,
+        StatsCounter.revenue,
+    ).where(StatsCounter.bucket.in_([ALL_BUCKET, today.isoformat()]))
+    rows = db.session.execute(query).all()
+
+    if not rows and rebuild_counters():
+        # Pusta tabela po wdrożeniu na istniejącej bazie - wypełniamy ją raz
+        db.session.commit()
+        rows = db.session.execute(query).all()
+
+    totals: dict[str, int] = defaultdict(int)
+    today_count = 0
+    confirmed_revenue = Decimal("0")
+    for bucket, status, count, revenue in rows:
+        if bucket == ALL_BUCKET:
+            totals[status] += count
+            if status == "confirmed":
+                confirmed_revenue = revenue or Decimal("0")
+        else:
+            today_count += count
+
+    upcoming = db.session.execute(
+        db.select(func.count(Appointment.id)).where(
+            Appointment.status.in_(["pending", "confirmed"]),
+            Appointment.appointment_date >= now,
+        )
+    ).scalar()
+
+    return {
+        "total": sum(totals.values()),
+        "pending": totals["pending"],
+        "confirmed": totals["confirmed"],
+        "cancelled": totals["cancelled"],
+        "upcoming": upcoming or 0,
+        "today": today_count,
+        "revenue": confirmed_revenue,
+    }
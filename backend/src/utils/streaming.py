@@ -0,0 +1,86 @@
+"""Strumieniowe odpowiedzi JSON dla dużych list."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Iterator
+
+from flask import Response, request, stream_with_context
+from flask_sqlalchemy.query import Query
+from sqlalchemy import Select
+
+from src.utils.serializers import dumps_json, fetch_rows
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+# Liczba wierszy pobieranych z kursora i kodowanych w jednej porcji
+STREAM_BATCH_SIZE = 500
+
+
+def requested_stream_format() -> str | None:
+    """
+    Sprawdza, czy klient poprosił o odpowiedź strumieniową.
+
+    Returns:
+        "ndjson" dla `Accept: application/x-ndjson` lub `?stream=ndjson`,
+        "json" dla `?stream=1` (tablica JSON wysyłana porcjami),
+        None gdy odpowiedź ma zostać zbudowana w całości
+    """
+    stream = request.args.get("stream", "").strip().lower()
+    if stream == "ndjson":
+        return "ndjson"
+    if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        return "ndjson"
+    if stream in ("1", "true", "yes", "json"):
+        return "json"
+    return None
+
+
+def _encode_rows(
+    rows: Iterator[Any], serialize: Callable[[Any], dict], fmt: str
+) -> Iterator[bytes]:
+    batch: list[bytes] = []
+    first = True
+
+    if fmt == "json":
+        yield b"["
+
+    for row in rows:
+        encoded = dumps_json(serialize(row))
+        if fmt == "json":
+            batch.append(encoded if first else b"," + encoded)
+            first = False
+        else:
+            batch.append(encoded + b"\n")
+
+        if len(batch) >= STREAM_BATCH_SIZE:
+            yield b"".join(batch)
+            batch.clear()
+
+    if batch:
+        yield b"".join(batch)
+
+    if fmt == "json":
+        yield b"]"
+
+
+def stream_query(
+    query: Query | Select, serialize: Callable[[Any], dict], fmt: str
+) -> Response:
+    """
+    Zwraca odpowiedź, która koduje wiersze zapytania w miarę ich odczytu.
+
+    Wiersze pobierane są z kursora porcjami (`yield_per`), więc zużycie
+    pamięci nie zależy od rozmiaru tabeli. Przyjmuje zapytanie ORM lub
+    `select()` zwracający krotki (np. z projekcji w `serializers`). Zapytanie
+    ORM nie może ładować kolekcji przez `joinedload` - do relacji należy
+    użyć `selectinload`.
+    """
+    if isinstance(query, Select):
+        rows = fetch_rows(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+    else:
+        rows = query.yield_per(STREAM_BATCH_SIZE)
+    mimetype = NDJSON_MIMETYPE if fmt == "ndjson" else "application/json"
+    return Response(
+        stream_with_context(_encode_rows(iter(rows), serialize, fmt)),
+        mimetype=mimetype,
+    )
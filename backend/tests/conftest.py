@@ -0,0 +1,140 @@
+"""Wspólne fikstury testów: aplikacja na świeżej bazie w katalogu tymczasowym."""
+
+from __future__ import annotations
+
+import os
+import socketserver
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from src.bootstrap import init_database  # noqa: E402
+from src.models import db  # noqa: E402
+
+
+@pytest.fixture
+def app_config() -> dict[str, Any]:
+    """Dodatkowa konfiguracja; moduł testów nadpisuje ją fiksturą o tej nazwie."""
+    return {}
+
+
+@pytest.fixture
+def app(tmp_path, app_config: dict[str, Any]) -> Iterator[Flask]:
+    """Aplikacja ze schematem, migracjami i startowym katalogiem usług."""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.db'}",
+            "EMAIL_OUTBOX_IN_PROCESS": False,
+            **app_config,
+        }
+    )
+    with app.app_context():
+        init_database()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app: Flask):
+    return app.test_client()
+
+
+@contextmanager
+def capture_sql(app: Flask) -> Iterator[list[tuple[str, Any]]]:
+    """Zbiera polecenia SQL (treść, parametry) wykonane przez silnik aplikacji."""
+    statements: list[tuple[str, Any]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+class SMTPStub(socketserver.ThreadingTCPServer):
+    """
+    Lokalny serwer SMTP do testów wysyłki.
+
+    Obsługuje tyle protokołu, ile używa `smtplib` (EHLO, AUTH PLAIN, MAIL,
+    RCPT, DATA, NOOP, QUIT). Przyjęte wiadomości trafiają do `messages`,
+    a przy `reject = True` nadawca jest odrzucany kodem 451.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), SMTPStubHandler)
+        self.messages: list[dict[str, Any]] = []
+        self.reject = False
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+
+class SMTPStubHandler(socketserver.StreamRequestHandler):
+    server: SMTPStub
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self) -> None:
+        self.reply("220 stub")
+        envelope: dict[str, Any] = {"recipients": []}
+        while line := self.rfile.readline():
+            command = line.decode().rstrip("\r\n")
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self.reply("250-stub")
+                self.reply("250 AUTH PLAIN")
+            elif verb == "AUTH":
+                self.reply("235 Uwierzytelniono")
+            elif verb == "MAIL":
+                if self.server.reject:
+                    self.reply("451 Serwer chwilowo niedostępny")
+                    continue
+                envelope = {"sender": command[10:], "recipients": []}
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                envelope["recipients"].append(command[8:])
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 Koniec: <CRLF>.<CRLF>")
+                body = []
+                while (data := self.rfile.readline()) not in (b".\r\n", b""):
+                    body.append(data)
+                envelope["data"] = b"".join(body)
+                self.server.messages.append(envelope)
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Do widzenia")
+                return
+            else:
+                # HELO, NOOP, RSET
+                self.reply("250 OK")
+
+
+@pytest.fixture
+def smtp_server() -> Iterator[SMTPStub]:
+    server = SMTPStub()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,238 @@
+"""Lista rezerwacji (stronicowanie, pola, strumień) oraz import i eksport."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from typing import Any
+
+import pytest
+from flask import Flask
+
+from app import create_app
+from src.bootstrap import init_database
+from src.models import db
+
+# Trzy rezerwacje o tej samej godzinie - kursor musi je rozróżniać po id
+RECORDS = [
+    {"date": "2029-03-01", "time": "10:00", "status": "confirmed"},
+    {"date": "2029-03-01", "time": "10:00", "status": "pending"},
+    {"date": "2029-03-01", "time": "10:00", "status": "cancelled"},
+    {"date": "2029-03-01", "time": "09:00", "status": "confirmed"},
+    {"date": "2029-03-02", "time": "12:30", "status": "pending"},
+    {"date": "2029-02-27", "time": "16:00", "status": "confirmed"},
+    {"date": "2029-02-27", "time": "16:00", "status": "pending"},
+]
+
+
+def ndjson(records: list[dict[str, Any]]) -> bytes:
+    return b"".join(json.dumps(record).encode() + b"\n" for record in records)
+
+
+def import_records(client, body: bytes, fmt: str) -> dict[str, Any]:
+    response = client.post(f"/api/appointments/import?format={fmt}", data=body)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+@pytest.fixture
+def appointments(client) -> list[dict[str, Any]]:
+    """Rezerwacje zaimportowane do bazy, w kolejności listy (od najpóźniejszej)."""
+    records = [
+        {
+            "name": f"Pacjent {number}",
+            "email": f"pacjent{number}@example.com",
+            "phone": "123 456 789",
+            "service": "Konsultacja podologiczna",
+            "message": f"Wiadomość {number}",
+            **record,
+        }
+        for number, record in enumerate(RECORDS)
+    ]
+    assert import_records(client, ndjson(records), "ndjson")["imported"] == len(
+        records
+    )
+    rows = client.get("/api/appointments").get_json()
+    assert len(rows) == len(records)
+    return rows
+
+
+def test_full_list_is_ordered_by_date_then_id(appointments):
+    keys = [(row["appointment_date"], row["id"]) for row in appointments]
+    assert keys == sorted(keys, reverse=True)
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_keyset_pages_cover_ties_on_appointment_date(client, appointments, limit):
+    seen: list[dict[str, Any]] = []
+    cursor = None
+    while True:
+        query = f"?limit={limit}" + (f"&cursor={cursor}" if cursor else "")
+        page = client.get(f"/api/appointments{query}").get_json()
+        assert len(page["appointments"]) <= limit
+        seen.extend(page["appointments"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == appointments
+
+
+def test_keyset_pages_respect_filters(client, appointments):
+    confirmed = [row for row in appointments if row["status"] == "confirmed"]
+    first = client.get("/api/appointments?status=confirmed&limit=2").get_json()
+    rest = client.get(
+        f"/api/appointments?status=confirmed&limit=2&cursor={first['next_cursor']}"
+    ).get_json()
+    assert first["appointments"] + rest["appointments"] == confirmed
+    assert rest["next_cursor"] is None
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "?cursor=nie-kursor",
+        "?cursor=WzFd",  # [1] - poprawny base64, zła zawartość
+        "?cursor=WyJ4IiwgMV0",  # ["x", 1] - nieprawidłowa data
+        "?limit=abc",
+        "?limit=",
+    ],
+)
+def test_invalid_cursor_or_limit_returns_400(client, appointments, query):
+    response = client.get(f"/api/appointments{query}")
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_fields_limit_returned_keys(client, appointments):
+    rows = client.get("/api/appointments?fields=id,status").get_json()
+    assert rows == [{"id": row["id"], "status": row["status"]} for row in appointments]
+
+    page = client.get("/api/appointments?fields=name&limit=2").get_json()
+    assert page["appointments"] == [
+        {"name": row["name"]} for row in appointments[:2]
+    ]
+    # Kursor działa, choć kolumny klucza nie ma wśród zwracanych pól
+    rest = client.get(
+        f"/api/appointments?fields=name&cursor={page['next_cursor']}"
+    ).get_json()
+    assert rest["appointments"] == [{"name": row["name"]} for row in appointments[2:]]
+
+
+@pytest.mark.parametrize("fields", ["id,nieznane", "password", "id,,status,x"])
+def test_unknown_field_returns_400(client, appointments, fields):
+    response = client.get(f"/api/appointments?fields={fields}")
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+@pytest.mark.parametrize("query", ["", "&status=pending", "&fields=id,email"])
+def test_streamed_json_and_ndjson_match_paged_rows(client, appointments, query):
+    paged: list[dict[str, Any]] = []
+    cursor = ""
+    while True:
+        page = client.get(f"/api/appointments?limit=2{query}{cursor}").get_json()
+        paged.extend(page["appointments"])
+        if page["next_cursor"] is None:
+            break
+        cursor = f"&cursor={page['next_cursor']}"
+
+    streamed = client.get(f"/api/appointments?stream=1{query}")
+    assert streamed.mimetype == "application/json"
+    assert json.loads(streamed.get_data()) == paged
+
+    for url, headers in (
+        (f"/api/appointments?stream=ndjson{query}", {}),
+        (f"/api/appointments?x=1{query}", {"Accept": "application/x-ndjson"}),
+    ):
+        response = client.get(url, headers=headers)
+        assert response.mimetype == "application/x-ndjson"
+        lines = response.get_data(as_text=True).splitlines()
+        assert [json.loads(line) for line in lines] == paged
+
+
+# Import i eksport
+
+
+def exported(client, fmt: str) -> list[dict[str, Any]]:
+    response = client.get(f"/api/appointments/export?format={fmt}")
+    assert response.status_code == 200
+    text = response.get_data(as_text=True)
+    if fmt == "csv":
+        return list(csv.DictReader(io.StringIO(text)))
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def comparable(records: list[dict[str, Any]]) -> list[dict[str, str]]:
+    """Pola przenoszone przez import (bez `id` i `created_at`), jako tekst."""
+    return [
+        {
+            key: "" if value is None else str(value)
+            for key, value in record.items()
+            if key not in ("id", "created_at")
+        }
+        for record in records
+    ]
+
+
+@pytest.fixture
+def other_app(tmp_path) -> Flask:
+    """Druga, pusta instalacja - cel przeniesienia rezerwacji."""
+    other = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'other.db'}",
+            "EMAIL_OUTBOX_IN_PROCESS": False,
+        }
+    )
+    with other.app_context():
+        init_database()
+    yield other
+    with other.app_context():
+        db.engine.dispose()
+
+
+@pytest.mark.parametrize("fmt", ["csv", "ndjson"])
+def test_export_imports_into_another_installation(
+    client, appointments, other_app, fmt
+):
+    source = exported(client, fmt)
+    assert len(source) == len(appointments)
+    keys = [(row["date"], row["time"], int(row["id"])) for row in source]
+    assert keys == sorted(keys)
+
+    response = client.get(f"/api/appointments/export?format={fmt}")
+    other_client = other_app.test_client()
+    report = import_records(other_client, response.get_data(), fmt)
+    assert report == {"imported": len(source), "failed": 0, "errors": []}
+
+    assert comparable(exported(other_client, fmt)) == comparable(source)
+
+
+def test_import_reports_invalid_rows_and_keeps_valid_ones(client):
+    body = (
+        b'{"name": "Jan", "email": "jan@example.com", "service": '
+        b'"Konsultacja podologiczna", "date": "2029-01-01", "time": "10:00"}\n'
+        b"to nie jest JSON\n"
+        b'{"name": "Anna", "email": "anna@example.com", "date": "2029-01-01"}\n'
+        b'{"name": "Ewa", "email": "ewa@example.com", "service": '
+        b'"Konsultacja podologiczna", "date": "2029-01-01", "status": "zly"}\n'
+    )
+    report = import_records(client, body, "ndjson")
+    assert report["imported"] == 1
+    assert report["failed"] == 3
+    assert [error["line"] for error in report["errors"]] == [2, 3, 4]
+    assert report["errors"][1]["fields"] == ["service"]
+
+    assert [row["name"] for row in client.get("/api/appointments").get_json()] == [
+        "Jan"
+    ]
+
+
+def test_transfer_rejects_unknown_format(client):
+    assert client.get("/api/appointments/export?format=xml").status_code == 400
+    response = client.post(
+        "/api/appointments/import", data=b"{}", content_type="application/xml"
+    )
+    assert response.status_code == 400
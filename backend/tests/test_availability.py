@@ -0,0 +1,259 @@
+"""Wolne terminy: pamięć podręczna dni, unieważnianie i zgodność z dawnym wyliczeniem."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from app import create_app
+from src.models import Appointment, db
+from src.utils import availability
+from src.utils.availability import AvailabilityCache
+
+START = date(2030, 1, 7)
+
+
+class Computation:
+    """Sztuczne `compute`: jeden termin dziennie, zapamiętuje wywołania."""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[date, int]] = []
+
+    def __call__(self, start: date, days: int) -> list[dict[str, str]]:
+        self.calls.append((start, days))
+        return [
+            {"date": (start + timedelta(days=i)).isoformat(), "time": "09:00"}
+            for i in range(days)
+        ]
+
+
+def dates(slots: list[dict[str, str]]) -> list[str]:
+    return [slot["date"] for slot in slots]
+
+
+def test_cache_computes_only_missing_days():
+    cache = AvailabilityCache()
+    compute = Computation()
+
+    first = cache.get_window("v", START, 5, compute)
+    again = cache.get_window("v", START, 5, compute)
+    assert first == again
+    assert compute.calls == [(START, 5)]
+    assert cache.stats()["hits"] == 5
+    assert cache.stats()["misses"] == 5
+
+    # Dłuższe okno liczy tylko dni, których jeszcze nie ma
+    window = cache.get_window("v", START, 7, compute)
+    assert compute.calls[-1] == (START + timedelta(days=5), 2)
+    assert dates(window) == [
+        (START + timedelta(days=i)).isoformat() for i in range(7)
+    ]
+
+    # Inny wariant (np. inna usługa) ma osobne wpisy
+    cache.get_window("w", START, 1, compute)
+    assert compute.calls[-1] == (START, 1)
+
+
+def test_cache_evicts_least_recently_used_day():
+    cache = AvailabilityCache(max_entries=3)
+    compute = Computation()
+    cache.get_window("v", START, 3, compute)
+
+    # Odczyt pierwszego dnia czyni drugi najdawniej używanym
+    cache.get_window("v", START, 1, compute)
+    cache.get_window("v", START + timedelta(days=3), 1, compute)
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["entries"] == 3
+
+    compute.calls.clear()
+    cache.get_window("v", START, 1, compute)
+    cache.get_window("v", START + timedelta(days=1), 1, compute)
+    assert compute.calls == [(START + timedelta(days=1), 1)]
+
+
+def test_cache_entries_expire_after_ttl(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(availability, "monotonic", lambda: clock[0])
+    cache = AvailabilityCache(ttl=60)
+    compute = Computation()
+
+    cache.get_window("v", START, 2, compute)
+    clock[0] += 59
+    cache.get_window("v", START, 2, compute)
+    assert len(compute.calls) == 1
+
+    clock[0] += 2
+    cache.get_window("v", START, 2, compute)
+    assert compute.calls == [(START, 2), (START, 2)]
+
+
+def test_invalidate_day_recomputes_only_that_day():
+    cache = AvailabilityCache()
+    compute = Computation()
+    cache.get_window("v", START, 3, compute)
+    cache.get_window("w", START, 3, compute)
+
+    cache.invalidate_day(START + timedelta(days=1))
+    compute.calls.clear()
+    cache.get_window("v", START, 3, compute)
+    cache.get_window("w", START, 3, compute)
+    assert compute.calls == [(START + timedelta(days=1), 1)] * 2
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_changed_day_version_recomputes_only_that_day():
+    cache = AvailabilityCache()
+    compute = Computation()
+    versions = {START + timedelta(days=i): (0, None) for i in range(3)}
+
+    def load_versions(start: date, days: int):
+        return dict(versions)
+
+    cache.get_window("v", START, 3, compute, versions=load_versions)
+    versions[START + timedelta(days=2)] = (1, datetime(2030, 1, 1))
+    compute.calls.clear()
+    cache.get_window("v", START, 3, compute, versions=load_versions)
+
+    assert compute.calls == [(START + timedelta(days=2), 1)]
+    assert cache.stats()["stale"] == 1
+
+
+# Endpoint /api/available-slots
+
+
+def next_weekday(after: date, weekday: int) -> date:
+    return after + timedelta(days=(weekday - after.weekday()) % 7 or 7)
+
+
+def slot_datetimes(client, query: str = "") -> list[str]:
+    response = client.get(f"/api/available-slots{query}")
+    assert response.status_code == 200
+    return [slot["datetime"] for slot in response.get_json()]
+
+
+def book(client, moment: datetime, service: str = "Konsultacja podologiczna") -> int:
+    response = client.post(
+        "/api/appointments",
+        json={
+            "name": "Jan Kowalski",
+            "email": "jan@example.com",
+            "service": service,
+            "date": moment.date().isoformat(),
+            "time": moment.strftime("%H:%M"),
+        },
+    )
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()["appointment"]["id"]
+
+
+def test_writes_invalidate_cached_slots(client):
+    tuesday = next_weekday(date.today(), 1)
+    moment = datetime.combine(tuesday, time(10, 0))
+    assert moment.isoformat() in slot_datetimes(client)
+
+    appointment_id = book(client, moment)
+    assert moment.isoformat() not in slot_datetimes(client)
+
+    response = client.put(
+        f"/api/appointments/{appointment_id}", json={"status": "cancelled"}
+    )
+    assert response.status_code == 200
+    assert moment.isoformat() in slot_datetimes(client)
+
+    client.put(f"/api/appointments/{appointment_id}", json={"status": "confirmed"})
+    assert moment.isoformat() not in slot_datetimes(client)
+
+    assert client.delete(f"/api/appointments/{appointment_id}").status_code == 200
+    assert moment.isoformat() in slot_datetimes(client)
+
+
+@pytest.mark.parametrize("query", ["", "?service_id=1&granularity=15"])
+def test_booking_in_another_worker_is_visible_immediately(app, client, query):
+    # Drugi worker gunicorn: ta sama baza, własna pamięć podręczna
+    other = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": app.config["SQLALCHEMY_DATABASE_URI"],
+            "EMAIL_OUTBOX_IN_PROCESS": False,
+            # Wygaśnięcie wpisów nie może tu niczego maskować
+            "AVAILABILITY_CACHE_TTL": 3600,
+        }
+    )
+    app.extensions["availability_cache"].ttl = 3600
+    wednesday = next_weekday(date.today(), 2)
+    moment = datetime.combine(wednesday, time(11, 0))
+    assert moment.isoformat() in slot_datetimes(client, query)
+
+    appointment_id = book(other.test_client(), moment)
+    assert moment.isoformat() not in slot_datetimes(client, query)
+
+    other.test_client().delete(f"/api/appointments/{appointment_id}")
+    assert moment.isoformat() in slot_datetimes(client, query)
+
+    with other.app_context():
+        db.engine.dispose()
+
+
+def baseline_hourly_slots(start_date: date) -> list[dict[str, str]]:
+    """Wyliczenie sprzed pamięci podręcznej: zapytanie na każdą godzinę."""
+    working_hours = [time(hour, 0) for hour in range(9, 18)]
+    slots = []
+    for i in range(30):
+        current_date = start_date + timedelta(days=i)
+        if current_date.weekday() == 6:
+            continue
+        if current_date.weekday() == 5:
+            day_hours = [t for t in working_hours if t.hour <= 14]
+        else:
+            day_hours = working_hours
+
+        for hour in day_hours:
+            slot_start = datetime.combine(current_date, hour)
+            taken = db.session.execute(
+                db.select(Appointment.id).where(
+                    Appointment.status.in_(["pending", "confirmed"]),
+                    Appointment.appointment_date >= slot_start,
+                    Appointment.appointment_date < slot_start + timedelta(hours=1),
+                )
+            ).first()
+            if taken is None:
+                slots.append(
+                    {
+                        "date": current_date.isoformat(),
+                        "time": hour.isoformat(timespec="minutes"),
+                        "datetime": slot_start.isoformat(),
+                    }
+                )
+    return slots
+
+
+def test_hourly_slots_match_baseline(app, client):
+    start = date.today() + timedelta(days=1)
+    saturday = next_weekday(start, 5)
+    monday = next_weekday(start, 0)
+    bookings = [
+        (datetime.combine(monday, time(9, 0)), "pending"),
+        (datetime.combine(monday, time(13, 30)), "confirmed"),
+        (datetime.combine(monday, time(15, 0)), "cancelled"),
+        (datetime.combine(saturday, time(14, 15)), "pending"),
+        (datetime.combine(saturday, time(8, 0)), "confirmed"),
+        (datetime.combine(start + timedelta(days=29), time(17, 59)), "pending"),
+        (datetime.combine(start + timedelta(days=30), time(9, 0)), "pending"),
+    ]
+    with app.app_context():
+        for moment, status in bookings:
+            appointment = Appointment(
+                name="Pacjent",
+                email="pacjent@example.com",
+                service="Konsultacja podologiczna",
+                appointment_date=moment,
+                status=status,
+            )
+            db.session.add(appointment)
+        db.session.commit()
+        expected = baseline_hourly_slots(start)
+
+    assert client.get("/api/available-slots").get_json() == expected
+    # Drugi odczyt z pamięci podręcznej daje to samo
+    assert client.get("/api/available-slots").get_json() == expected
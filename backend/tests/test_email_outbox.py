@@ -0,0 +1,181 @@
+"""Kolejka wysyłki emaili: dostarczenie, ponowienia z odstępem i martwe wiadomości."""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta
+from typing import Any
+
+import pytest
+
+from src.models import EmailOutbox, Settings, db
+from src.utils.email_outbox import (
+    APPOINTMENT_NOTIFICATION,
+    LEASE_EXPIRED_ERROR,
+    enqueue_email,
+    get_outbox_workers,
+    process_outbox,
+    retry_dead,
+    retry_delay,
+    start_outbox_workers,
+)
+
+RECIPIENT = "gabinet@example.com"
+
+PAYLOAD = {
+    "name": "Jan Kowalski",
+    "email": "jan@example.com",
+    "phone": "123 456 789",
+    "service": "Konsultacja podologiczna",
+    "appointment_date": "2030-01-07T10:00:00",
+    "message": "",
+}
+
+
+@pytest.fixture
+def app_config(smtp_server) -> dict[str, Any]:
+    return {
+        "MAIL_SERVER": "127.0.0.1",
+        "MAIL_PORT": smtp_server.port,
+        "MAIL_USE_TLS": False,
+        "MAIL_USE_SSL": False,
+        "MAIL_USERNAME": "konto@example.com",
+        "MAIL_PASSWORD": "haslo",
+        "MAIL_TIMEOUT": 5,
+        "MAIL_SUPPRESS_SEND": False,
+        "EMAIL_OUTBOX_MAX_ATTEMPTS": 3,
+        "EMAIL_OUTBOX_BACKOFF_SECONDS": 30,
+        "EMAIL_OUTBOX_POLL_SECONDS": 0.05,
+    }
+
+
+@pytest.fixture
+def entry_id(app) -> int:
+    """Wiadomość zapisana w kolejce, tak jak przy rezerwacji."""
+    with app.app_context():
+        Settings.set_value("notification_email", RECIPIENT)
+        entry = enqueue_email(APPOINTMENT_NOTIFICATION, PAYLOAD)
+        db.session.commit()
+        return entry.id
+
+
+def load(app, entry_id: int) -> EmailOutbox:
+    with app.app_context():
+        entry = db.session.get(EmailOutbox, entry_id)
+        db.session.expunge(entry)
+        return entry
+
+
+def make_ready(app, entry_id: int) -> None:
+    """Przesuwa termin ponowienia w przeszłość (zamiast czekać na odstęp)."""
+    with app.app_context():
+        entry = db.session.get(EmailOutbox, entry_id)
+        entry.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+
+
+def test_enqueued_message_is_delivered(app, smtp_server, entry_id):
+    with app.app_context():
+        assert process_outbox() == (1, 0)
+
+    entry = load(app, entry_id)
+    assert entry.status == "sent"
+    assert entry.attempts == 1
+    assert entry.sent_at is not None
+    assert entry.last_error is None
+
+    [message] = smtp_server.messages
+    assert message["recipients"] == [f"<{RECIPIENT}>"]
+    assert b"Jan Kowalski" in message["data"]
+
+
+def test_failed_delivery_is_retried_after_backoff(app, smtp_server, entry_id):
+    smtp_server.reject = True
+    with app.app_context():
+        before = datetime.utcnow()
+        assert process_outbox() == (0, 1)
+
+    entry = load(app, entry_id)
+    assert entry.status == "pending"
+    assert entry.attempts == 1
+    assert "451" in entry.last_error
+    assert entry.next_attempt_at >= before + timedelta(seconds=30)
+
+    # Przed upływem odstępu wiadomość nie jest pobierana ponownie
+    smtp_server.reject = False
+    with app.app_context():
+        assert process_outbox() == (0, 0)
+
+    make_ready(app, entry_id)
+    with app.app_context():
+        assert process_outbox() == (1, 0)
+    entry = load(app, entry_id)
+    assert entry.status == "sent"
+    assert entry.attempts == 2
+    assert len(smtp_server.messages) == 1
+
+
+def test_retry_delay_grows_exponentially_up_to_limit(app):
+    with app.app_context():
+        assert [retry_delay(n).total_seconds() for n in (1, 2, 3)] == [30, 60, 120]
+        assert retry_delay(20) == timedelta(hours=1)
+
+
+def test_message_goes_dead_after_max_attempts(app, smtp_server, entry_id):
+    smtp_server.reject = True
+    for _ in range(3):
+        make_ready(app, entry_id)
+        with app.app_context():
+            assert process_outbox() == (0, 1)
+
+    entry = load(app, entry_id)
+    assert entry.status == "dead"
+    assert entry.attempts == 3
+
+    make_ready(app, entry_id)
+    with app.app_context():
+        assert process_outbox() == (0, 0)
+        assert retry_dead() == 1
+
+    smtp_server.reject = False
+    with app.app_context():
+        assert process_outbox() == (1, 0)
+    assert load(app, entry_id).status == "sent"
+
+
+def test_expired_lease_counts_as_attempt(app, smtp_server, entry_id):
+    # Wysyłka przerwana (np. zabity proces) przy ostatniej dozwolonej próbie
+    with app.app_context():
+        entry = db.session.get(EmailOutbox, entry_id)
+        entry.status = "sending"
+        entry.attempts = 3
+        entry.locked_at = datetime.utcnow() - timedelta(hours=1)
+        db.session.commit()
+
+        assert process_outbox() == (0, 0)
+
+    entry = load(app, entry_id)
+    assert entry.status == "dead"
+    assert entry.attempts == 3
+    assert entry.last_error == LEASE_EXPIRED_ERROR
+    assert smtp_server.messages == []
+
+
+@pytest.mark.parametrize("in_process", [True, False])
+def test_workers_start_with_process_and_drain_backlog(
+    app, smtp_server, entry_id, in_process
+):
+    # Wiadomość zaległa sprzed restartu; nikt nie wywołuje notify()
+    app.config["EMAIL_OUTBOX_IN_PROCESS"] = in_process
+    assert start_outbox_workers(app) is in_process
+
+    try:
+        deadline = time.monotonic() + (5 if in_process else 0.3)
+        while time.monotonic() < deadline and not smtp_server.messages:
+            time.sleep(0.05)
+    finally:
+        with app.app_context():
+            get_outbox_workers().stop(timeout=5)
+
+    assert len(smtp_server.messages) == (1 if in_process else 0)
+    assert load(app, entry_id).status == ("sent" if in_process else "pending")
@@ -0,0 +1,90 @@
+"""Wyszukiwanie bez rozróżniania wielkości liter korzysta z indeksów lower()."""
+
+from __future__ import annotations
+
+from flask import Flask
+
+from conftest import capture_sql
+from src.models import ServiceCategory, Settings, db
+
+
+def query_plans(app: Flask, statements, table: str) -> list[str]:
+    """Plany EXPLAIN QUERY PLAN dla przechwyconych zapytań SELECT do `table`."""
+    plans = []
+    with app.app_context():
+        connection = db.session.connection()
+        for statement, parameters in statements:
+            if not statement.lstrip().upper().startswith("SELECT"):
+                continue
+            if f"FROM {table}" not in statement:
+                continue
+            rows = connection.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            ).all()
+            plans.append(" | ".join(row[-1] for row in rows))
+    assert plans, f"brak zapytań do tabeli {table}"
+    return plans
+
+
+def assert_uses_index(plans: list[str], index: str) -> None:
+    for plan in plans:
+        assert f"USING INDEX {index}" in plan or (
+            f"USING COVERING INDEX {index}" in plan
+        ), plan
+
+
+def test_set_value_uses_lower_key_index(app: Flask) -> None:
+    with app.app_context():
+        Settings.set_value("Notification_Email", "a@example.com")
+        db.session.commit()
+
+        with capture_sql(app) as statements:
+            Settings.set_value("NOTIFICATION_EMAIL", "b@example.com")
+        db.session.rollback()
+
+    assert_uses_index(
+        query_plans(app, statements, "settings"), "ix_settings_key_lower"
+    )
+
+
+def test_get_and_delete_setting_use_lower_key_index(app: Flask, client) -> None:
+    with app.app_context():
+        Settings.set_value("clinic_name", "Gabinet")
+        db.session.commit()
+
+    with capture_sql(app) as statements:
+        assert client.get("/api/settings/CLINIC_NAME").status_code == 200
+        assert client.delete("/api/settings/Clinic_Name").status_code == 200
+
+    assert_uses_index(
+        query_plans(app, statements, "settings"), "ix_settings_key_lower"
+    )
+
+
+def test_category_duplicate_checks_use_lower_name_index(app: Flask, client) -> None:
+    with app.app_context():
+        category_id = db.session.execute(
+            db.select(ServiceCategory.id).limit(1)
+        ).scalar_one()
+
+    with capture_sql(app) as statements:
+        created = client.post(
+            "/api/service-categories", json={"name": "Nowa kategoria"}
+        )
+        assert created.status_code == 201
+        renamed = client.put(
+            f"/api/service-categories/{category_id}",
+            json={"name": "NOWA KATEGORIA"},
+        )
+        assert renamed.status_code == 409
+
+    duplicate_checks = [
+        (statement, parameters)
+        for statement, parameters in statements
+        if "lower(service_categories.name)" in statement
+    ]
+    assert len(duplicate_checks) == 2
+    assert_uses_index(
+        query_plans(app, duplicate_checks, "service_categories"),
+        "ix_service_categories_name_lower",
+    )
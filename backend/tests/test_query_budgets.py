@@ -0,0 +1,148 @@
+"""Liczba zapytań SQL endpointów katalogu usług (regresje N+1)."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+import pytest
+from flask import Flask
+
+from conftest import capture_sql
+from src.models import Appointment, Service, ServiceCategory, db
+from src.utils.query_budget import query_budget
+
+
+@pytest.fixture
+def catalog_ids(app: Flask) -> dict[str, int]:
+    """Identyfikatory: kategoria z usługami, pusta kategoria i usługa."""
+    with app.app_context():
+        empty = ServiceCategory()
+        empty.name = "Pusta kategoria"
+        db.session.add(empty)
+        db.session.commit()
+        service = db.session.execute(db.select(Service).limit(1)).scalar_one()
+        return {
+            "category": service.category_id,
+            "empty_category": empty.id,
+            "service": service.id,
+        }
+
+
+def statement_count(
+    app: Flask, client, method: str, url: str, json: Any = None, status: int = 200
+) -> int:
+    with capture_sql(app) as statements:
+        response = client.open(url, method=method, json=json)
+        response.get_data()
+    assert response.status_code == status, response.get_data(as_text=True)
+    return len(statements)
+
+
+SERVICE_PAYLOAD = {
+    "name": "Nowa usługa",
+    "price": "120.00",
+    "duration_minutes": 45,
+    "is_active": True,
+}
+
+
+@pytest.mark.parametrize(
+    ("method", "url", "payload", "status", "expected"),
+    [
+        ("GET", "/api/catalog", None, 200, 2),
+        ("GET", "/api/service-categories", None, 200, 2),
+        ("GET", "/api/services", None, 200, 2),
+        ("POST", "/api/service-categories", {"name": "Nowa"}, 201, 3),
+        (
+            "PUT",
+            "/api/service-categories/{category}",
+            {"name": "Zmieniona"},
+            200,
+            4,
+        ),
+        ("DELETE", "/api/service-categories/{empty_category}", None, 200, 4),
+        ("POST", "/api/services", {**SERVICE_PAYLOAD}, 201, 5),
+        ("PUT", "/api/services/{service}", {**SERVICE_PAYLOAD}, 200, 5),
+        ("DELETE", "/api/services/{service}", None, 200, 4),
+    ],
+)
+def test_catalog_endpoint_statement_count(
+    app: Flask,
+    client,
+    catalog_ids: dict[str, int],
+    method: str,
+    url: str,
+    payload: dict[str, Any] | None,
+    status: int,
+    expected: int,
+) -> None:
+    if payload is not None and "price" in payload:
+        payload = {**payload, "category_id": catalog_ids["category"]}
+    count = statement_count(
+        app, client, method, url.format(**catalog_ids), payload, status
+    )
+    assert count == expected
+
+
+def test_repeated_catalog_reads_cost_one_statement(app: Flask, client) -> None:
+    for url in ("/api/catalog", "/api/service-categories", "/api/services"):
+        statement_count(app, client, "GET", url)
+        assert statement_count(app, client, "GET", url) == 1
+
+
+def test_service_writes_linking_appointments_stay_within_budget(
+    app: Flask, client, catalog_ids: dict[str, int]
+) -> None:
+    with app.app_context():
+        for name in ("Nowa usługa", "Zmieniona usługa"):
+            appointment = Appointment(
+                name="Jan Kowalski",
+                email="jan@example.com",
+                phone="123456789",
+                service=name,
+                appointment_date=datetime(2030, 1, 2, 10, 0),
+                status="confirmed",
+            )
+            db.session.add(appointment)
+        db.session.commit()
+
+    payload = {**SERVICE_PAYLOAD, "category_id": catalog_ids["category"]}
+    assert statement_count(app, client, "POST", "/api/services", payload, 201) == 7
+    assert (
+        statement_count(
+            app,
+            client,
+            "PUT",
+            f"/api/services/{catalog_ids['service']}",
+            {**payload, "name": "Zmieniona usługa", "price": "99.00"},
+        )
+        == 7
+    )
+
+
+def test_query_budget_only_logs_after_committed_write(app: Flask, caplog) -> None:
+    @query_budget(1)
+    def create_category() -> tuple[str, int]:
+        db.session.execute(db.select(Service.id)).all()
+        category = ServiceCategory()
+        category.name = "Ponad limit"
+        db.session.add(category)
+        db.session.commit()
+        return "ok", 201
+
+    app.add_url_rule(
+        "/test/over-budget", "create_category", create_category, methods=["POST"]
+    )
+    response = app.test_client().post("/test/over-budget")
+
+    # Zapis zatwierdzony przed sprawdzeniem limitu nie kończy się błędem 500
+    assert response.status_code == 201
+    with app.app_context():
+        assert db.session.execute(
+            db.select(ServiceCategory.id).where(ServiceCategory.name == "Ponad limit")
+        ).scalar_one()
+    assert any(
+        record.levelname == "WARNING" and "(limit 1)" in record.getMessage()
+        for record in caplog.records
+    )
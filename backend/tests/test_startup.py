@@ -0,0 +1,116 @@
+"""Start aplikacji: import bez SQL i stan należący do każdej aplikacji osobno."""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import subprocess
+import sys
+
+from app import create_app
+from src.bootstrap import init_database
+from src.models import Settings, db
+from src.utils.email_templates import (
+    APPOINTMENT_NOTIFICATION_TEXT,
+    get_email_templates,
+)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Nowy proces: import `app` tworzy moduł od zera, jak przy starcie serwera
+PROBE = """
+import json
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+statements = []
+event.listen(
+    Engine, "before_cursor_execute", lambda *args: statements.append(args[2])
+)
+
+import app
+
+print(json.dumps(statements))
+"""
+
+
+def test_import_runs_no_sql(tmp_path):
+    database = tmp_path / "app.db"
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{database}",
+        "DB_AUTO_MIGRATE": "true",
+        "EMAIL_OUTBOX_IN_PROCESS": "false",
+    }
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=BACKEND_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+    assert json.loads(output.strip().splitlines()[-1]) == []
+    # SQLite tworzy plik bazy przy pierwszym połączeniu
+    assert not database.exists()
+
+
+def test_state_is_separate_per_app(tmp_path):
+    first = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'first.db'}",
+            "AVAILABILITY_CACHE_SIZE": 10,
+        }
+    )
+    second = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'second.db'}",
+            "AVAILABILITY_CACHE_SIZE": 20,
+        }
+    )
+
+    for name in (
+        "smtp_pool",
+        "email_templates",
+        "outbox_workers",
+        "settings_cache",
+        "catalog_cache",
+        "availability_cache",
+        "static_manifest",
+        "request_metrics",
+    ):
+        assert first.extensions[name] is not second.extensions[name]
+    assert first.extensions["availability_cache"].max_entries == 10
+    assert second.extensions["availability_cache"].max_entries == 20
+
+
+def test_templates_and_settings_follow_their_app(tmp_path):
+    apps = []
+    for name in ("Gabinet A", "Gabinet B"):
+        app = create_app(
+            {
+                "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / name}.db",
+                "EMAIL_OUTBOX_IN_PROCESS": False,
+            }
+        )
+        with app.app_context():
+            init_database()
+            Settings.set_value("clinic_name", name)
+            db.session.commit()
+        apps.append((name, app))
+
+    for name, app in apps:
+        with app.app_context():
+            template = get_email_templates().get(APPOINTMENT_NOTIFICATION_TEXT)
+            assert template.environment is app.jinja_env
+            assert name in template.render({})
+            db.engine.dispose()
+
+
+def test_create_app_registers_no_exit_handlers(tmp_path):
+    before = atexit._ncallbacks()
+    for index in range(3):
+        create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path}/{index}.db"})
+    assert atexit._ncallbacks() == before
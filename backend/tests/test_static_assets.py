@@ -0,0 +1,76 @@
+"""Rozpoznawanie plików z hashem w nazwie (nagłówek Cache-Control: immutable)."""
+
+from __future__ import annotations
+
+import json
+
+from src.utils.static_assets import StaticManifest
+
+
+def write(root, relative: str, content: str = "x") -> None:
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+
+
+def immutable_paths(root) -> set[str]:
+    manifest = StaticManifest()
+    manifest.load(str(root))
+    return {path for path, asset in manifest.assets.items() if asset.immutable}
+
+
+def test_vite_manifest_lists_hashed_files(tmp_path):
+    for name in (
+        "index.html",
+        "assets/index-B1x9aZ_q.js",
+        "assets/index-Dm3kQ0aZ.css",
+        "assets/logo-Ab12Cd34.svg",
+        "assets/vendor-production.js",
+        "assets/logo-original.png",
+    ):
+        write(tmp_path, name)
+    write(
+        tmp_path,
+        ".vite/manifest.json",
+        json.dumps(
+            {
+                "index.html": {
+                    "file": "assets/index-B1x9aZ_q.js",
+                    "src": "index.html",
+                    "isEntry": True,
+                    "css": ["assets/index-Dm3kQ0aZ.css"],
+                    "assets": ["assets/logo-Ab12Cd34.svg"],
+                }
+            }
+        ),
+    )
+
+    manifest = StaticManifest()
+    manifest.load(str(tmp_path))
+
+    assert immutable_paths(tmp_path) == {
+        "assets/index-B1x9aZ_q.js",
+        "assets/index-Dm3kQ0aZ.css",
+        "assets/logo-Ab12Cd34.svg",
+    }
+    assert ".vite/manifest.json" not in manifest.assets
+
+
+def test_without_manifest_only_vite_hash_segment_counts(tmp_path):
+    for name in (
+        "assets/index-B1x9aZ_q.js",
+        "assets/chunk-a_b-1234.js",
+        "assets/vendor-production.js",
+        "assets/logo-original.png",
+        "assets/react-dom-development.js",
+        "assets/index-B1x9aZ_q.min.js",
+        "favicon-B1x9aZ_q.ico",
+    ):
+        write(tmp_path, name)
+    # Manifest PWA nie jest manifestem Vite
+    write(tmp_path, "manifest.json", json.dumps({"name": "Gabinet"}))
+
+    assert immutable_paths(tmp_path) == {
+        "assets/index-B1x9aZ_q.js",
+        "assets/chunk-a_b-1234.js",
+    }
@@ -0,0 +1,162 @@
+"""Liczniki statystyk: zmiany rezerwacji, cen usług i wykrywanie rozbieżności."""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from conftest import capture_sql
+from src.models import Appointment, Service, StatsCounter, db
+from src.models.stats import ALL_BUCKET
+from src.utils.stats_counters import (
+    AppointmentState,
+    adjust_service_revenue,
+    find_drift,
+    rebuild_counters,
+    record_appointment_change,
+)
+
+DAY = date(2030, 1, 7)
+OTHER_DAY = date(2030, 1, 8)
+
+
+@pytest.fixture
+def service(app) -> tuple[int, Decimal]:
+    """Identyfikator i cena startowej usługi."""
+    with app.app_context():
+        service = db.session.execute(
+            db.select(Service).where(Service.name == "Konsultacja podologiczna")
+        ).scalar_one()
+        return service.id, service.price
+
+
+def counters() -> dict[tuple[str, str], tuple[int, Decimal]]:
+    return {
+        (row.bucket, row.status): (row.appointments, row.revenue)
+        for row in db.session.execute(db.select(StatsCounter)).scalars()
+        if row.appointments or row.revenue
+    }
+
+
+def add_appointment(service_id: int | None, day: date, status: str) -> Appointment:
+    """Zapisuje rezerwację razem z licznikami, tak jak robią to widoki."""
+    appointment = Appointment(
+        name="Jan Kowalski",
+        email="jan@example.com",
+        service="Konsultacja podologiczna",
+        service_id=service_id,
+        appointment_date=datetime.combine(day, datetime.min.time()).replace(hour=10),
+        status=status,
+    )
+    db.session.add(appointment)
+    record_appointment_change(None, AppointmentState(status, day, service_id))
+    db.session.commit()
+    return appointment
+
+
+def test_record_appointment_change_moves_counts_between_buckets(app, service):
+    service_id, price = service
+    with app.app_context():
+        created = AppointmentState("pending", DAY, service_id)
+        record_appointment_change(None, created)
+        assert counters() == {
+            (ALL_BUCKET, "pending"): (1, price),
+            (DAY.isoformat(), "pending"): (1, price),
+        }
+
+        # Zmiana statusu i dnia: odjęcie ze starych kubełków, dodanie do nowych
+        moved = AppointmentState("confirmed", OTHER_DAY, service_id)
+        record_appointment_change(created, moved)
+        assert counters() == {
+            (ALL_BUCKET, "confirmed"): (1, price),
+            (OTHER_DAY.isoformat(), "confirmed"): (1, price),
+        }
+
+        # Bez usługi z katalogu rezerwacja nie wnosi przychodu
+        unassigned = AppointmentState("confirmed", OTHER_DAY, None)
+        record_appointment_change(moved, unassigned)
+        assert counters() == {
+            (ALL_BUCKET, "confirmed"): (1, Decimal("0")),
+            (OTHER_DAY.isoformat(), "confirmed"): (1, Decimal("0")),
+        }
+
+        record_appointment_change(unassigned, None)
+        assert counters() == {}
+
+
+def test_record_appointment_change_skips_unchanged_state(app, service):
+    state = AppointmentState("pending", DAY, service[0])
+    with app.app_context(), capture_sql(app) as statements:
+        record_appointment_change(state, state)
+    assert statements == []
+
+
+def test_adjust_service_revenue_updates_only_matching_appointments(app, service):
+    service_id, price = service
+    with app.app_context():
+        add_appointment(service_id, DAY, "confirmed")
+        add_appointment(service_id, DAY, "confirmed")
+        add_appointment(service_id, OTHER_DAY, "pending")
+        add_appointment(None, DAY, "confirmed")
+
+        adjust_service_revenue(Appointment.service_id == service_id, Decimal("10"))
+        db.session.commit()
+
+        assert counters() == {
+            (ALL_BUCKET, "confirmed"): (3, 2 * (price + 10)),
+            (ALL_BUCKET, "pending"): (1, price + 10),
+            (DAY.isoformat(), "confirmed"): (3, 2 * (price + 10)),
+            (OTHER_DAY.isoformat(), "pending"): (1, price + 10),
+        }
+
+        # Po zapisie nowej ceny liczniki zgadzają się z rezerwacjami
+        db.session.get(Service, service_id).price = price + 10
+        db.session.commit()
+        assert find_drift() == []
+
+
+def test_price_change_through_api_keeps_counters_in_sync(app, client, service):
+    service_id, price = service
+    with app.app_context():
+        add_appointment(service_id, DAY, "confirmed")
+        payload = db.session.get(Service, service_id).to_dict()
+
+    payload.update(price=float(price) + 25, category_id=payload["category_id"])
+    response = client.put(f"/api/services/{service_id}", json=payload)
+    assert response.status_code == 200, response.get_json()
+
+    with app.app_context():
+        assert counters()[(ALL_BUCKET, "confirmed")] == (1, price + 25)
+        assert find_drift() == []
+
+
+def test_find_drift_reports_and_rebuild_repairs(app, service):
+    service_id, price = service
+    with app.app_context():
+        add_appointment(service_id, DAY, "confirmed")
+        assert find_drift() == []
+
+        # Zapis z pominięciem liczników (np. ręczna zmiana w bazie)
+        db.session.execute(db.update(Appointment).values(status="cancelled"))
+        db.session.commit()
+
+        drift = find_drift()
+        assert {(item["bucket"], item["status"]) for item in drift} == {
+            (ALL_BUCKET, "cancelled"),
+            (ALL_BUCKET, "confirmed"),
+            (DAY.isoformat(), "cancelled"),
+            (DAY.isoformat(), "confirmed"),
+        }
+        [confirmed] = [
+            item
+            for item in drift
+            if (item["bucket"], item["status"]) == (ALL_BUCKET, "confirmed")
+        ]
+        assert confirmed["stored"] == {"appointments": 1, "revenue": float(price)}
+        assert confirmed["expected"] == {"appointments": 0, "revenue": 0.0}
+
+        assert rebuild_counters() == 2
+        db.session.commit()
+        assert find_drift() == []
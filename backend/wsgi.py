@@ -0,0 +1,43 @@
+"""
+Punkt wejścia serwera produkcyjnego.
+
+gunicorn (Linux, macOS) korzysta z obiektu `app`:
+    gunicorn -c gunicorn.conf.py
+
+waitress (także Windows) uruchamiany jest bezpośrednio:
+    python wsgi.py
+"""
+
+import os
+
+from app import app
+from src.bootstrap import init_database
+from src.utils.email_outbox import start_outbox_workers
+from src.utils.server_tuning import available_cpus, server_threads
+
+try:  # pragma: no cover - zależność opcjonalna
+    from waitress import serve
+except ImportError:  # pragma: no cover
+    serve = None
+
+
+def main() -> None:
+    if serve is None:
+        raise SystemExit("Brak pakietu waitress: pip install waitress")
+
+    if app.config["DB_AUTO_MIGRATE"]:
+        with app.app_context():
+            init_database()
+    start_outbox_workers(app)
+
+    # waitress działa w jednym procesie, więc współbieżność dają tylko wątki
+    serve(
+        app,
+        host=os.environ.get("HOST", "0.0.0.0"),
+        port=int(os.environ.get("PORT", 5000)),
+        threads=server_threads(2 * available_cpus() + 1),
+    )
+
+
+if __name__ == "__main__":
+    main()
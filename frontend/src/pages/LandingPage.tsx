@@ -17,6 +17,11 @@ interface Service {
 	category_id: number;
 	category?: ServiceCategory | null;
 }
+
+interface CatalogEntry {
+	category: ServiceCategory;
+	services: Service[];
+}
 import { Card, CardContent } from "../components/ui/card";
 import { Input } from "../components/ui/input";
 import { Textarea } from "../components/ui/textarea";
@@ -55,17 +60,13 @@ function LandingPage() {
 	useEffect(() => {
 		const fetchData = async () => {
 			try {
-				const [categoriesRes, servicesRes] = await Promise.all([
-					fetch("/api/service-categories"),
-					fetch("/api/services"),
-				]);
-
-				if (categoriesRes.ok && servicesRes.ok) {
-					const categoriesData: ServiceCategory[] =
-						await categoriesRes.json();
-					const servicesData: Service[] = await servicesRes.json();
-					setCategories(categoriesData);
-					setServices(servicesData.filter((s) => s.is_active));
+				// Aktywne usługi pogrupowane według kategorii w jednej odpowiedzi
+				const catalogRes = await fetch("/api/catalog");
+
+				if (catalogRes.ok) {
+					const catalogData: CatalogEntry[] = await catalogRes.json();
+					setCategories(catalogData.map((entry) => entry.category));
+					setServices(catalogData.flatMap((entry) => entry.services));
 				}
 			} catch (error) {
 				console.error("Błąd podczas pobierania danych:", error);
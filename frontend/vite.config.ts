@@ -5,6 +5,10 @@ import tailwindcss from '@tailwindcss/vite'
 // https://vite.dev/config/
 export default defineConfig({
   plugins: [react(), tailwindcss()],
+  build: {
+    // dist/.vite/manifest.json: backend rozpoznaje po nim pliki z hashem
+    manifest: true,
+  },
   server: {
     port: 5173,
     proxy: {